@@ -15,15 +15,17 @@ Scoring system: -10 to +10 scale
 Caching strategy: 10-minute TTL for reducing API calls while maintaining freshness.
 """
 
-import yfinance as yf
-from groq import Groq
-from newsapi import NewsApiClient
-import feedparser
 import time
 import datetime
 import os
 import json
 from dotenv import load_dotenv
+from app.lazy import LazyModule
+from app.profiling import profiler
+
+# Network clients are imported on the first analysis, not when the UI starts
+yf = LazyModule("yfinance")
+feedparser = LazyModule("feedparser")
 
 load_dotenv()
 
@@ -149,6 +151,7 @@ def ottieni_notizie_top(ticker):
                 txt += f"- {art.get('title', '')}\n"
         
         nome = stock.info.get('longName', ticker_pulito)
+        from newsapi import NewsApiClient
         newsapi = NewsApiClient(api_key=NEWS_API_KEY)
         query = f"{nome} OR {ticker_pulito}"
         top = newsapi.get_everything(q=query, language='en', sort_by='relevancy', page_size=4)
@@ -196,9 +199,12 @@ def analizza_sentiment_ollama(ticker):
         if ora_attuale < data["scadenza"]:
             return data["sentiment"], data["score"], f"{data['msg']} (⚡ CACHE)"
 
-    macro_contesto = ottieni_macro_globale()
-    notizie_specifiche, ticker_pulito = ottieni_notizie_top(ticker)
-    bias_statistico = ottieni_bias_stagionale(ticker_pulito)
+    with profiler.stage("ai_macro"):
+        macro_contesto = ottieni_macro_globale()
+    with profiler.stage("ai_news"):
+        notizie_specifiche, ticker_pulito = ottieni_notizie_top(ticker)
+    with profiler.stage("ai_seasonality"):
+        bias_statistico = ottieni_bias_stagionale(ticker_pulito)
     
     prompt = f"""
     You are an elite quantitative trading AI. Analyze {ticker} using the following data:
@@ -223,13 +229,15 @@ def analizza_sentiment_ollama(ticker):
     """
 
     try:
-        client = Groq(api_key=GROQ_API_KEY)
-        res = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b-versatile",
-            temperature=0.1,
-            response_format={"type": "json_object"}
-        ).choices[0].message.content.strip()
+        with profiler.stage("ai_llm"):
+            from groq import Groq
+            client = Groq(api_key=GROQ_API_KEY)
+            res = client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model="llama-3.3-70b-versatile",
+                temperature=0.1,
+                response_format={"type": "json_object"}
+            ).choices[0].message.content.strip()
         
         dati_json = json.loads(res)
         
@@ -2,9 +2,13 @@
 Strategy performance metric extraction from Lumibot backtest results.
 
 Provides robust parsing of heterogeneous result structures returned by
-different strategy engines and backtesting frameworks.
+different strategy engines and backtesting frameworks, plus LTTB
+downsampling of equity/drawdown curves for stored runs and reports.
 """
 
+import numpy as np
+import pandas as pd
+
 
 def _is_number(value):
     """
@@ -91,3 +95,60 @@ def extract_strategy_metrics(result):
     }
 
     return {key: value for key, value in metrics.items() if value is not None}
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the point
+    kept from the previous bucket and the mean of the next one. Peaks and
+    troughs survive, so a downsampled equity curve keeps its drawdowns.
+
+    Args:
+        x (np.ndarray): Increasing x values (e.g. epoch seconds).
+        y (np.ndarray): Values.
+        threshold (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points (all of them when
+            len(y) <= threshold or threshold < 3).
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    bordi = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(np.int64) + 1
+    bordi[-1] = n - 1
+    # Bucket means do not depend on the selection: one reduceat pass, plus the last point as the final "bucket"
+    larghezze = np.diff(np.append(bordi, n))
+    medie_x = np.add.reduceat(x, bordi) / larghezze
+    medie_y = np.add.reduceat(y, bordi) / larghezze
+    scelti = np.empty(threshold, dtype=np.int64)
+    scelti[0], scelti[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        inizio, fine = bordi[i], bordi[i + 1]
+        xa, ya = x[a], y[a]
+        aree = np.abs((xa - medie_x[i + 1]) * (y[inizio:fine] - ya) - (xa - x[inizio:fine]) * (medie_y[i + 1] - ya))
+        a = inizio + int(aree.argmax())
+        scelti[i + 1] = a
+    return scelti
+
+
+def downsample_curve(curve, points):
+    """
+    LTTB-downsample a date-indexed curve to at most `points` points.
+
+    Args:
+        curve (pd.Series): Values indexed by a DatetimeIndex.
+        points (int): Maximum number of points.
+
+    Returns:
+        pd.Series: The kept points, in date order.
+    """
+    curve = curve.dropna()
+    x = curve.index.asi8 / 1e9 if isinstance(curve.index, pd.DatetimeIndex) else np.arange(len(curve))
+    return curve.iloc[lttb_indices(x, curve.to_numpy(dtype=np.float64), points)]
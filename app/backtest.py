@@ -2,18 +2,32 @@
 Backtesting engine integrating Lumibot with market data and metrics extraction.
 
 Orchestrates the complete backtest lifecycle:
-1. Data retrieval via yfinance
-2. Strategy execution via Lumibot
+1. Data retrieval via the market_data disk cache (yfinance only on cache misses)
+2. Strategy execution via Lumibot, fed from the cached OHLCV frames (no re-download)
 3. Metrics computation and reporting
 4. HTML/JSON export for analysis
+
+Results are memoized in BACKTEST_RESULT_CACHE_DIR: a repeated request with the
+same inputs, price data and strategy code returns the stored metrics and
+report without running the simulation again.
 """
 
 import datetime
+import hashlib
+import inspect
+import json
 import logging
+import os
+from pathlib import Path
+
+import pandas as pd
 
-from lumibot.backtesting import YahooDataBacktesting
+from lumibot.backtesting import PandasDataBacktesting
+from lumibot.entities import Asset, Data
 
+from app import config, fast_backtest as motore_veloce, signals
 from app.analytics import extract_strategy_metrics
+from app.fast_backtest import fast_backtest
 from app.market_data import compute_market_metrics, get_market_snapshot, get_price_history
 from app.report import generate_html_report
 from app.storage import save_metrics
@@ -39,14 +53,160 @@ def _safe_call(callbacks, name, *args):
         callback(*args)
 
 
-def esegui_backtest(ticker, capitale, start, end, nome_strategia, callbacks):
+def load_backtest_history(ticker, start, end):
+    """
+    Load cached daily OHLCV for a backtest, including the indicator warm-up period.
+
+    Args:
+        ticker (str): Asset symbol.
+        start (datetime.datetime): Backtest start.
+        end (datetime.datetime): Backtest end.
+
+    Returns:
+        pd.DataFrame: OHLCV frame from start - BACKTEST_WARMUP_DAYS to end.
+    """
+    inizio = start - datetime.timedelta(days=config.BACKTEST_WARMUP_DAYS)
+    return get_price_history(ticker, start=inizio.date(), end=end.date())
+
+
+def _chiave_risultato(ticker, StrategyClass, parameters, capitale, start, end, storico, fast):
+    """
+    Cache key of one esegui_backtest result.
+
+    Covers every input that changes the result: ticker, strategy, parameters,
+    dates, capital, engine, a fingerprint of the OHLCV frame and a hash of the
+    code that produces the trades (strategy class, indicator columns and, in
+    fast mode, the native engine).
+    """
+    sorgente = inspect.getsource(StrategyClass) + inspect.getsource(signals)
+    if fast:
+        sorgente += inspect.getsource(motore_veloce)
+    descrizione = json.dumps({
+        "ticker": ticker,
+        "strategy": StrategyClass.__name__,
+        "parameters": parameters or {},
+        "capital": capitale,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "engine": "fast" if fast else "lumibot",
+        "risk_free_rate": config.BACKTEST_RISK_FREE_RATE,
+        "data": hashlib.sha1(pd.util.hash_pandas_object(storico, index=True).to_numpy().tobytes()).hexdigest(),
+        "code": hashlib.sha1(sorgente.encode("utf-8")).hexdigest(),
+    }, sort_keys=True, default=str)
+    return hashlib.sha1(descrizione.encode("utf-8")).hexdigest()
+
+
+def _leggi_risultato(chiave):
+    """Stored result for a key, or None when missing, unreadable or its report files are gone."""
+    if not config.BACKTEST_RESULT_CACHE_DIR:
+        return None
+    try:
+        risultato = json.loads((Path(config.BACKTEST_RESULT_CACHE_DIR) / f"{chiave}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    percorsi = [risultato.get("report"), *(risultato.get("metrics_files") or {}).values()]
+    if not all(isinstance(p, str) and Path(p).exists() for p in percorsi):
+        return None
+    return risultato
+
+
+def _salva_risultato(chiave, risultato):
+    if not config.BACKTEST_RESULT_CACHE_DIR:
+        return
+    cartella = Path(config.BACKTEST_RESULT_CACHE_DIR)
+    percorso = cartella / f"{chiave}.json"
+    tmp_path = percorso.with_suffix(".tmp")
+    try:
+        cartella.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(risultato, default=str), encoding="utf-8")
+        os.replace(tmp_path, percorso)
+    except OSError as exc:
+        logger.warning("Backtest result not cached: %s", exc)
+
+
+def _pandas_feed(ticker, history):
+    """
+    Wrap a cached OHLCV frame as a Lumibot pandas_data feed.
+
+    Args:
+        ticker (str): Symbol the strategy trades (its `symbol` parameter).
+        history (pd.DataFrame): Daily OHLCV with a DatetimeIndex (market_data layout).
+
+    Returns:
+        dict: {Asset: Data} for PandasDataBacktesting.
+    """
+    frame = history.rename(columns=str.lower)[["open", "high", "low", "close", "volume"]].dropna(subset=["close"])
+    asset = Asset(symbol=ticker, asset_type="stock")
+    return {asset: Data(asset, frame, timestep="day", quote=Asset(symbol="USD", asset_type="forex"))}
+
+
+def _run_strategy_backtest(StrategyClass, ticker, capitale, start, end, parameters=None, interactive=True, history=None,
+                           precompute=True, detail=False):
+    """
+    Run a single Lumibot backtest and return its standardized metrics.
+
+    Shared by the interactive backtest (esegui_backtest) and the parameter
+    sweep workers (app.sweep).
+
+    Args:
+        StrategyClass (type): Lumibot Strategy subclass from STRATEGIES.
+        ticker (str): Asset symbol to backtest.
+        capitale (float): Initial capital in USD.
+        start (datetime.datetime): Backtest start date/time.
+        end (datetime.datetime): Backtest end date/time.
+        parameters (dict, optional): Strategy threshold overrides (merged over the class defaults).
+        interactive (bool): Open the tearsheet and plots. Sweep workers run headless
+            (no tearsheet, plots or stats file; Lumibot still logs trades to logs/).
+        history (pd.DataFrame, optional): Preloaded OHLCV (see load_backtest_history).
+            Loaded from the disk cache when omitted.
+        precompute (bool): Hand strategies that support it their indicator columns
+            computed once from `history` (same trades, no per-day history requests).
+        detail (bool): Also return the daily portfolio value as "equity" (pd.Series).
+
+    Returns:
+        dict: Metrics from extract_strategy_metrics (empty if unavailable).
+    """
+    opzioni = {"show_tearsheet": True} if interactive else {
+        "show_plot": False, "show_tearsheet": False, "save_tearsheet": False,
+        "show_indicators": False, "save_stats_file": False, "show_progress_bar": False,
+        "quiet_logs": True,
+    }
+    if history is None:
+        history = load_backtest_history(ticker, start, end)
+    parametri = {**(parameters or {}), "symbol": ticker}
+    if precompute and hasattr(StrategyClass, "precompute_signals"):
+        parametri["signals"] = StrategyClass.precompute_signals(history["Close"].dropna(), parameters)
+
+    # Lumibot richiede datetime.datetime per backtesting_start e backtesting_end.
+    # Cached frames + no benchmark + fixed risk-free rate = zero network I/O per run.
+    result, strategia = StrategyClass.run_backtest(
+        PandasDataBacktesting,
+        start,
+        end,
+        pandas_data=_pandas_feed(ticker, history),
+        benchmark_asset=None,
+        risk_free_rate=config.BACKTEST_RISK_FREE_RATE,
+        parameters=parametri,
+        budget=capitale,
+        **opzioni,
+    )
+    metriche = extract_strategy_metrics(result)
+    rendimenti = getattr(strategia, "_strategy_returns_df", None)
+    if detail and rendimenti is not None and "portfolio_value" in rendimenti:
+        valori = rendimenti["portfolio_value"]
+        metriche["equity"] = pd.Series(valori.to_numpy(), index=valori.index.tz_localize(None).normalize(), name="equity")
+    return metriche
+
+
+def esegui_backtest(ticker, capitale, start, end, nome_strategia, callbacks, fast=False, parameters=None,
+                    use_cache=True):
     """
     Execute a complete strategy backtest with market context and reporting.
     
     Workflow:
     1. Validate strategy selection
     2. Retrieve market data for the period
-    3. Execute Lumibot backtest
+    3. Execute Lumibot backtest (or the native fast engine)
     4. Extract performance metrics
     5. Generate HTML report and metric files
     6. Notify UI via callbacks
@@ -68,15 +228,15 @@ def esegui_backtest(ticker, capitale, start, end, nome_strategia, callbacks):
             - chart: Price chart data
             - strategy_metrics: Performance metrics
             - metrics_files: Generated file paths
+        fast (bool): Simulate natively on the cached closes (app.fast_backtest):
+            same metrics in milliseconds, no Lumibot run and no tearsheet.
+        parameters (dict, optional): Strategy parameter overrides.
+        use_cache (bool): Return the memoized result of an identical earlier run
+            (same inputs, price data and strategy code) instead of recomputing it.
     
     Returns:
         None: Communication via callbacks only.
     """
-        nome_strategia: nome della strategia da usare (chiave del dizionario STRATEGIES)
-        callbacks: dict con chiavi "status", "progress_start", "progress_stop",
-                   "market", "running", "details", "metrics", "report", "chart",
-                   "strategy_metrics", "metrics_files".
-    """
 
     # Seleziona la classe strategia dal dizionario
     if nome_strategia not in STRATEGIES:
@@ -87,7 +247,8 @@ def esegui_backtest(ticker, capitale, start, end, nome_strategia, callbacks):
     StrategyClass = STRATEGIES[nome_strategia]
 
     _safe_call(callbacks, "running", True)
-    details = {"ticker": ticker, "capital": capitale, "start": str(start.date()), "end": str(end.date())}
+    details = {"ticker": ticker, "strategy": nome_strategia, "capital": capitale, "start": str(start.date()),
+               "end": str(end.date()), "engine": "fast" if fast else "lumibot", "parameters": parameters or {}}
     _safe_call(callbacks, "details", details)
     _safe_call(callbacks, "status", "Simulazione in corso...")
     _safe_call(callbacks, "progress_start")
@@ -100,8 +261,10 @@ def esegui_backtest(ticker, capitale, start, end, nome_strategia, callbacks):
 
     metrics = None
     history = None
+    storico = None
     try:
-        history = get_price_history(ticker, start=start.date(), end=end.date())
+        storico = load_backtest_history(ticker, start, end)
+        history = storico.loc[str(start.date()):]
         metrics = compute_market_metrics(history["Close"])
         _safe_call(callbacks, "metrics", metrics)
     except Exception as exc:
@@ -112,16 +275,26 @@ def esegui_backtest(ticker, capitale, start, end, nome_strategia, callbacks):
         _safe_call(callbacks, "chart", close_series.tolist())
 
     try:
-        # Lumibot richiede datetime.datetime per backtesting_start e backtesting_end
-        result = StrategyClass.backtest(
-            YahooDataBacktesting,
-            start,  # now is datetime.datetime
-            end,    # now is datetime.datetime
-            parameters={"symbol": ticker},
-            show_tearsheet=True,
-            initial_cash=capitale,
-        )
-        strategy_metrics = extract_strategy_metrics(result)
+        # ♻️ Memoized result: same inputs, data and code -> stored metrics and report
+        chiave = None
+        if use_cache and storico is not None:
+            chiave = _chiave_risultato(ticker, StrategyClass, parameters, capitale, start, end, storico, fast)
+            salvato = _leggi_risultato(chiave)
+            if salvato is not None:
+                if salvato["strategy_metrics"]:
+                    _safe_call(callbacks, "strategy_metrics", salvato["strategy_metrics"])
+                _safe_call(callbacks, "report", salvato["report"])
+                _safe_call(callbacks, "metrics_files", salvato["metrics_files"])
+                _safe_call(callbacks, "status", "Completed! (cached result)")
+                return
+
+        if fast:
+            strategy_metrics = fast_backtest(nome_strategia, storico, capitale, start, end, parameters, detail=True)
+            strategy_metrics.pop("trade_log", None)
+        else:
+            strategy_metrics = _run_strategy_backtest(StrategyClass, ticker, capitale, start, end,
+                                                      parameters=parameters, history=storico, detail=True)
+        equity = strategy_metrics.pop("equity", None)  # Curve goes to the metrics store only
         if strategy_metrics:
             _safe_call(callbacks, "strategy_metrics", strategy_metrics)
 
@@ -129,8 +302,15 @@ def esegui_backtest(ticker, capitale, start, end, nome_strategia, callbacks):
             report_path = generate_html_report(details, metrics or {}, strategy_metrics)
             _safe_call(callbacks, "report", report_path)
 
-            metrics_files = save_metrics(details, metrics or {}, strategy_metrics)
+            metrics_files = save_metrics(details, metrics or {}, strategy_metrics, report_path=report_path, equity=equity)
             _safe_call(callbacks, "metrics_files", metrics_files)
+
+            if chiave is not None:
+                _salva_risultato(chiave, {
+                    "strategy_metrics": strategy_metrics,
+                    "report": report_path,
+                    "metrics_files": metrics_files,
+                })
         _safe_call(callbacks, "status", "Completed!")
     except Exception as exc:
         logger.exception("Error during backtest")
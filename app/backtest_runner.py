@@ -0,0 +1,268 @@
+"""
+Subprocess backtest runner with progress streaming, cancel and timeout.
+
+esegui_backtest runs a Lumibot simulation that holds the GIL and its memory
+for the whole run. BacktestRunner executes each request in its own worker
+process instead: the worker calls esegui_backtest with callbacks that forward
+every event (progress_start, status, market, metrics, strategy_metrics,
+report, ...) over a pipe, and a supervisor thread in the parent replays them
+on the caller's `callbacks` dict as they arrive.
+
+Requests are queued FIFO and at most `max_concurrent` run at the same time.
+A queued or running request can be cancelled; a running one is also killed
+when it exceeds its timeout. Either way the caller still receives the closing
+progress_stop / running(False) events, so the UI never stays busy.
+
+Usage:
+    runner = BacktestRunner(max_concurrent=2)
+    job_id = runner.submit("SPY", 10000, start, end, "SMA Cross", callbacks, timeout=600)
+    runner.cancel(job_id)
+"""
+
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Job states reported by jobs() and the "job" callback
+QUEUED, RUNNING, DONE, CANCELLED, TIMEOUT, FAILED = "queued", "running", "done", "cancelled", "timeout", "failed"
+
+_FINE = "__done__"  # Last message of a worker that returned normally
+
+
+def _worker(conn, richiesta):
+    """Subprocess entry point: run esegui_backtest and stream each callback over the pipe."""
+    from app.backtest import esegui_backtest
+
+    def inoltra(nome):
+        def callback(*args):
+            try:
+                conn.send((nome, args))
+            except (BrokenPipeError, OSError):
+                pass  # Parent gone or job cancelled: keep running to the end quietly
+        return callback
+
+    nomi = ["status", "progress_start", "progress_stop", "market", "running", "details",
+            "metrics", "report", "chart", "strategy_metrics", "metrics_files"]
+    try:
+        esegui_backtest(callbacks={nome: inoltra(nome) for nome in nomi}, **richiesta)
+    finally:
+        try:
+            conn.send((_FINE, ()))
+        except (BrokenPipeError, OSError):
+            pass
+        conn.close()
+
+
+class BacktestRunner:
+    """
+    FIFO queue of esegui_backtest requests executed in worker subprocesses.
+
+    Callbacks are invoked from supervisor threads: UI callbacks must hand their
+    work to the GUI thread (the Tkinter app already does, via app.after).
+
+    Args:
+        max_concurrent (int): Backtests running at the same time.
+        default_timeout (float, optional): Seconds before a running job is killed (None = no limit).
+    """
+
+    def __init__(self, max_concurrent=2, default_timeout=None):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.default_timeout = default_timeout
+        self._contesto = multiprocessing.get_context("spawn")  # No forked Tk/MT5 state in the workers
+        self._lock = threading.Lock()
+        self._contatore = itertools.count(1)
+        self._coda = deque()
+        self._lavori = {}
+
+    def submit(self, ticker, capitale, start, end, nome_strategia, callbacks=None, fast=False, parameters=None,
+               timeout=None):
+        """
+        Queue one backtest (same arguments as esegui_backtest).
+
+        Args:
+            ticker (str): Asset symbol.
+            capitale (float): Initial capital in USD.
+            start (datetime.datetime): Backtest start.
+            end (datetime.datetime): Backtest end.
+            nome_strategia (str): Strategy name from STRATEGIES.
+            callbacks (dict, optional): esegui_backtest callback keys, plus:
+                - job: f(job_id, state) on every state change
+            fast (bool): Use the native fast engine.
+            parameters (dict, optional): Strategy parameter overrides.
+            timeout (float, optional): Seconds before the run is killed (defaults to default_timeout).
+
+        Returns:
+            int: Job id for cancel() and jobs().
+        """
+        job_id = next(self._contatore)
+        lavoro = {
+            "id": job_id,
+            "richiesta": {"ticker": ticker, "capitale": capitale, "start": start, "end": end,
+                          "nome_strategia": nome_strategia, "fast": fast, "parameters": parameters},
+            "callbacks": callbacks or {},
+            "timeout": timeout if timeout is not None else self.default_timeout,
+            "stato": QUEUED,
+            "processo": None,
+            "annulla": threading.Event(),
+        }
+        with self._lock:
+            self._lavori[job_id] = lavoro
+            self._coda.append(job_id)
+        self._notifica(lavoro, QUEUED)
+        self._avvia_prossimi()
+        return job_id
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            bool: True if the job was still queued or running.
+        """
+        with self._lock:
+            lavoro = self._lavori.get(job_id)
+            if lavoro is None or lavoro["stato"] not in (QUEUED, RUNNING):
+                return False
+            in_coda = lavoro["stato"] == QUEUED
+            if in_coda:
+                self._coda.remove(job_id)
+                lavoro["stato"] = CANCELLED
+        if in_coda:
+            self._notifica(lavoro, CANCELLED)
+            self._chiama(lavoro, "status", "Backtest cancelled")
+        else:
+            lavoro["annulla"].set()  # The supervisor kills the process and closes the job
+        return True
+
+    def cancel_all(self):
+        """Cancel every queued and running job. Returns the number cancelled."""
+        with self._lock:
+            attivi = [job_id for job_id, lavoro in self._lavori.items() if lavoro["stato"] in (QUEUED, RUNNING)]
+        return sum(self.cancel(job_id) for job_id in attivi)
+
+    def jobs(self):
+        """
+        Snapshot of every submitted job.
+
+        Returns:
+            list: Dicts with id, ticker, strategy and state, in submission order.
+        """
+        with self._lock:
+            return [{"id": l["id"], "ticker": l["richiesta"]["ticker"],
+                     "strategy": l["richiesta"]["nome_strategia"], "state": l["stato"]}
+                    for l in self._lavori.values()]
+
+    def active(self):
+        """Number of queued or running jobs."""
+        with self._lock:
+            return sum(l["stato"] in (QUEUED, RUNNING) for l in self._lavori.values())
+
+    def wait(self, timeout=None):
+        """Block until no job is queued or running. Returns False on timeout."""
+        scadenza = None if timeout is None else time.monotonic() + timeout
+        while self.active():
+            if scadenza is not None and time.monotonic() >= scadenza:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def shutdown(self):
+        """Cancel everything and wait for the supervisors to finish."""
+        self.cancel_all()
+        self.wait(timeout=10)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _chiama(self, lavoro, nome, *args):
+        callback = lavoro["callbacks"].get(nome)
+        if callback:
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception("Backtest callback '%s' failed", nome)
+
+    def _notifica(self, lavoro, stato):
+        self._chiama(lavoro, "job", lavoro["id"], stato)
+
+    def _avvia_prossimi(self):
+        with self._lock:
+            in_corso = sum(l["stato"] == RUNNING for l in self._lavori.values())
+            da_avviare = []
+            while self._coda and in_corso < self.max_concurrent:
+                lavoro = self._lavori[self._coda.popleft()]
+                lavoro["stato"] = RUNNING
+                da_avviare.append(lavoro)
+                in_corso += 1
+        for lavoro in da_avviare:
+            self._notifica(lavoro, RUNNING)
+            threading.Thread(target=self._supervisiona, args=(lavoro,), daemon=True,
+                             name=f"backtest-{lavoro['id']}").start()
+
+    def _supervisiona(self, lavoro):
+        """Start the worker, replay its events, enforce cancel/timeout, then free the slot."""
+        lettura, scrittura = self._contesto.Pipe(duplex=False)
+        processo = self._contesto.Process(target=_worker, args=(scrittura, lavoro["richiesta"]), daemon=True)
+        lavoro["processo"] = processo
+        esito, aperti = FAILED, set()
+        try:
+            processo.start()
+            scrittura.close()  # Parent keeps only the read end: EOF when the worker exits
+            scadenza = time.monotonic() + lavoro["timeout"] if lavoro["timeout"] else None
+            while True:
+                if lavoro["annulla"].is_set():
+                    esito = CANCELLED
+                    break
+                if scadenza is not None and time.monotonic() >= scadenza:
+                    esito = TIMEOUT
+                    break
+                if not lettura.poll(0.1):
+                    continue
+                try:
+                    nome, args = lettura.recv()
+                except EOFError:
+                    break  # Worker died without the closing message
+                if nome == _FINE:
+                    esito = DONE
+                    break
+                if nome == "progress_start":
+                    aperti.add("progress")
+                elif nome == "progress_stop":
+                    aperti.discard("progress")
+                elif nome == "running":
+                    (aperti.add if args and args[0] else aperti.discard)("running")
+                self._chiama(lavoro, nome, *args)
+        except Exception:
+            logger.exception("Backtest job %s supervisor failed", lavoro["id"])
+        finally:
+            if processo.pid is not None:  # start() may have raised: an unstarted process cannot be joined
+                if processo.is_alive():
+                    processo.terminate()
+                processo.join(timeout=5)
+            else:
+                scrittura.close()
+            lettura.close()
+
+        if esito != DONE:
+            messaggi = {
+                CANCELLED: "Backtest cancelled",
+                TIMEOUT: f"Backtest timed out after {lavoro['timeout']:.0f}s" if lavoro["timeout"] else "",
+                FAILED: (f"Backtest worker exited unexpectedly (exit code {processo.exitcode})"
+                         if processo.pid is not None else "Backtest worker could not be started"),
+            }
+            self._chiama(lavoro, "status", messaggi[esito])
+            # Close what the worker opened so the UI does not stay busy
+            if "progress" in aperti:
+                self._chiama(lavoro, "progress_stop")
+            if "running" in aperti:
+                self._chiama(lavoro, "running", False)
+        with self._lock:
+            lavoro["stato"] = esito
+            lavoro["processo"] = None
+        self._notifica(lavoro, esito)
+        self._avvia_prossimi()
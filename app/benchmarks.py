@@ -0,0 +1,570 @@
+"""
+Offline performance benchmarks for the trading engine.
+
+Runs entirely without MetaTrader 5, Groq or network access: the engine is
+driven by FakeMetaTrader5 on a simulated clock, so throttling sleeps cost
+nothing and the measured time is pure engine work.
+
+Usage:
+    python -m app.benchmarks scan --symbols 10 100 1000 --cycles 5
+    python -m app.benchmarks scan --symbols 100 --latency-ms 0.5
+    python -m app.benchmarks vector --bars 5000 20000 --max-hold 300
+    python -m app.benchmarks cache --tickers 100 500 --years 10
+    python -m app.benchmarks metrics --tickers 100 500 --years 1
+    python -m app.benchmarks signals --years 3
+    python -m app.benchmarks logging --records 20000 --threads 1 4
+    python -m app.benchmarks startup --runs 5 --budget 1.5
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.clock import SimulatedClock
+from app.fake_mt5 import FakeMetaTrader5
+from app.replay import engine_offline
+
+
+def _simboli_sintetici(n_symbols):
+    """Build a mixed Forex / Crypto / Equity universe of n synthetic symbols."""
+    percorsi = ["Forex\\Synthetic", "Crypto\\Synthetic", "Stocks\\Synthetic"]
+    simboli, specifiche = [], {}
+    for i in range(n_symbols):
+        nome = f"SYN{i:04d}"
+        simboli.append(nome)
+        specifiche[nome] = {"path": f"{percorsi[i % 3]}\\{nome}"}
+        if i % 3 == 0:
+            specifiche[nome].update(contract_size=100000.0, volume_min=0.01, volume_step=0.01, digits=5)
+    return simboli, specifiche
+
+
+def _ai_stub(seed):
+    """Deterministic AI stand-in: random scores so entries and exits are exercised."""
+    rng = random.Random(seed)
+
+    def analizza(ticker):
+        score = rng.randint(-10, 10)
+        sentiment = "POSITIVO" if score > 0 else "NEGATIVO" if score < 0 else "NEUTRO"
+        return sentiment, score, f"🤖 Score: {score}/10 | benchmark stub"
+
+    return analizza
+
+
+def bench_scan_cycle(n_symbols, cycles=5, latency=0.0, advance=900.0, seed=0):
+    """
+    Measure radar scan-cycle wall time for a universe of n_symbols.
+
+    The first cycle is Phase 1 (massive AI scan of every symbol) and is
+    reported separately from steady-state radar cycles.
+
+    Args:
+        n_symbols (int): Number of synthetic symbols in the watchlist.
+        cycles (int): Steady-state cycles to time after Phase 1.
+        latency (float): Simulated per-call MT5 latency in seconds.
+        advance (float): Virtual seconds added between cycles, so quarantines
+            expire and prices move (0 measures back-to-back cycles).
+        seed (int): Seed for price paths and AI scores.
+
+    Returns:
+        dict: symbols, phase1_s, cycle_median_ms, cycle_p95_ms, per_symbol_us, mt5_calls
+    """
+    clock = SimulatedClock()
+    simboli, specifiche = _simboli_sintetici(n_symbols)
+    fake = FakeMetaTrader5.synthetic(
+        simboli, clock=clock, symbol_specs=specifiche, latency=latency,
+        seed=seed, balance=1_000_000.0, leverage=500,
+    )
+
+    durate = []
+    inizio = [time.perf_counter()]
+
+    with engine_offline(fake, clock, _ai_stub(seed)) as mt5_engine:
+        def on_cycle(stato):
+            durate.append(time.perf_counter() - inizio[0])
+            clock.sleep(advance)
+            inizio[0] = time.perf_counter()
+            if len(durate) > cycles:
+                mt5_engine.spegni_tutto()
+
+        callbacks = {
+            "log": lambda msg, replace_last=False: None,
+            "running": lambda is_trading: None,
+            "cycle": on_cycle,
+        }
+        params = {"ticker": ", ".join(simboli), "budget": "1000", "loss": "1e12", "tg_chat": ""}
+        mt5_engine.stato_motore = "TRADING"
+        mt5_engine._loop_principale("LIVE", callbacks, params)
+
+    steady = sorted(durate[1:]) or [0.0]
+    p95 = steady[min(len(steady) - 1, int(round(0.95 * (len(steady) - 1))))]
+    median = statistics.median(steady)
+    return {
+        "symbols": n_symbols,
+        "phase1_s": durate[0] if durate else 0.0,
+        "cycle_median_ms": median * 1000.0,
+        "cycle_p95_ms": p95 * 1000.0,
+        "per_symbol_us": median / max(n_symbols, 1) * 1e6,
+        "mt5_calls": sum(fake.call_counts.values()),
+    }
+
+
+def bench_vector_grid(n_bars, max_hold=300, seed=0):
+    """
+    Measure the vectorized exit backtester on a synthetic H4 Forex series.
+
+    Sweeps take profit, stop loss and trail multipliers (48 combinations)
+    over the same precomputed windows.
+
+    Args:
+        n_bars (int): Number of H4 bars.
+        max_hold (int): Bars a position may stay open.
+        seed (int): Seed for the price path.
+
+    Returns:
+        dict: bars, candidates, prep_s, run_ms, combos_per_min
+    """
+    from app.vector_backtest import VectorBacktester, engine_signals
+
+    rng = np.random.default_rng(seed)
+    indice = pd.date_range("2015-01-01", periods=n_bars, freq="4h")
+    close = pd.Series(1.1 * np.exp(np.cumsum(rng.normal(0.0, 0.003, n_bars))), index=indice)
+
+    inizio = time.perf_counter()
+    bt = VectorBacktester(close, engine_signals(close), contract_size=100000.0, spread=0.0001, max_hold=max_hold)
+    prep = time.perf_counter() - inizio
+
+    griglia = {
+        "SHORT_TP_RISK_MULT": [1.0, 1.5, 2.0, 3.0],
+        "SHORT_SL_RISK_MULT": [0.5, 1.0, 2.0],
+        "SHORT_TRAIL_PCT": [0.1, 0.15, 0.3, 0.5],
+    }
+    inizio = time.perf_counter()
+    risultati = bt.grid(griglia, budget=100.0, max_loss=30.0)
+    durata = time.perf_counter() - inizio
+    return {
+        "bars": n_bars,
+        "candidates": len(bt.candidati),
+        "prep_s": prep,
+        "run_ms": durata / len(risultati) * 1000.0,
+        "combos_per_min": len(risultati) / durata * 60.0,
+    }
+
+
+def bench_cache_load(n_tickers, years=10, seed=0):
+    """
+    Compare price-cache load time: legacy per-ticker CSV vs memory-mapped Arrow
+    vs the in-process LRU.
+
+    Writes n_tickers synthetic daily OHLCV histories in both formats to a
+    temporary directory, migrates the CSVs, then loads every ticker through
+    get_price_history twice (cache hits only, no network): the first pass maps
+    the Arrow files, the second is served from memory.
+
+    Args:
+        n_tickers (int): Number of tickers.
+        years (int): Years of daily bars per ticker.
+        seed (int): Seed for the price paths.
+
+    Returns:
+        dict: tickers, rows, csv_load_s, arrow_load_s, memory_load_s, speedup,
+              memory_speedup, migrate_s, csv_mb, arrow_mb
+    """
+    from app import market_data
+
+    rng = np.random.default_rng(seed)
+    fine = datetime.date.today()
+    indice = pd.bdate_range(end=fine, periods=int(years * 252), name="Date")
+    simboli = [f"SYN{i:04d}" for i in range(n_tickers)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for simbolo in simboli:
+            close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, len(indice))))
+            pd.DataFrame({"Close": close, "High": close * 1.01, "Low": close * 0.99, "Open": close,
+                          "Volume": rng.integers(1e5, 1e7, len(indice))}, index=indice).to_csv(f"{tmp}/{simbolo}.csv")
+        csv_mb = sum(os.path.getsize(f"{tmp}/{s}.csv") for s in simboli) / 1e6
+
+        inizio = time.perf_counter()
+        for simbolo in simboli:
+            pd.read_csv(f"{tmp}/{simbolo}.csv", parse_dates=["Date"], index_col="Date")
+        csv_s = time.perf_counter() - inizio
+
+        inizio = time.perf_counter()
+        market_data.migrate_csv_cache(tmp)
+        migrate_s = time.perf_counter() - inizio
+        arrow_mb = sum(os.path.getsize(f"{tmp}/{s}.arrow") for s in simboli) / 1e6
+
+        capacita = market_data.price_cache_stats()["capacity"]
+        market_data.clear_price_cache_memory(capacity=n_tickers)
+        try:
+            tempi = []
+            for _ in range(2):
+                inizio = time.perf_counter()
+                for simbolo in simboli:
+                    market_data.get_price_history(simbolo, indice[0].date(), fine, cache_dir=tmp)
+                tempi.append(time.perf_counter() - inizio)
+            arrow_s, memoria_s = tempi
+        finally:
+            market_data.clear_price_cache_memory(capacity=capacita)
+
+    return {
+        "tickers": n_tickers,
+        "rows": len(indice),
+        "csv_load_s": csv_s,
+        "arrow_load_s": arrow_s,
+        "memory_load_s": memoria_s,
+        "speedup": csv_s / arrow_s if arrow_s > 0 else float("inf"),
+        "memory_speedup": arrow_s / memoria_s if memoria_s > 0 else float("inf"),
+        "migrate_s": migrate_s,
+        "csv_mb": csv_mb,
+        "arrow_mb": arrow_mb,
+    }
+
+
+def bench_metrics_batch(n_tickers, years=10, window=63, seed=0):
+    """
+    Rank a synthetic universe: per-ticker compute_market_metrics loop vs the batch pass.
+
+    A third of the columns follow a weekday calendar (NaN on weekends) so the
+    batch path is measured with mixed calendars, as in a stock + crypto basket.
+
+    Args:
+        n_tickers (int): Number of tickers.
+        years (int): Years of daily rows.
+        window (int): Rolling window for the batch rolling outputs.
+        seed (int): Seed for the price paths.
+
+    Returns:
+        dict: tickers, rows, loop_ms, batch_ms, batch_rolling_ms, speedup
+    """
+    from app.market_data import compute_market_metrics, compute_market_metrics_batch
+
+    rng = np.random.default_rng(seed)
+    indice = pd.date_range(end=datetime.date.today(), periods=int(years * 365), freq="D")
+    prezzi = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, (len(indice), n_tickers)), axis=0))
+    closes = pd.DataFrame(prezzi, index=indice, columns=[f"SYN{i:04d}" for i in range(n_tickers)])
+    closes.loc[closes.index.dayofweek >= 5, closes.columns[: n_tickers // 3]] = np.nan
+
+    inizio = time.perf_counter()
+    ciclo = pd.DataFrame({c: compute_market_metrics(closes[c]) for c in closes}).T
+    ciclo.sort_values("cagr", ascending=False)
+    loop_s = time.perf_counter() - inizio
+
+    inizio = time.perf_counter()
+    compute_market_metrics_batch(closes, rolling_window=None)["metrics"].sort_values("cagr", ascending=False)
+    batch_s = time.perf_counter() - inizio
+
+    inizio = time.perf_counter()
+    compute_market_metrics_batch(closes, rolling_window=window)
+    rolling_s = time.perf_counter() - inizio
+
+    return {
+        "tickers": n_tickers,
+        "rows": len(indice),
+        "loop_ms": loop_s * 1000,
+        "batch_ms": batch_s * 1000,
+        "batch_rolling_ms": rolling_s * 1000,
+        "speedup": loop_s / batch_s if batch_s > 0 else float("inf"),
+    }
+
+
+def bench_strategy_signals(years=3, repeats=3, seed=0):
+    """
+    Lumibot backtest time with and without precomputed strategy signals.
+
+    Runs SMA Cross and RSI Mean Reversion headless on a synthetic daily
+    history (no cache, no network), once through the live indicator path and
+    once with precompute_signals, and checks both produce the same metrics.
+    Each path runs once untimed first (imports, first-call costs), then the
+    median of `repeats` alternating runs is reported, so run order does not
+    decide the result.
+
+    Args:
+        years (int): Backtest length in years (plus the usual warm-up).
+        repeats (int): Timed runs per path (the median is reported).
+        seed (int): Seed for the price path.
+
+    Returns:
+        list: One dict per strategy: strategy, days, live_s, precomputed_s, speedup, same_metrics
+    """
+    from app import config
+    from app.backtest import _run_strategy_backtest
+    from app.strategy import STRATEGIES
+
+    rng = np.random.default_rng(seed)
+    fine = datetime.datetime(2024, 12, 31)
+    inizio = fine - datetime.timedelta(days=int(years * 365))
+    indice = pd.bdate_range(inizio - datetime.timedelta(days=config.BACKTEST_WARMUP_DAYS), fine, name="Date")
+    close = 400.0 * np.exp(np.cumsum(rng.normal(0.0, 0.012, len(indice))))
+    storico = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                            "Volume": 1e6}, index=indice)
+
+    righe = []
+    for nome, classe in STRATEGIES.items():
+        if not hasattr(classe, "precompute_signals"):
+            continue
+        def esegui(precompute):
+            return _run_strategy_backtest(classe, "SYN", 10000.0, inizio, fine, interactive=False,
+                                          history=storico, precompute=precompute)
+
+        metriche = [esegui(False), esegui(True)]  # Warm-up, also used for the metrics comparison
+        misure = {False: [], True: []}
+        for _ in range(max(repeats, 1)):
+            for precompute in (False, True):
+                t0 = time.perf_counter()
+                esegui(precompute)
+                misure[precompute].append(time.perf_counter() - t0)
+        tempi = [statistics.median(misure[False]), statistics.median(misure[True])]
+        righe.append({
+            "strategy": nome,
+            "days": int(((indice >= inizio) & (indice <= fine)).sum()),
+            "live_s": tempi[0],
+            "precomputed_s": tempi[1],
+            "speedup": tempi[0] / tempi[1] if tempi[1] > 0 else float("inf"),
+            "same_metrics": metriche[0] == metriche[1],
+        })
+    return righe
+
+
+def bench_logging(n_records, threads=1):
+    """
+    Log-call latency: direct file + console handlers vs the queue listener.
+
+    Each configuration writes n_records INFO records (with an `extra` field)
+    from `threads` threads into a temporary directory; the console sink is
+    redirected to os.devnull so the terminal speed does not count.
+
+    Args:
+        n_records (int): Records per configuration (split across the threads).
+        threads (int): Concurrent logging threads (radar + UI + workers).
+
+    Returns:
+        dict: records, threads, direct_us, direct_p99_us, queue_us, queue_p99_us, queue_drain_ms, speedup
+    """
+    from app.logging_setup import LOG_FORMAT, configure_logging, shutdown_logging
+
+    def misura(logger):
+        latenze = []
+
+        def scrivi(n):
+            locali = []
+            for i in range(n):
+                t0 = time.perf_counter()
+                logger.info("radar cycle %d symbol %s", i, "EURUSD", extra={"cycle": i})
+                locali.append(time.perf_counter() - t0)
+            latenze.extend(locali)
+
+        lavoratori = [threading.Thread(target=scrivi, args=(n_records // threads,)) for _ in range(threads)]
+        for t in lavoratori:
+            t.start()
+        for t in lavoratori:
+            t.join()
+        return np.asarray(latenze) * 1e6
+
+    root = logging.getLogger()
+    originali, livello = list(root.handlers), root.level
+    logger = logging.getLogger("app.benchmarks.logging")
+    with tempfile.TemporaryDirectory() as cartella, open(os.devnull, "w") as nulla, \
+            contextlib.redirect_stderr(nulla):
+        for h in originali:
+            root.removeHandler(h)
+        try:
+            # Direct: the calling thread formats and writes under each handler lock
+            diretti = [logging.FileHandler(os.path.join(cartella, "direct.log"), encoding="utf-8"),
+                       logging.StreamHandler()]
+            for h in diretti:
+                h.setFormatter(logging.Formatter(LOG_FORMAT))
+                root.addHandler(h)
+            root.setLevel(logging.INFO)
+            diretto = misura(logger)
+            for h in diretti:
+                root.removeHandler(h)
+                h.close()
+
+            # Queue: one put per call, the listener thread does the I/O
+            configure_logging(cartella, "queue.log", json_file="queue.jsonl")
+            coda = misura(logger)
+            t0 = time.perf_counter()
+            shutdown_logging()  # Drains what the listener has not written yet
+            drain_s = time.perf_counter() - t0
+        finally:
+            shutdown_logging()
+            for h in list(root.handlers):
+                root.removeHandler(h)
+            for h in originali:
+                root.addHandler(h)
+            root.setLevel(livello)
+
+    return {
+        "records": len(coda),
+        "threads": threads,
+        "direct_us": float(diretto.mean()),
+        "direct_p99_us": float(np.percentile(diretto, 99)),
+        "queue_us": float(coda.mean()),
+        "queue_p99_us": float(np.percentile(coda, 99)),
+        "queue_drain_ms": drain_s * 1000,
+        "speedup": float(diretto.mean() / coda.mean()),
+    }
+
+
+# Modules app.main must not import before the window is up (loaded lazily on first use)
+HEAVY_STARTUP_MODULES = ["pandas", "numpy", "pandas_ta", "MetaTrader5", "requests", "yfinance", "groq",
+                         "newsapi", "feedparser", "pyarrow", "lumibot", "streamlit"]
+
+# Runs in a fresh interpreter: time `import app.main` and, with a display, the first drawn frame
+_SONDA_AVVIO = """
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+esito = {"import_s": time.perf_counter() - t0, "window_s": None,
+         "loaded": [m for m in HEAVY if m in sys.modules]}
+try:
+    from app import config
+    config.STARTUP_DEFERRED_MS = 10 ** 7  # Measure the window alone: no MT5 connection or dashboard
+    from app.ui import TradingApp
+    app = TradingApp()
+    app.app.update()
+    esito["window_s"] = time.perf_counter() - t0
+    esito["loaded"] = [m for m in HEAVY if m in sys.modules]
+    app.app.destroy()
+except Exception as e:  # No display (CI): only the import time is measured
+    esito["error"] = f"{type(e).__name__}: {e}"
+print(json.dumps(esito))
+"""
+
+
+def bench_startup(runs=5, budget=None):
+    """
+    Time-to-first-window of the app entry point, each run in a fresh interpreter.
+
+    Measures `import app.main` and, when a display is available, the
+    construction and first update() of TradingApp. The budget applies to the
+    median first-window time (the median import time without a display); a
+    heavy module loaded before the window also fails the run.
+
+    Args:
+        runs (int): Fresh-interpreter runs (the median is reported).
+        budget (float, optional): Seconds allowed (defaults to config.STARTUP_BUDGET_SECONDS).
+
+    Returns:
+        dict: runs, import_s, window_s, budget_s, heavy_loaded, within_budget
+    """
+    from app import config
+
+    budget = config.STARTUP_BUDGET_SECONDS if budget is None else budget
+    radice = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ambiente = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [radice, os.environ.get("PYTHONPATH")])))
+    sonda = f"HEAVY = {HEAVY_STARTUP_MODULES!r}\n{_SONDA_AVVIO}"
+
+    misure = []
+    for _ in range(runs):
+        uscita = subprocess.run([sys.executable, "-c", sonda], capture_output=True, text=True, env=ambiente,
+                                check=True)
+        misure.append(json.loads(uscita.stdout.strip().splitlines()[-1]))
+
+    import_s = statistics.median(m["import_s"] for m in misure)
+    finestre = [m["window_s"] for m in misure if m["window_s"] is not None]
+    window_s = statistics.median(finestre) if finestre else None
+    pesanti = sorted({p for m in misure for p in m["loaded"]})
+    misurato = window_s if window_s is not None else import_s
+    return {
+        "runs": runs,
+        "import_s": import_s,
+        "window_s": window_s if window_s is not None else "n/a",
+        "budget_s": budget,
+        "heavy_loaded": ",".join(pesanti) or "-",
+        "within_budget": misurato <= budget and not pesanti,
+    }
+
+
+def _stampa_tabella(righe, colonne):
+    print("  ".join(f"{c:>16}" for c in colonne))
+    for riga in righe:
+        print("  ".join(f"{riga[c]:>16.2f}" if isinstance(riga[c], float) else f"{riga[c]:>16}" for c in colonne))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QUANT AI TERMINAL offline benchmarks")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    scan = sub.add_parser("scan", help="Radar scan-cycle time on FakeMetaTrader5")
+    scan.add_argument("--symbols", type=int, nargs="+", default=[10, 100, 1000])
+    scan.add_argument("--cycles", type=int, default=5)
+    scan.add_argument("--latency-ms", type=float, default=0.0)
+    scan.add_argument("--advance", type=float, default=900.0, help="Virtual seconds between cycles")
+    scan.add_argument("--seed", type=int, default=0)
+
+    vector = sub.add_parser("vector", help="Vectorized exit-rule backtester grid throughput")
+    vector.add_argument("--bars", type=int, nargs="+", default=[5000, 20000])
+    vector.add_argument("--max-hold", type=int, default=300)
+    vector.add_argument("--seed", type=int, default=0)
+
+    cache = sub.add_parser("cache", help="Price-cache load time: CSV vs memory-mapped Arrow vs in-process LRU")
+    cache.add_argument("--tickers", type=int, nargs="+", default=[100, 500])
+    cache.add_argument("--years", type=int, default=10)
+    cache.add_argument("--seed", type=int, default=0)
+
+    metrics = sub.add_parser("metrics", help="Universe ranking: per-ticker metrics loop vs batch pass")
+    metrics.add_argument("--tickers", type=int, nargs="+", default=[100, 500])
+    metrics.add_argument("--years", type=int, default=1)
+    metrics.add_argument("--window", type=int, default=63)
+    metrics.add_argument("--seed", type=int, default=0)
+
+    signals = sub.add_parser("signals", help="Lumibot backtest time: live indicators vs precomputed signals")
+    signals.add_argument("--years", type=int, default=3)
+    signals.add_argument("--repeats", type=int, default=3, help="Timed runs per path (median reported)")
+    signals.add_argument("--seed", type=int, default=0)
+
+    log = sub.add_parser("logging", help="Log-call latency: direct handlers vs queue listener")
+    log.add_argument("--records", type=int, default=20000)
+    log.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+
+    startup = sub.add_parser("startup", help="Time-to-first-window budget of the app entry point (exit 1 if over)")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--budget", type=float, default=None, help="Seconds (defaults to STARTUP_BUDGET_SECONDS)")
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "scan":
+        righe = [bench_scan_cycle(n, cycles=args.cycles, latency=args.latency_ms / 1000.0,
+                                  advance=args.advance, seed=args.seed)
+                 for n in args.symbols]
+        _stampa_tabella(righe, ["symbols", "phase1_s", "cycle_median_ms", "cycle_p95_ms", "per_symbol_us", "mt5_calls"])
+    elif args.comando == "vector":
+        righe = [bench_vector_grid(n, max_hold=args.max_hold, seed=args.seed) for n in args.bars]
+        _stampa_tabella(righe, ["bars", "candidates", "prep_s", "run_ms", "combos_per_min"])
+    elif args.comando == "cache":
+        righe = [bench_cache_load(n, years=args.years, seed=args.seed) for n in args.tickers]
+        _stampa_tabella(righe, ["tickers", "rows", "csv_load_s", "arrow_load_s", "memory_load_s", "speedup",
+                                "memory_speedup", "migrate_s", "csv_mb", "arrow_mb"])
+    elif args.comando == "metrics":
+        righe = [bench_metrics_batch(n, years=args.years, window=args.window, seed=args.seed) for n in args.tickers]
+        _stampa_tabella(righe, ["tickers", "rows", "loop_ms", "batch_ms", "batch_rolling_ms", "speedup"])
+    elif args.comando == "signals":
+        righe = bench_strategy_signals(years=args.years, repeats=args.repeats, seed=args.seed)
+        _stampa_tabella(righe, ["strategy", "days", "live_s", "precomputed_s", "speedup", "same_metrics"])
+    elif args.comando == "logging":
+        righe = [bench_logging(args.records, threads=n) for n in args.threads]
+        _stampa_tabella(righe, ["records", "threads", "direct_us", "direct_p99_us", "queue_us", "queue_p99_us",
+                                "queue_drain_ms", "speedup"])
+    elif args.comando == "startup":
+        riga = bench_startup(runs=args.runs, budget=args.budget)
+        _stampa_tabella([riga], ["runs", "import_s", "window_s", "budget_s", "heavy_loaded", "within_budget"])
+        return 0 if riga["within_budget"] else 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+"""
+Latest-value-wins state channel between engine threads and the UI.
+
+The radar loop publishes the account state every iteration, far more often
+than a human can read it. Instead of scheduling one GUI callback per update,
+the engine overwrites a single shared slot and the UI polls it at its own
+frame rate: intermediate values are simply replaced, never queued.
+
+Publishing an unchanged value does not bump the version, so an idle account
+costs the UI one integer comparison per poll.
+
+Usage:
+    canale = LatestValue()
+    canale.publish((cash, positions))          # Engine thread
+    versione, valore = canale.poll(versione)   # GUI thread; valore is None if nothing changed
+"""
+
+import threading
+
+
+class LatestValue:
+    """
+    Thread-safe single-slot channel: the last published value wins.
+
+    Args:
+        initial (object, optional): Value returned before the first publish.
+    """
+
+    def __init__(self, initial=None):
+        self._lock = threading.Lock()
+        self._valore = initial
+        self._versione = 0
+
+    def publish(self, value):
+        """
+        Overwrite the slot (O(1), never blocks on the reader).
+
+        Returns:
+            bool: True if the value changed (and the version was bumped).
+        """
+        with self._lock:
+            if self._versione and value == self._valore:
+                return False
+            self._valore = value
+            self._versione += 1
+            return True
+
+    def poll(self, seen_version=0):
+        """
+        Read the slot if it changed since `seen_version`.
+
+        Args:
+            seen_version (int): Version returned by the previous poll (0 = never read).
+
+        Returns:
+            tuple: (version, value), with value None when nothing newer was published.
+        """
+        with self._lock:
+            if self._versione == seen_version:
+                return seen_version, None
+            return self._versione, self._valore
+
+    @property
+    def version(self):
+        """Number of distinct values published so far."""
+        return self._versione
@@ -0,0 +1,79 @@
+"""
+Time sources for the trading engine.
+
+The live engine reads wall-clock time and sleeps for real. Offline tools
+(benchmarks, replays) swap in a simulated clock so that throttling sleeps,
+quarantine timers, the Friday shield and the midnight reset all run on
+virtual time, far faster than real time.
+"""
+
+import datetime
+import time
+
+
+class SystemClock:
+    """Wall-clock time source used by the live engine."""
+
+    def time(self):
+        """Return the current UNIX timestamp (seconds)."""
+        return time.time()
+
+    def sleep(self, seconds):
+        """Block the calling thread for the given number of seconds."""
+        time.sleep(seconds)
+
+    def now(self):
+        """Return the current local datetime."""
+        return datetime.datetime.now()
+
+    def utcnow(self):
+        """Return the current naive UTC datetime."""
+        return datetime.datetime.utcnow()
+
+
+class SimulatedClock:
+    """
+    Virtual time source: sleep() advances time instantly instead of blocking.
+
+    Local and UTC datetimes are both derived from the virtual timestamp in UTC,
+    so simulations are reproducible regardless of the host timezone.
+
+    Args:
+        start (float or datetime.datetime): Initial virtual time.
+    """
+
+    def __init__(self, start=None):
+        if start is None:
+            start = time.time()
+        elif isinstance(start, datetime.datetime):
+            start = to_timestamp(start)
+        self._adesso = float(start)
+
+    def time(self):
+        """Return the current virtual UNIX timestamp."""
+        return self._adesso
+
+    def sleep(self, seconds):
+        """Advance virtual time without blocking."""
+        if seconds > 0:
+            self._adesso += seconds
+
+    def advance_to(self, timestamp):
+        """Jump forward to the given UNIX timestamp (never moves backwards)."""
+        if timestamp > self._adesso:
+            self._adesso = float(timestamp)
+
+    def now(self):
+        """Return the virtual datetime (UTC based, naive)."""
+        return datetime.datetime.utcfromtimestamp(self._adesso)
+
+    def utcnow(self):
+        """Return the virtual naive UTC datetime."""
+        return datetime.datetime.utcfromtimestamp(self._adesso)
+
+
+def to_timestamp(value):
+    """Convert a naive (assumed UTC) or aware datetime to a UNIX timestamp."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
@@ -30,4 +30,59 @@ COLOR_CHART_LINE = "#2dd4bf"  # Teal (chart lines, data visualization)
 
 # Terminal/Console Styling (Hacker aesthetic for live trading logs)
 COLOR_TERM_BG = "#000000"     # Pure black terminal background
-COLOR_TERM_TEXT = "#10b981"   # Emerald green text (classic CRT look)
\ No newline at end of file
+COLOR_TERM_TEXT = "#10b981"   # Emerald green text (classic CRT look)
+
+# Pre-set institutional asset baskets (MT5 broker names, may vary from broker to broker)
+WATCHLIST_PRESETS = {
+    "👑 TITAN (Follow The Sun + Autopilot)": "AUTOPILOT, EURUSD, GBPUSD, USDJPY, BTCUSD, ETHUSD",
+    "💱 Forex Majors": "EURUSD, GBPUSD, USDJPY, USDCAD, AUDUSD",
+    "🪙 Crypto Assets": "BTCUSD, ETHUSD",
+    "🦅 Top 15 US Stocks (Tech & Defense)": "AAPL.OQ, MSFT.OQ, NVDA.OQ, TSLA.OQ, AMZN.OQ, META.OQ, GOOGL.OQ, JNJ.OQ, PG.OQ, KO.OQ, PEP.OQ, WMT.OQ, MCD.OQ, LMT.OQ, V.OQ"
+}
+
+# Price Cache
+PRICE_CACHE_MEMORY_TICKERS = 64    # Tickers kept in the in-process LRU over the disk cache
+
+# Backtesting
+BACKTEST_WARMUP_DAYS = 400         # Calendar days of history loaded before the start for indicator lookbacks
+BACKTEST_RISK_FREE_RATE = 0.0      # Fixed risk-free rate for Sharpe (avoids a ^IRX download per run)
+BACKTEST_RESULT_CACHE_DIR = "cache/backtests"  # Memoized esegui_backtest results ("" disables them)
+BACKTEST_MAX_CONCURRENT = 2        # Backtest worker processes running at once (UI queue)
+BACKTEST_TIMEOUT_SECONDS = 900     # A queued UI backtest is killed after this long (0 = no limit)
+BACKTEST_UI_YEARS = 5              # Period of the backtests queued from the UI (years up to today)
+STRATEGY_NAMES = ["ATH Dip", "SMA Cross", "RSI Mean Reversion"]  # Keys of app.strategy.STRATEGIES (listed without importing Lumibot)
+
+# Activity Terminal (UI)
+TERMINAL_FLUSH_MS = 100            # Pending log lines are inserted in one batch at this interval (10 Hz)
+TERMINAL_MAX_LINES = 2000          # Lines kept in the textbox; older ones are trimmed
+TERMINAL_BUFFER_LINES = 5000       # Pending lines between flushes; beyond this the oldest are dropped and counted
+STARTUP_DEFERRED_MS = 300          # MT5 connection and web dashboard start this long after the window is shown
+STARTUP_BUDGET_SECONDS = 1.5       # Time-to-first-window budget enforced by `python -m app.benchmarks startup`
+PORTFOLIO_POLL_MS = 250            # UI poll interval of the latest-value portfolio channel (app/channel.py)
+
+# Metrics Store
+METRICS_STORE_PATH = "reports/metrics.sqlite"  # Append-only SQLite store of every backtest run (app/storage.py)
+METRICS_FILE_EXPORTS = True        # Also write the per-run metrics_<timestamp>.json/.csv pair
+METRICS_CURVE_POINTS = 400         # Equity/drawdown points kept per run (LTTB downsampling)
+
+# Dual-Horizon Exit Rules (MT5 live engine, replay and vectorized backtester)
+# Risk unit: limite_base = budget * RISK_UNIT_PCT. Thresholds are in net USD (after commission).
+COMMISSION_PER_LOT = 6.0           # USD commission per lot (bid-ask equivalent)
+RISK_UNIT_PCT = 0.03               # Fraction of the total budget used as base risk unit
+
+SHORT_TP_RISK_MULT = 1.5           # Short-term take profit: max(risk * 1.5, commission * 3)
+SHORT_TP_COMM_MULT = 3.0
+SHORT_SL_RISK_MULT = 1.0           # Short-term stop loss: -max(risk, commission * 1.5)
+SHORT_SL_COMM_MULT = 1.5
+SHORT_TRAIL_COMM_MULT = 1.5        # Short-term trail armed above commission * 1.5...
+SHORT_TRAIL_PCT = 0.15             # ...and fired on a 0.15% pullback from the trade peak
+
+LONG_SL_RISK_MULT = 4.0            # Long-term (immune) stop: -max(risk * 4, commission * 5)
+LONG_SL_COMM_MULT = 5.0
+LONG_TRAIL_COMM_MULT = 3.0         # Long-term trail armed above commission * 3...
+LONG_TRAIL_PCT = 3.0               # ...and fired on a 3% pullback from the trade peak
+
+# Quarantines (seconds an asset is ignored by the radar)
+QUARANTINE_SKIP_SECONDS = 600      # After an AI/guard skip
+QUARANTINE_LOSS_SECONDS = 3600     # After 2 consecutive short-term losses
+QUARANTINE_WIN_SECONDS = 7200      # Victory cooldown after a profitable close
@@ -0,0 +1,260 @@
+"""
+Online live-equity and risk accumulator for the MT5 engine.
+
+Fed with account_info().equity once per radar cycle, it keeps the running
+peak, current and maximum drawdown, intraday open/high/low/drawdown and a
+Welford mean/variance of per-update returns. Every update is O(1) in time
+and memory: nothing is recomputed from history.
+
+Persistence:
+- A live JSON snapshot is rewritten atomically at most every
+  EQUITY_SNAPSHOT_SECONDS (read by web_dashboard.py)
+- At each day boundary the closed day is appended to a CSV history
+  (one row per day: open/high/low/close, drawdowns, return stats)
+- On start the session peak and return stats are restored from the last
+  snapshot, so a restart does not reset the drawdown reference
+
+Configuration (.env or environment):
+- EQUITY_STATE_FILE=equity_state.json      Live snapshot ("" disables it)
+- EQUITY_HISTORY_FILE=equity_history.csv   Daily rows ("" disables them)
+- EQUITY_SNAPSHOT_SECONDS=2                Minimum seconds between snapshot writes
+- MAX_INTRADAY_DRAWDOWN_PCT=0              Kill-switch on the drawdown from the day's
+                                           equity high, in percent (0 = off)
+"""
+
+import csv
+import datetime
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLUMNS = [
+    "date", "open", "high", "low", "close", "peak", "drawdown", "max_drawdown",
+    "intraday_max_drawdown", "updates", "return_mean", "return_std",
+]
+
+
+class EquityTracker:
+    """
+    Streaming equity statistics with constant cost per update.
+
+    Usage in the radar loop:
+        equity_tracker.update(acc_live.equity, orologio.now())
+        if equity_tracker.intraday_drawdown_breached(): ...
+
+    Args:
+        state_file (str, optional): Live JSON snapshot path (None: in memory only).
+        history_file (str, optional): Daily CSV history path (None: not written).
+        snapshot_interval (float): Minimum seconds between snapshot writes.
+        max_intraday_drawdown_pct (float): Intraday drawdown limit in percent (0 = off).
+    """
+
+    def __init__(self, state_file=None, history_file=None, snapshot_interval=2.0,
+                 max_intraday_drawdown_pct=0.0):
+        self.state_file = state_file
+        self.history_file = history_file
+        self.snapshot_interval = snapshot_interval
+        self.max_intraday_drawdown_pct = max_intraday_drawdown_pct
+
+        self._lock = threading.Lock()
+        self._ultima_scrittura = 0.0
+        self._azzera_sessione()
+        self._giorno = None
+        self._azzera_giorno(None, 0.0)
+
+    @classmethod
+    def from_env(cls):
+        """Build a tracker from EQUITY_* environment variables, resuming the last snapshot."""
+        tracker = cls(
+            state_file=os.getenv("EQUITY_STATE_FILE", "equity_state.json") or None,
+            history_file=os.getenv("EQUITY_HISTORY_FILE", "equity_history.csv") or None,
+            snapshot_interval=float(os.getenv("EQUITY_SNAPSHOT_SECONDS", "2")),
+            max_intraday_drawdown_pct=float(os.getenv("MAX_INTRADAY_DRAWDOWN_PCT", "0")),
+        )
+        tracker.restore()
+        return tracker
+
+    def _azzera_sessione(self):
+        self.equity = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        self.updates = 0
+        self._media = 0.0
+        self._m2 = 0.0
+        self._n_ritorni = 0
+
+    def _azzera_giorno(self, giorno, equity):
+        self._giorno = giorno
+        self.day_open = self.day_high = self.day_low = equity
+        self.intraday_max_drawdown = 0.0
+
+    # ------------------------------------------------------------------
+    # Hot path
+    # ------------------------------------------------------------------
+    def update(self, equity, adesso):
+        """
+        Fold one equity reading into the running statistics.
+
+        Args:
+            equity (float): Account equity (account_info().equity).
+            adesso (datetime.datetime): Engine time (orologio.now()), which sets the day boundary.
+        """
+        if equity is None or equity <= 0:
+            return
+        giorno = adesso.date()
+        with self._lock:
+            if giorno != self._giorno:
+                if self._giorno is not None and self.updates:
+                    self._chiudi_giorno()
+                self._azzera_giorno(giorno, equity)
+
+            if self.equity > 0:
+                # Welford: numerically stable running mean/variance of per-update returns
+                ritorno = equity / self.equity - 1.0
+                self._n_ritorni += 1
+                delta = ritorno - self._media
+                self._media += delta / self._n_ritorni
+                self._m2 += delta * (ritorno - self._media)
+
+            self.equity = equity
+            self.updates += 1
+            self.peak = max(self.peak, equity)
+            self.max_drawdown = min(self.max_drawdown, equity / self.peak - 1.0)
+            self.day_high = max(self.day_high, equity)
+            self.day_low = min(self.day_low, equity)
+            self.intraday_max_drawdown = min(self.intraday_max_drawdown, equity / self.day_high - 1.0)
+
+        if self.state_file and time.monotonic() - self._ultima_scrittura >= self.snapshot_interval:
+            self.save()
+
+    def intraday_drawdown_breached(self):
+        """True when the drawdown from today's equity high reaches MAX_INTRADAY_DRAWDOWN_PCT."""
+        if self.max_intraday_drawdown_pct <= 0 or self.day_high <= 0:
+            return False
+        return (self.equity / self.day_high - 1.0) * 100.0 <= -self.max_intraday_drawdown_pct
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def snapshot(self):
+        """
+        Return the current statistics.
+
+        Returns:
+            dict: equity, peak, drawdown, max_drawdown, day, day_open/high/low,
+                  intraday_drawdown, intraday_max_drawdown, updates, return_mean,
+                  return_std (per update), kill_switch_pct and updated_at.
+        """
+        with self._lock:
+            varianza = self._m2 / (self._n_ritorni - 1) if self._n_ritorni > 1 else 0.0
+            return {
+                "equity": self.equity,
+                "peak": self.peak,
+                "drawdown": self.equity / self.peak - 1.0 if self.peak else 0.0,
+                "max_drawdown": self.max_drawdown,
+                "day": self._giorno.isoformat() if self._giorno else None,
+                "day_open": self.day_open,
+                "day_high": self.day_high,
+                "day_low": self.day_low,
+                "intraday_drawdown": self.equity / self.day_high - 1.0 if self.day_high else 0.0,
+                "intraday_max_drawdown": self.intraday_max_drawdown,
+                "updates": self.updates,
+                "return_mean": self._media,
+                "return_std": math.sqrt(varianza),
+                "return_count": self._n_ritorni,
+                "return_m2": self._m2,
+                "kill_switch_pct": self.max_intraday_drawdown_pct,
+                "updated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def save(self):
+        """Atomically rewrite the live JSON snapshot."""
+        self._ultima_scrittura = time.monotonic()
+        percorso = Path(self.state_file)
+        tmp_path = percorso.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+            os.replace(tmp_path, percorso)
+        except OSError as exc:
+            logger.warning("Equity snapshot not written: %s", exc)
+
+    def restore(self):
+        """
+        Resume the session peak, drawdown and return stats from the last snapshot.
+
+        The intraday fields are resumed only when the snapshot belongs to the
+        current day; otherwise that day is appended to the history first.
+        """
+        stato = read_equity_state(self.state_file)
+        if not stato or not stato.get("equity"):
+            return
+        with self._lock:
+            self.equity = stato["equity"]
+            self.peak = stato.get("peak", self.equity)
+            self.max_drawdown = stato.get("max_drawdown", 0.0)
+            self.updates = stato.get("updates", 0)
+            self._media = stato.get("return_mean", 0.0)
+            self._m2 = stato.get("return_m2", 0.0)
+            self._n_ritorni = stato.get("return_count", 0)
+            if stato.get("day"):
+                self._giorno = datetime.date.fromisoformat(stato["day"])
+                self.day_open = stato.get("day_open", self.equity)
+                self.day_high = stato.get("day_high", self.equity)
+                self.day_low = stato.get("day_low", self.equity)
+                self.intraday_max_drawdown = stato.get("intraday_max_drawdown", 0.0)
+
+    def _chiudi_giorno(self):
+        """Append the closing day to the CSV history and persist the snapshot (lock held)."""
+        if not self.history_file:
+            return
+        varianza = self._m2 / (self._n_ritorni - 1) if self._n_ritorni > 1 else 0.0
+        riga = [
+            self._giorno.isoformat(), self.day_open, self.day_high, self.day_low, self.equity,
+            self.peak, self.equity / self.peak - 1.0 if self.peak else 0.0, self.max_drawdown,
+            self.intraday_max_drawdown, self.updates, self._media, math.sqrt(varianza),
+        ]
+        percorso = Path(self.history_file)
+        try:
+            nuovo = not percorso.exists()
+            with percorso.open("a", newline="", encoding="utf-8") as handle:
+                scrittore = csv.writer(handle)
+                if nuovo:
+                    scrittore.writerow(HISTORY_COLUMNS)
+                scrittore.writerow(riga)
+        except OSError as exc:
+            logger.warning("Equity history not written: %s", exc)
+        # Force a snapshot on the first update of the new day
+        self._ultima_scrittura = 0.0
+
+
+def read_equity_state(path=None):
+    """
+    Read the live equity snapshot written by the engine (e.g. from the web dashboard).
+
+    Args:
+        path (str, optional): Snapshot path (defaults to EQUITY_STATE_FILE).
+
+    Returns:
+        dict: The snapshot, or {} when missing or unreadable.
+    """
+    path = path or os.getenv("EQUITY_STATE_FILE", "equity_state.json")
+    if not path:
+        return {}
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+# Shared instance fed by the engine loop
+equity_tracker = EquityTracker.from_env()
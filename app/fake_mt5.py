@@ -0,0 +1,468 @@
+"""
+Offline stand-in for the MetaTrader5 Python API.
+
+Implements the subset of the MetaTrader5 surface used by app.mt5_engine
+(initialize, symbol_info, symbol_info_tick, copy_rates_from_pos, positions_get,
+order_send, order_calc_margin, account_info, symbols_get, terminal_info, plus
+symbol_select/shutdown/last_error) on top of synthetic or recorded price paths.
+This lets the engine run on Linux CI boxes with no terminal installed.
+
+Price Model:
+- Each symbol is a PricePath: sorted timestamps with bid/ask quotes
+- The current quote is the last point at or before the clock time
+- Bars for any timeframe are aggregated from the path (no lookahead: the
+  current bar only includes points up to the clock time)
+
+Usage:
+    fake = FakeMetaTrader5.synthetic(["EURUSD", "BTCUSD"], clock=SimulatedClock())
+    install(fake)                   # before or after importing app.mt5_engine
+    from app import mt5_engine
+"""
+
+import collections
+import fnmatch
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from app.clock import SystemClock
+
+# Bar length in seconds for each MetaTrader5 timeframe constant
+TIMEFRAME_SECONDS = {
+    1: 60,          # TIMEFRAME_M1
+    5: 300,         # TIMEFRAME_M5
+    15: 900,        # TIMEFRAME_M15
+    30: 1800,       # TIMEFRAME_M30
+    16385: 3600,    # TIMEFRAME_H1
+    16388: 14400,   # TIMEFRAME_H4
+    16408: 86400,   # TIMEFRAME_D1
+}
+
+# Same layout as the structured arrays returned by MetaTrader5.copy_rates_*
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+    ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+Tick = collections.namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+SymbolInfo = collections.namedtuple(
+    "SymbolInfo",
+    "name path description digits point volume_min volume_max volume_step trade_contract_size visible",
+)
+Position = collections.namedtuple(
+    "Position", "ticket time type magic volume price_open price_current sl tp profit symbol comment"
+)
+AccountInfo = collections.namedtuple(
+    "AccountInfo", "login server currency leverage balance equity margin margin_free profit"
+)
+TerminalInfo = collections.namedtuple("TerminalInfo", "connected trade_allowed name company path")
+OrderSendResult = collections.namedtuple(
+    "OrderSendResult", "retcode deal order volume price bid ask comment request_id request"
+)
+
+
+class PricePath:
+    """
+    Quote history for one symbol with on-demand bar aggregation.
+
+    Args:
+        times (array-like): UNIX timestamps (seconds), ascending.
+        bid (array-like): Bid quotes aligned with times.
+        ask (array-like): Ask quotes aligned with times.
+        quote_interval (float): Seconds a quote is considered "live" after its
+            timestamp. Use the bar length for bar-based paths so the engine's
+            tick staleness check sees an open market; 0 for recorded ticks.
+    """
+
+    def __init__(self, times, bid, ask, quote_interval=0.0):
+        self.times = np.asarray(times, dtype=np.int64)
+        self.bid = np.asarray(bid, dtype=np.float64)
+        self.ask = np.asarray(ask, dtype=np.float64)
+        self.mid = (self.bid + self.ask) / 2.0
+        self.quote_interval = quote_interval
+        self._barre = {}      # tf_seconds -> (bucket start indexes, complete rates array)
+        self._parziali = {}   # tf_seconds -> [bucket, cursor, high, low] incremental current bar
+
+    @classmethod
+    def from_mid(cls, times, mid, spread=0.0002, quote_interval=0.0):
+        """Build a path from mid prices and a relative spread (fraction of price)."""
+        mid = np.asarray(mid, dtype=np.float64)
+        half = mid * spread / 2.0
+        return cls(times, mid - half, mid + half, quote_interval=quote_interval)
+
+    @classmethod
+    def from_frame(cls, frame, spread=0.0002, quote_interval=0.0):
+        """
+        Build a path from a DataFrame indexed by datetime.
+
+        Uses "bid"/"ask" columns when present (recorded ticks), otherwise
+        "Close"/"close" with the given relative spread (OHLCV history).
+        """
+        times = frame.index.as_unit("s").asi8
+        if "bid" in frame.columns and "ask" in frame.columns:
+            return cls(times, frame["bid"].to_numpy(), frame["ask"].to_numpy(), quote_interval=quote_interval)
+        close = frame["Close"] if "Close" in frame.columns else frame["close"]
+        return cls.from_mid(times, close.to_numpy(), spread=spread, quote_interval=quote_interval)
+
+    def cursor(self, timestamp):
+        """Index of the last quote at or before timestamp (-1 if none)."""
+        return int(np.searchsorted(self.times, timestamp, side="right")) - 1
+
+    def _aggrega(self, tf_seconds):
+        if tf_seconds not in self._barre:
+            bucket = self.times // tf_seconds
+            _, starts = np.unique(bucket, return_index=True)
+            ends = np.append(starts[1:], len(self.mid))
+            rates = np.zeros(len(starts), dtype=RATES_DTYPE)
+            rates["time"] = bucket[starts] * tf_seconds
+            rates["open"] = self.mid[starts]
+            rates["high"] = np.maximum.reduceat(self.mid, starts)
+            rates["low"] = np.minimum.reduceat(self.mid, starts)
+            rates["close"] = self.mid[ends - 1]
+            rates["tick_volume"] = ends - starts
+            self._barre[tf_seconds] = (starts, rates)
+        return self._barre[tf_seconds]
+
+    def rates(self, tf_seconds, cursor, start_pos, count):
+        """
+        Return up to `count` bars ending `start_pos` bars before the current one.
+
+        The current (still forming) bar only includes quotes up to `cursor`.
+        """
+        if cursor < 0 or count <= 0:
+            return None
+        starts, complete = self._aggrega(tf_seconds)
+        b = int(np.searchsorted(starts, cursor, side="right")) - 1
+        end = b - start_pos
+        if end < 0:
+            return None
+        begin = max(0, end - count + 1)
+        out = complete[begin:end + 1].copy()
+        if end == b:
+            out[-1] = self._barra_corrente(tf_seconds, starts, b, cursor)
+        return out
+
+    def _barra_corrente(self, tf_seconds, starts, b, cursor):
+        """Current bar up to cursor, updated incrementally as the clock moves forward."""
+        stato = self._parziali.get(tf_seconds)
+        primo = starts[b]
+        if stato is None or stato[0] != b or stato[1] > cursor:
+            segmento = self.mid[primo:cursor + 1]
+            stato = [b, cursor, segmento.max(), segmento.min()]
+        elif cursor > stato[1]:
+            segmento = self.mid[stato[1] + 1:cursor + 1]
+            stato = [b, cursor, max(stato[2], segmento.max()), min(stato[3], segmento.min())]
+        self._parziali[tf_seconds] = stato
+
+        barra = np.zeros(1, dtype=RATES_DTYPE)[0]
+        barra["time"] = (self.times[primo] // tf_seconds) * tf_seconds
+        barra["open"] = self.mid[primo]
+        barra["high"] = stato[2]
+        barra["low"] = stato[3]
+        barra["close"] = self.mid[cursor]
+        barra["tick_volume"] = cursor - primo + 1
+        return barra
+
+
+def _specifica_predefinita(symbol):
+    """Guess broker path and contract specification from the symbol name."""
+    base = symbol.split(".")[0].upper()
+    if "BTC" in base or "ETH" in base:
+        return {"path": f"Crypto\\{symbol}", "contract_size": 1.0, "volume_min": 0.01, "volume_step": 0.01, "digits": 2}
+    if base.startswith(("XAU", "XAG")):
+        return {"path": f"Metals\\{symbol}", "contract_size": 100.0, "volume_min": 0.01, "volume_step": 0.01, "digits": 2}
+    if len(base) == 6 and base.isalpha():
+        return {"path": f"Forex\\Majors\\{symbol}", "contract_size": 100000.0, "volume_min": 0.01, "volume_step": 0.01, "digits": 5}
+    return {"path": f"Stocks\\{symbol}", "contract_size": 1.0, "volume_min": 1.0, "volume_step": 1.0, "digits": 2}
+
+
+class FakeMetaTrader5:
+    """
+    Drop-in replacement for the MetaTrader5 module driven by PricePath objects.
+
+    Args:
+        paths (dict): symbol -> PricePath.
+        clock: Time source with a time() method (SystemClock or SimulatedClock).
+        latency (float or dict): Per-call latency in seconds, either global or
+            keyed by function name (e.g. {"order_send": 0.05}).
+        symbol_specs (dict, optional): symbol -> overrides of path, contract_size,
+            volume_min, volume_step, digits.
+        balance (float): Starting account balance (USD).
+        leverage (int): Account leverage used for margin calculation.
+        server (str): Server name reported by account_info().
+    """
+
+    # Constants (same values as the MetaTrader5 package)
+    TIMEFRAME_M1, TIMEFRAME_M5, TIMEFRAME_M15, TIMEFRAME_M30 = 1, 5, 15, 30
+    TIMEFRAME_H1, TIMEFRAME_H4, TIMEFRAME_D1 = 16385, 16388, 16408
+    ORDER_TYPE_BUY, ORDER_TYPE_SELL = 0, 1
+    POSITION_TYPE_BUY, POSITION_TYPE_SELL = 0, 1
+    TRADE_ACTION_DEAL = 1
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_MARKET_CLOSED = 10018
+    TRADE_RETCODE_NO_MONEY = 10019
+    TRADE_RETCODE_POSITION_CLOSED = 10036
+
+    def __init__(self, paths, clock=None, latency=0.0, symbol_specs=None,
+                 balance=10000.0, leverage=30, server="FakeMT5-Demo"):
+        self.paths = dict(paths)
+        self.clock = clock or SystemClock()
+        self.latency = latency
+        self.leverage = leverage
+        self.server = server
+        self.balance = float(balance)
+        self.trade_allowed = True
+        self.initialized = False
+
+        self._specifiche = {}
+        for symbol in self.paths:
+            spec = _specifica_predefinita(symbol)
+            spec.update((symbol_specs or {}).get(symbol, {}))
+            self._specifiche[symbol] = spec
+
+        self._posizioni = {}  # symbol -> list of position dicts
+        self._ticket = itertools.count(1)
+        self.deals = []       # executed fills, for post-run analysis
+        self.call_counts = collections.Counter()
+
+    # ------------------------------------------------------------------
+    # Builders
+    # ------------------------------------------------------------------
+    @classmethod
+    def synthetic(cls, symbols, clock=None, history_bars=1300, future_bars=500,
+                  bar_seconds=14400, volatility=0.01, seed=0, symbol_specs=None, **kwargs):
+        """
+        Generate geometric random-walk paths around the clock's current time.
+
+        Args:
+            symbols (list): Symbol names.
+            clock: Time source; paths start `history_bars` bars before clock.time().
+            history_bars (int): Bars before the start time (indicator warm-up).
+            future_bars (int): Bars after the start time (simulated session).
+            bar_seconds (int): Spacing between synthetic quotes.
+            volatility (float): Per-bar log-return standard deviation.
+            seed (int): Random seed for reproducible paths.
+        """
+        clock = clock or SystemClock()
+        rng = np.random.default_rng(seed)
+        inizio = int(clock.time()) - history_bars * bar_seconds
+        times = inizio + np.arange(history_bars + future_bars, dtype=np.int64) * bar_seconds
+
+        paths = {}
+        for symbol in symbols:
+            spec = _specifica_predefinita(symbol)
+            spec.update((symbol_specs or {}).get(symbol, {}))
+            forex = spec["path"].upper().startswith("FOREX")
+            base = 1.1 if forex else 100.0
+            spread = 0.0001 if forex else 0.001
+            rendimenti = rng.normal(-volatility ** 2 / 2, volatility, len(times))
+            mid = base * np.exp(np.cumsum(rendimenti))
+            paths[symbol] = PricePath.from_mid(times, mid, spread=spread, quote_interval=bar_seconds)
+        return cls(paths, clock=clock, symbol_specs=symbol_specs, **kwargs)
+
+    @classmethod
+    def from_frames(cls, frames, clock=None, spread=0.0002, quote_interval=0.0, **kwargs):
+        """Build from recorded data: symbol -> DataFrame (bid/ask ticks or OHLCV bars)."""
+        paths = {
+            symbol: PricePath.from_frame(frame, spread=spread, quote_interval=quote_interval)
+            for symbol, frame in frames.items()
+        }
+        return cls(paths, clock=clock, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _latenza(self, name):
+        self.call_counts[name] += 1
+        ritardo = self.latency.get(name, 0.0) if isinstance(self.latency, dict) else self.latency
+        if ritardo > 0:
+            time.sleep(ritardo)
+
+    def _quote(self, symbol):
+        """Return (cursor, bid, ask) at the clock time, or None if no quote yet."""
+        path = self.paths.get(symbol)
+        if path is None:
+            return None
+        cursor = path.cursor(self.clock.time())
+        if cursor < 0:
+            return None
+        return cursor, float(path.bid[cursor]), float(path.ask[cursor])
+
+    def _profitto(self, pos, bid, ask):
+        contratto = self._specifiche[pos["symbol"]]["contract_size"]
+        if pos["type"] == self.POSITION_TYPE_BUY:
+            return (bid - pos["price_open"]) * pos["volume"] * contratto
+        return (pos["price_open"] - ask) * pos["volume"] * contratto
+
+    def _posizione(self, pos):
+        quote = self._quote(pos["symbol"])
+        bid, ask = (quote[1], quote[2]) if quote else (pos["price_open"], pos["price_open"])
+        corrente = bid if pos["type"] == self.POSITION_TYPE_BUY else ask
+        return Position(pos["ticket"], pos["time"], pos["type"], pos["magic"], pos["volume"],
+                        pos["price_open"], corrente, 0.0, 0.0, self._profitto(pos, bid, ask),
+                        pos["symbol"], pos["comment"])
+
+    def _risultato(self, retcode, request, volume=0.0, price=0.0, bid=0.0, ask=0.0, deal=0, comment=""):
+        return OrderSendResult(retcode, deal, deal, volume, price, bid, ask, comment, 0, request)
+
+    # ------------------------------------------------------------------
+    # MetaTrader5 API surface
+    # ------------------------------------------------------------------
+    def initialize(self, *args, **kwargs):
+        self._latenza("initialize")
+        self.initialized = True
+        return True
+
+    def shutdown(self):
+        self._latenza("shutdown")
+        self.initialized = False
+
+    def last_error(self):
+        return (1, "Success")
+
+    def terminal_info(self):
+        self._latenza("terminal_info")
+        if not self.initialized:
+            return None
+        return TerminalInfo(True, self.trade_allowed, "FakeMT5", "Offline", "")
+
+    def account_info(self):
+        self._latenza("account_info")
+        if not self.initialized:
+            return None
+        profitto, margine = 0.0, 0.0
+        for symbol, lista in self._posizioni.items():
+            quote = self._quote(symbol)
+            contratto = self._specifiche[symbol]["contract_size"]
+            for pos in lista:
+                if quote:
+                    profitto += self._profitto(pos, quote[1], quote[2])
+                margine += pos["volume"] * contratto * pos["price_open"] / self.leverage
+        equity = self.balance + profitto
+        return AccountInfo(1, self.server, "USD", self.leverage, self.balance, equity, margine, equity - margine, profitto)
+
+    def symbols_get(self, group=None):
+        self._latenza("symbols_get")
+        nomi = [s for s in self.paths if group is None or fnmatch.fnmatch(s, group)]
+        return tuple(self._info(s) for s in nomi)
+
+    def symbol_info(self, symbol):
+        self._latenza("symbol_info")
+        if symbol not in self.paths:
+            return None
+        return self._info(symbol)
+
+    def _info(self, symbol):
+        spec = self._specifiche[symbol]
+        return SymbolInfo(symbol, spec["path"], f"{symbol} (synthetic)", spec["digits"], 10 ** -spec["digits"],
+                          spec["volume_min"], 1000.0, spec["volume_step"], spec["contract_size"], True)
+
+    def symbol_select(self, symbol, enable=True):
+        self._latenza("symbol_select")
+        return symbol in self.paths
+
+    def symbol_info_tick(self, symbol):
+        self._latenza("symbol_info_tick")
+        quote = self._quote(symbol)
+        if quote is None:
+            return None
+        cursor, bid, ask = quote
+        path = self.paths[symbol]
+        quotato = int(path.times[cursor])
+        adesso = self.clock.time()
+        # Within quote_interval the market keeps streaming: stamp the tick with the clock time
+        ts = int(adesso) if adesso - quotato <= path.quote_interval else quotato
+        return Tick(ts, bid, ask, 0.0, 0, ts * 1000, 0, 0.0)
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        self._latenza("copy_rates_from_pos")
+        path = self.paths.get(symbol)
+        if path is None or timeframe not in TIMEFRAME_SECONDS:
+            return None
+        return path.rates(TIMEFRAME_SECONDS[timeframe], path.cursor(self.clock.time()), start_pos, count)
+
+    def positions_get(self, symbol=None, group=None, ticket=None):
+        self._latenza("positions_get")
+        if symbol is not None:
+            candidati = self._posizioni.get(symbol, [])
+        else:
+            candidati = [p for lista in self._posizioni.values() for p in lista]
+        if group is not None:
+            candidati = [p for p in candidati if fnmatch.fnmatch(p["symbol"], group)]
+        if ticket is not None:
+            candidati = [p for p in candidati if p["ticket"] == ticket]
+        return tuple(self._posizione(p) for p in candidati)
+
+    def order_calc_margin(self, action, symbol, volume, price):
+        self._latenza("order_calc_margin")
+        if symbol not in self._specifiche:
+            return None
+        return volume * self._specifiche[symbol]["contract_size"] * price / self.leverage
+
+    def order_send(self, request):
+        self._latenza("order_send")
+        symbol = request.get("symbol")
+        quote = self._quote(symbol)
+        if quote is None:
+            return self._risultato(self.TRADE_RETCODE_MARKET_CLOSED, request, comment="Market closed")
+        _, bid, ask = quote
+        volume = float(request.get("volume", 0.0))
+        adesso = int(self.clock.time())
+
+        ticket_chiusura = request.get("position")
+        if ticket_chiusura:
+            lista = self._posizioni.get(symbol, [])
+            pos = next((p for p in lista if p["ticket"] == ticket_chiusura), None)
+            if pos is None:
+                return self._risultato(self.TRADE_RETCODE_POSITION_CLOSED, request, comment="Position not found")
+            prezzo = bid if pos["type"] == self.POSITION_TYPE_BUY else ask
+            profitto = self._profitto(pos, bid, ask)
+            self.balance += profitto
+            lista.remove(pos)
+            deal = next(self._ticket)
+            self.deals.append({"deal": deal, "time": adesso, "symbol": symbol, "entry": "out",
+                               "type": request.get("type"), "volume": pos["volume"], "price": prezzo,
+                               "profit": profitto, "magic": pos["magic"], "position": pos["ticket"]})
+            return self._risultato(self.TRADE_RETCODE_DONE, request, pos["volume"], prezzo, bid, ask, deal)
+
+        spec = self._specifiche[symbol]
+        if volume < spec["volume_min"]:
+            return self._risultato(self.TRADE_RETCODE_INVALID_VOLUME, request, comment="Invalid volume")
+        tipo = request.get("type", self.ORDER_TYPE_BUY)
+        prezzo = ask if tipo == self.ORDER_TYPE_BUY else bid
+        conto = self.account_info()
+        if self.order_calc_margin(tipo, symbol, volume, prezzo) > conto.margin_free:
+            return self._risultato(self.TRADE_RETCODE_NO_MONEY, request, comment="No money")
+
+        ticket = next(self._ticket)
+        self._posizioni.setdefault(symbol, []).append({
+            "ticket": ticket, "time": adesso, "symbol": symbol, "volume": volume, "price_open": prezzo,
+            "magic": request.get("magic", 0), "comment": request.get("comment", ""),
+            "type": self.POSITION_TYPE_BUY if tipo == self.ORDER_TYPE_BUY else self.POSITION_TYPE_SELL,
+        })
+        self.deals.append({"deal": ticket, "time": adesso, "symbol": symbol, "entry": "in", "type": tipo,
+                           "volume": volume, "price": prezzo, "profit": 0.0,
+                           "magic": request.get("magic", 0), "position": ticket})
+        return self._risultato(self.TRADE_RETCODE_DONE, request, volume, prezzo, bid, ask, ticket)
+
+
+def install(fake):
+    """
+    Register a FakeMetaTrader5 instance as the MetaTrader5 module.
+
+    Later `import MetaTrader5` statements resolve to the fake; if app.mt5_engine
+    is already imported, its module-level `mt5` reference is swapped as well.
+
+    Returns:
+        FakeMetaTrader5: The installed instance.
+    """
+    sys.modules["MetaTrader5"] = fake
+    engine = sys.modules.get("app.mt5_engine")
+    if engine is not None:
+        engine.mt5 = fake
+    return fake
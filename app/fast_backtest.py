@@ -0,0 +1,259 @@
+"""
+Native fast-backtest engine for the daily all-in/all-out strategies.
+
+Simulates ATH Dip, SMA Cross and RSI Mean Reversion directly on the cached
+close array, with the execution model of the Lumibot backtests in
+app/backtest.py:
+- One iteration per daily bar after the start date, up to the end date
+- Market orders filled at that bar's close, whole shares (cash // price), no fees
+- Portfolio valued at each bar's close
+
+Metrics follow Lumibot's stats_summary formulas and are returned with the
+extract_strategy_metrics keys, so a screening run takes milliseconds instead
+of a full broker simulation. cross_check() runs the same backtest through
+Lumibot and reports the differences.
+
+Usage:
+    python -m app.fast_backtest --ticker SPY --strategy "SMA Cross" --start 2020-01-01 --end 2024-12-31
+    python -m app.fast_backtest --ticker SPY --strategy all --start 2020-01-01 --end 2024-12-31 --check
+"""
+
+import argparse
+import datetime
+import math
+
+import numpy as np
+import pandas as pd
+
+from app import config
+from app.signals import rsi_frame, sma_cross_frame
+from app.strategy import STRATEGIES
+
+CHECK_KEYS = ["total_return", "cagr", "sharpe"]
+_FUSO_LUMIBOT = "America/New_York"  # Lumibot's market timezone for daily bars
+
+
+def _regole_ath(close, finestra, p):
+    """ATH Dip: all-time high tracked from the first iteration (as the strategy's self.ath)."""
+    prezzi = close[finestra]
+    ath = np.maximum.accumulate(prezzi)
+    return prezzi <= ath * (1.0 - p["buy_drawdown"]), prezzi >= ath * (1.0 - p["sell_drawdown"])
+
+
+def _regole_sma(close, finestra, p):
+    sma = sma_cross_frame(pd.Series(close), int(p["fast_period"]), int(p["slow_period"])).to_numpy()[finestra]
+    return sma[:, 0] > sma[:, 1], sma[:, 0] < sma[:, 1]  # NaN rows compare False: no action
+
+
+def _regole_rsi(close, finestra, p):
+    rsi = rsi_frame(pd.Series(close), int(p["rsi_period"]))["rsi"].to_numpy()[finestra]
+    return rsi < p["oversold"], rsi > p["overbought"]
+
+
+# Strategy name → f(full closes, iteration mask, parameters) → (entry mask, exit mask)
+RULES = {
+    "ATH Dip": _regole_ath,
+    "SMA Cross": _regole_sma,
+    "RSI Mean Reversion": _regole_rsi,
+}
+
+
+def _simula(prezzi, entrate, uscite, capitale):
+    """
+    All-in/all-out state machine jumping between signal bars (O(trades log bars)).
+
+    Returns:
+        tuple: (equity per bar, list of (entry bar, exit bar or None, qty)).
+    """
+    n = len(prezzi)
+    idx_entrate = np.flatnonzero(entrate)
+    idx_uscite = np.flatnonzero(uscite)
+    liquidita = np.full(n, float(capitale))
+    quantita = np.zeros(n)
+    trades = []
+    cassa, i = float(capitale), 0
+    while True:
+        j = np.searchsorted(idx_entrate, i)
+        if j >= len(idx_entrate):
+            break
+        ingresso = idx_entrate[j]
+        qty = cassa // prezzi[ingresso]
+        if qty <= 0:
+            i = ingresso + 1  # Not enough cash for one share: still flat
+            continue
+        k = np.searchsorted(idx_uscite, ingresso + 1)
+        uscita = idx_uscite[k] if k < len(idx_uscite) else None
+        fine = uscita if uscita is not None else n
+        residuo = cassa - qty * prezzi[ingresso]
+        liquidita[ingresso:fine] = residuo
+        quantita[ingresso:fine] = qty
+        trades.append((ingresso, uscita, qty))
+        if uscita is None:
+            break
+        cassa = residuo + qty * prezzi[uscita]
+        liquidita[uscita:] = cassa
+        i = uscita + 1
+    return liquidita + quantita * prezzi, trades
+
+
+def _anni(inizio, fine):
+    """
+    Years between two bars as Lumibot counts them: whole days between the bars'
+    New York midnights taken in UTC, so a period crossing a DST change loses a day.
+    """
+    inizio, fine = (pd.Timestamp(d) for d in (inizio, fine))
+    if inizio.tzinfo is None:
+        inizio, fine = inizio.tz_localize(_FUSO_LUMIBOT), fine.tz_localize(_FUSO_LUMIBOT)
+    return (fine.tz_convert("UTC") - inizio.tz_convert("UTC")).days / 365.25
+
+
+def equity_metrics(date, equity, risk_free_rate=None):
+    """
+    Lumibot stats_summary formulas on a per-bar portfolio value curve.
+
+    Args:
+        date (pd.DatetimeIndex): Bar dates.
+        equity (np.ndarray): Portfolio value per bar.
+        risk_free_rate (float, optional): Sharpe risk-free rate (defaults to config).
+
+    Returns:
+        dict: total_return, cagr, max_drawdown (negative), sharpe.
+    """
+    risk_free_rate = config.BACKTEST_RISK_FREE_RATE if risk_free_rate is None else risk_free_rate
+    equity = np.asarray(equity, dtype=np.float64)
+    ritorni = equity[1:] / equity[:-1] - 1.0
+    anni = _anni(date[0], date[-1]) if len(date) > 1 else 0.0
+    totale = equity[-1] / equity[0] - 1.0
+    cagr = (equity[-1] / equity[0]) ** (1 / anni) - 1 if anni > 0 else 0.0
+    volatilita = float(np.std(ritorni, ddof=1) * math.sqrt(len(ritorni) / anni)) if anni > 0 and len(ritorni) > 1 else 0.0
+    picco = np.maximum.accumulate(equity)
+    return {
+        "total_return": float(totale),
+        "cagr": float(cagr),
+        "max_drawdown": float((equity / picco - 1.0).min()),
+        "sharpe": float((cagr - risk_free_rate) / volatilita) if volatilita else 0.0,
+    }
+
+
+def _metriche(date, equity, trades, prezzi, risk_free_rate):
+    """equity_metrics plus the trade statistics, extract_strategy_metrics keys."""
+    chiusi = [(a, b) for a, b, _ in trades if b is not None]
+    return {
+        **equity_metrics(date, equity, risk_free_rate),
+        "win_rate": sum(prezzi[b] > prezzi[a] for a, b in chiusi) / len(chiusi) if chiusi else 0.0,
+        "trades": float(len(trades)),
+    }
+
+
+def fast_backtest(nome_strategia, history, capitale, start, end, parameters=None, risk_free_rate=None, detail=False):
+    """
+    Backtest one strategy natively on a cached daily OHLCV frame.
+
+    Args:
+        nome_strategia (str): Strategy name from STRATEGIES / RULES.
+        history (pd.DataFrame): Daily OHLCV with warm-up (see load_backtest_history).
+        capitale (float): Initial capital in USD.
+        start (datetime.datetime): Backtest start (first iteration on the next bar).
+        end (datetime.datetime): Backtest end (inclusive).
+        parameters (dict, optional): Overrides of the strategy's class-level parameters.
+        risk_free_rate (float, optional): Sharpe risk-free rate (defaults to config).
+        detail (bool): Also return the equity curve and the trade list.
+
+    Returns:
+        dict: total_return, cagr, max_drawdown (negative), sharpe, win_rate, trades;
+              with detail, also "equity" (pd.Series) and "trade_log" (pd.DataFrame).
+
+    Raises:
+        ValueError: On unknown strategies/parameters or no bars in the period.
+    """
+    if nome_strategia not in RULES:
+        raise ValueError(f"Strategy '{nome_strategia}' has no fast-mode rules")
+    classe = STRATEGIES[nome_strategia]
+    sconosciuti = set(parameters or {}) - set(classe.parameters)
+    if sconosciuti:
+        raise ValueError(f"{nome_strategia}: unknown parameters {sorted(sconosciuti)}")
+    p = {**classe.parameters, **(parameters or {})}
+    risk_free_rate = config.BACKTEST_RISK_FREE_RATE if risk_free_rate is None else risk_free_rate
+
+    serie = history["Close"].dropna()
+    close = serie.to_numpy(dtype=np.float64)
+    giorni = serie.index.normalize()
+    finestra = (giorni > pd.Timestamp(start).normalize()) & (giorni <= pd.Timestamp(end).normalize())
+    if finestra.sum() < 2:
+        raise ValueError("Not enough bars in the backtest period")
+
+    entrate, uscite = RULES[nome_strategia](close, finestra, p)
+    prezzi = close[finestra]
+    equity, trades = _simula(prezzi, entrate, uscite, capitale)
+    date = giorni[finestra]
+    metriche = _metriche(date, equity, trades, prezzi, risk_free_rate)
+
+    if detail:
+        metriche["equity"] = pd.Series(equity, index=date, name="equity")
+        metriche["trade_log"] = pd.DataFrame([
+            {"entry_date": date[a], "entry_price": prezzi[a], "qty": q,
+             "exit_date": date[b] if b is not None else None,
+             "exit_price": prezzi[b] if b is not None else None}
+            for a, b, q in trades
+        ])
+    return metriche
+
+
+def cross_check(nome_strategia, ticker, capitale, start, end, parameters=None, history=None, tolerance=1e-6):
+    """
+    Run the same backtest natively and through Lumibot and compare the shared metrics.
+
+    Args:
+        nome_strategia (str): Strategy name.
+        ticker (str): Asset symbol.
+        capitale (float): Initial capital in USD.
+        start (datetime.datetime): Backtest start.
+        end (datetime.datetime): Backtest end.
+        parameters (dict, optional): Strategy parameter overrides.
+        history (pd.DataFrame, optional): Preloaded OHLCV (loaded from the cache when omitted).
+        tolerance (float): Max absolute difference per metric.
+
+    Returns:
+        dict: fast, lumibot (metrics), diff ({key: abs difference}) and match (bool).
+    """
+    from app.backtest import _run_strategy_backtest, load_backtest_history
+
+    if history is None:
+        history = load_backtest_history(ticker, start, end)
+    veloce = fast_backtest(nome_strategia, history, capitale, start, end, parameters)
+    lumibot = _run_strategy_backtest(STRATEGIES[nome_strategia], ticker, capitale, start, end,
+                                     parameters=parameters, interactive=False, history=history)
+    diff = {k: abs(veloce[k] - lumibot[k]) for k in CHECK_KEYS if k in lumibot}
+    return {
+        "fast": veloce,
+        "lumibot": lumibot,
+        "diff": diff,
+        "match": bool(diff) and all(d <= tolerance for d in diff.values()),
+    }
+
+
+def main(argv=None):
+    from app.backtest import load_backtest_history
+
+    parser = argparse.ArgumentParser(description="Native fast backtest (no Lumibot, no tearsheet)")
+    parser.add_argument("--ticker", required=True)
+    parser.add_argument("--strategy", nargs="+", default=["all"])
+    parser.add_argument("--start", required=True, type=datetime.datetime.fromisoformat)
+    parser.add_argument("--end", required=True, type=datetime.datetime.fromisoformat)
+    parser.add_argument("--capital", type=float, default=10000.0)
+    parser.add_argument("--check", action="store_true", help="Also run Lumibot and compare the metrics")
+    args = parser.parse_args(argv)
+
+    strategie = list(RULES) if args.strategy == ["all"] else args.strategy
+    storico = load_backtest_history(args.ticker, args.start, args.end)
+    for nome in strategie:
+        if args.check:
+            esito = cross_check(nome, args.ticker, args.capital, args.start, args.end, history=storico)
+            print(f"{nome}: {'MATCH' if esito['match'] else 'MISMATCH'} | fast {esito['fast']} | lumibot {esito['lumibot']}")
+        else:
+            print(f"{nome}: {fast_backtest(nome, storico, args.capital, args.start, args.end)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,276 @@
+"""
+Concurrent, cached pre-flight health checks for the MT5 engine.
+
+The START health check used to run its probes one after the other (an HTTPS
+GET with a 3 s timeout, terminal/account queries, key checks, a UDP probe
+for the LAN address) before every Phase 1. HealthChecker runs the registered
+probes concurrently, each with its own timeout, and caches passing results
+for a short TTL (probes registered with cache=False, such as the cheap local
+MT5 queries, always re-run). A background monitor re-runs them periodically, so the
+cache is usually warm when START is pressed and a connectivity regression
+surfaces mid-session instead of at the next START.
+
+Probes are registered by the engine (they need its `mt5` reference):
+    health_checker.register("internet", sonda_internet, timeout=3.0)
+    health_checker.register("mt5_account", sonda_account, background=False, cache=False)
+    ok = health_checker.check(custom_log)        # Pre-flight: cached passes are reused
+    health_checker.start(on_change=avvisa)       # Background monitor
+    health_checker.poll()                        # Once per engine loop iteration
+
+Probes registered with background=False (the MetaTrader5 queries: the
+binding is not safe to call from several threads) only ever run in the
+thread calling check() or poll(), i.e. the engine thread, alongside its own
+MT5 calls. The monitor thread runs the other probes; poll() re-runs the
+caller-thread ones on the same interval, so both kinds report regressions.
+
+A probe is a callable returning (ok, lines): the outcome and the terminal
+lines describing it. Non-blocking probes (e.g. the dashboard address) are
+reported but never fail the check.
+
+Configuration (.env or environment):
+- HEALTH_CACHE_TTL=60          Seconds a passing probe result is reused (0 = never)
+- HEALTH_PROBE_TIMEOUT=3       Default per-probe timeout in seconds
+- HEALTH_CHECK_INTERVAL=45     Background monitor period in seconds (0 = disabled); below
+                               the TTL, so the cache stays warm while the engine is connected
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class HealthChecker:
+    """
+    Registry of health probes run concurrently with per-probe timeouts.
+
+    Args:
+        cache_ttl (float): Seconds a passing result is reused by check() (0 = always re-run).
+        default_timeout (float): Timeout for probes registered without one.
+        interval (float): Background monitor period in seconds (0 = start() does nothing).
+    """
+
+    def __init__(self, cache_ttl=60.0, default_timeout=3.0, interval=45.0):
+        self.cache_ttl = cache_ttl
+        self.default_timeout = default_timeout
+        self.interval = interval
+
+        self._sonde = {}      # name -> (probe, timeout, blocking, background, cache), in registration order
+        self._risultati = {}  # name -> {"ok", "blocking", "lines", "checked_at", "elapsed"}
+        self._lock = threading.Lock()
+        self._esecutore = None
+        self._monitor = None
+        self._ferma = threading.Event()
+        self._on_change = None
+        self._stato = {}             # name -> last ok seen by the monitor/poll (change detection)
+        self._ultimo_poll = None     # monotonic time of the last caller-thread run by poll()
+
+    @classmethod
+    def from_env(cls):
+        """Build a checker from HEALTH_* environment variables."""
+        return cls(
+            cache_ttl=float(os.getenv("HEALTH_CACHE_TTL", "60")),
+            default_timeout=float(os.getenv("HEALTH_PROBE_TIMEOUT", "3")),
+            interval=float(os.getenv("HEALTH_CHECK_INTERVAL", "45")),
+        )
+
+    def register(self, name, probe, timeout=None, blocking=True, background=True, cache=True):
+        """
+        Add (or replace) a probe.
+
+        Args:
+            name (str): Probe name (report key).
+            probe (callable): f() -> (ok, lines).
+            timeout (float, optional): Seconds before the probe counts as failed (defaults to default_timeout).
+                Not enforced for background=False probes, which run inline.
+            blocking (bool): Whether a failure fails the whole check.
+            background (bool): Whether the probe may run on worker threads. False keeps it in the
+                thread calling check()/poll() (required for non-thread-safe APIs such as MetaTrader5).
+            cache (bool): Whether a passing result may be reused for cache_ttl. False re-runs the probe on
+                every check() (state that can change at any moment, e.g. MT5 algo trading or the broker session).
+        """
+        with self._lock:
+            self._sonde[name] = (probe, timeout if timeout is not None else self.default_timeout, blocking,
+                                 background, cache)
+            self._risultati.pop(name, None)
+
+    # ------------------------------------------------------------------
+    # Checks
+    # ------------------------------------------------------------------
+    def run(self, use_cache=True, background=None):
+        """
+        Run the probes and return every result.
+
+        Background probes run concurrently on worker threads; the others run
+        inline in the calling thread while the workers are busy.
+
+        Args:
+            use_cache (bool): Reuse passing results younger than cache_ttl (cache=True probes only).
+            background (bool, optional): Only run background (True) or caller-thread (False) probes.
+
+        Returns:
+            dict: name -> {"ok", "blocking", "lines", "checked_at", "elapsed", "cached"}, in registration order.
+        """
+        adesso = time.monotonic()
+        with self._lock:
+            sonde = {nome: v for nome, v in self._sonde.items() if background is None or v[3] == background}
+            precedenti = dict(self._risultati)
+
+        risultati, da_eseguire, in_linea = {}, {}, []
+        for nome, (sonda, _, _, sfondo, in_cache) in sonde.items():
+            vecchio = precedenti.get(nome)
+            if (use_cache and in_cache and vecchio and vecchio["ok"] and self.cache_ttl > 0
+                    and adesso - vecchio["checked_at"] < self.cache_ttl):
+                risultati[nome] = dict(vecchio, cached=True)
+            elif sfondo:
+                da_eseguire[nome] = self._esecutore_sonde().submit(self._esegui_sonda, nome, sonda)
+            else:
+                in_linea.append(nome)
+
+        for nome in in_linea:
+            ok, righe, durata = self._esegui_sonda(nome, sonde[nome][0])
+            risultati[nome] = {"ok": ok, "blocking": sonde[nome][2], "lines": righe,
+                               "checked_at": time.monotonic(), "elapsed": durata, "cached": False}
+
+        for nome, futuro in da_eseguire.items():
+            _, timeout, bloccante, _, _ = sonde[nome]
+            try:
+                # Probes run in parallel: waiting on each in turn costs at most the slowest timeout
+                ok, righe, durata = futuro.result(timeout=max(0.0, adesso + timeout - time.monotonic()))
+            except FuturesTimeout:
+                ok, righe, durata = False, [f"   ❌ {nome}: no answer within {timeout:g}s"], timeout
+            risultati[nome] = {"ok": ok, "blocking": bloccante, "lines": righe, "checked_at": time.monotonic(),
+                               "elapsed": durata, "cached": False}
+
+        with self._lock:
+            for nome, risultato in risultati.items():
+                if nome in self._sonde:
+                    self._risultati[nome] = risultato
+        return {nome: risultati[nome] for nome in sonde}
+
+    def check(self, log=None, use_cache=True):
+        """
+        Pre-flight check: run (or reuse) every probe and report each outcome.
+
+        Args:
+            log (callable, optional): Receives the report lines (e.g. the engine's custom_log).
+            use_cache (bool): Reuse passing results younger than cache_ttl.
+
+        Returns:
+            bool: True if every blocking probe passed.
+        """
+        inizio = time.perf_counter()
+        risultati = self.run(use_cache=use_cache)
+        if log:
+            for risultato in risultati.values():
+                for riga in risultato["lines"]:
+                    log(riga)
+            in_cache = sum(r["cached"] for r in risultati.values())
+            log(f"   ⏱️ Health check: {(time.perf_counter() - inizio) * 1000:.0f} ms"
+                f" ({in_cache}/{len(risultati)} probes from cache)")
+        return all(r["ok"] for r in risultati.values() if r["blocking"])
+
+    def invalidate(self):
+        """Forget cached results: the next check() re-runs every probe."""
+        with self._lock:
+            self._risultati.clear()
+
+    # ------------------------------------------------------------------
+    # Background monitor
+    # ------------------------------------------------------------------
+    def start(self, on_change=None):
+        """
+        Start the periodic monitor (no-op if interval is 0 or it is already running).
+
+        Args:
+            on_change (callable, optional): f(name, ok, lines) when a blocking probe
+                changes state between two runs (regression or recovery).
+        """
+        if self.interval <= 0 or (self._monitor is not None and self._monitor.is_alive()):
+            return
+        self._on_change = on_change
+        with self._lock:
+            self._stato = {}
+        self._ultimo_poll = None
+        self._ferma.clear()
+        self._monitor = threading.Thread(target=self._ciclo_monitor, daemon=True, name="health-monitor")
+        self._monitor.start()
+
+    def poll(self):
+        """
+        Run the caller-thread probes when the monitor interval has elapsed.
+
+        Call it once per engine loop iteration (cheap when nothing is due): the
+        MT5 probes then run in the engine thread, never beside its own MT5 calls.
+        """
+        if self._monitor is None:
+            return
+        adesso = time.monotonic()
+        if self._ultimo_poll is not None and adesso - self._ultimo_poll < self.interval:
+            return
+        self._ultimo_poll = adesso
+        try:
+            self._confronta(self.run(use_cache=False, background=False))
+        except Exception:
+            logger.exception("Health poll failed")
+
+    def stop(self):
+        """Stop the monitor and wait until no probe is running on a worker thread."""
+        self._ferma.set()
+        if self._monitor is not None:
+            self._monitor.join()  # Bounded: a monitor run waits at most the slowest probe timeout
+            self._monitor = None
+        with self._lock:
+            esecutore, self._esecutore = self._esecutore, None
+        if esecutore is not None:
+            esecutore.shutdown(wait=True, cancel_futures=True)
+
+    def _ciclo_monitor(self):
+        while not self._ferma.is_set():
+            try:
+                self._confronta(self.run(use_cache=False, background=True))
+            except Exception:
+                logger.exception("Health monitor run failed")
+            self._ferma.wait(self.interval)
+
+    def _confronta(self, risultati):
+        """Report blocking probes whose state changed since their previous run."""
+        cambiati = []
+        with self._lock:
+            for nome, risultato in risultati.items():
+                if risultato["blocking"] and nome in self._stato and self._stato[nome] != risultato["ok"]:
+                    cambiati.append((nome, risultato))
+                self._stato[nome] = risultato["ok"]
+        if self._on_change:
+            for nome, risultato in cambiati:
+                self._on_change(nome, risultato["ok"], risultato["lines"])
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _esecutore_sonde(self):
+        with self._lock:
+            if self._esecutore is None:
+                self._esecutore = ThreadPoolExecutor(max_workers=8, thread_name_prefix="health")
+            return self._esecutore
+
+    @staticmethod
+    def _esegui_sonda(nome, sonda):
+        inizio = time.perf_counter()
+        try:
+            ok, righe = sonda()
+            ok, righe = bool(ok), list(righe)
+        except Exception as e:
+            ok, righe = False, [f"   ❌ {nome}: probe error ({type(e).__name__}: {e})"]
+        return ok, righe, time.perf_counter() - inizio
+
+
+# Global singleton (probes are registered by app.mt5_engine)
+health_checker = HealthChecker.from_env()
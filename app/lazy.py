@@ -0,0 +1,69 @@
+"""
+Deferred imports for heavy optional dependencies.
+
+Importing app.ui used to pull in pandas, pandas_ta, MetaTrader5, requests,
+yfinance, groq, newsapi and feedparser before the window could appear.
+A LazyModule stands in for the module object and imports it on the first
+attribute access, so these costs move from startup to the engine thread
+that first needs them.
+
+The import goes through importlib, so it resolves exactly like the
+`import X` statement it replaces, just later: a FakeMetaTrader5 registered
+with app.fake_mt5.install before the first access is picked up.
+
+After the import the module namespace is copied onto the proxy, so later
+lookups are plain attribute hits (the radar loop touches `mt5.` thousands
+of times per cycle). Attributes the module gains afterwards still resolve
+through __getattr__.
+
+Usage:
+    pd = LazyModule("pandas")
+    mt5 = LazyModule("MetaTrader5")
+    df = pd.DataFrame(rates)   # pandas is imported here
+"""
+
+import importlib
+import threading
+import types
+
+_LOCK = threading.RLock()
+
+
+class LazyModule:
+    """
+    Module proxy that imports `name` on first attribute access.
+
+    Args:
+        name (str): Absolute module name, as given to importlib.import_module.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_lazy_nome"] = name
+        self.__dict__["_lazy_modulo"] = None
+
+    def _carica(self):
+        with _LOCK:
+            modulo = self.__dict__["_lazy_modulo"]
+            if modulo is None:
+                modulo = importlib.import_module(self._lazy_nome)
+                if isinstance(modulo, types.ModuleType):
+                    # Snapshot the namespace: later lookups never reach __getattr__
+                    self.__dict__.update({k: v for k, v in vars(modulo).items() if not k.startswith("_lazy_")})
+                self.__dict__["_lazy_modulo"] = modulo
+        return modulo
+
+    def __getattr__(self, attributo):
+        # Only called for names not on the proxy: first access, or non-module stand-ins
+        modulo = self.__dict__["_lazy_modulo"] or self._carica()
+        return getattr(modulo, attributo)
+
+    def __setattr__(self, attributo, valore):
+        setattr(self.__dict__["_lazy_modulo"] or self._carica(), attributo, valore)
+        self.__dict__[attributo] = valore
+
+    def __dir__(self):
+        return dir(self.__dict__["_lazy_modulo"] or self._carica())
+
+    def __repr__(self):
+        stato = "loaded" if self.__dict__["_lazy_modulo"] is not None else "not loaded"
+        return f"<LazyModule '{self._lazy_nome}' ({stato})>"
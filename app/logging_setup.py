@@ -4,39 +4,181 @@ Centralized logging configuration for the trading application.
 Configures dual output: file-based persistent logging for auditing and
 console output for real-time monitoring. All timestamps are recorded for
 trade reconstruction and compliance purposes.
+
+Log calls never touch a file or the console in the calling thread: the root
+logger only holds a QueueHandler, and a QueueListener thread drains the queue
+into the real handlers. In the radar loop a log call costs one queue put.
+
+Sinks (drained by the listener thread):
+- Rotating text log (by size or by time); rotated segments are gzip-compressed
+- Console
+- Optional structured JSON-lines log (one object per record), rotated the same way
+
+Configuration (.env or environment, overridable per call):
+- LOG_ROTATION=size          "size" (LOG_MAX_BYTES) or "time" (LOG_ROTATE_WHEN)
+- LOG_MAX_BYTES=10485760     Segment size for size rotation
+- LOG_ROTATE_WHEN=midnight   TimedRotatingFileHandler interval for time rotation
+- LOG_BACKUP_COUNT=10        Rotated segments kept
+- LOG_COMPRESS=1             Gzip rotated segments (0 = keep them plain)
+- LOG_JSON_FILE=             JSON-lines file name in log_dir ("" = disabled)
 """
 
+import atexit
+import copy
+import datetime
+import gzip
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+# LogRecord attributes that are not user `extra` fields (kept out of the JSON "extra" object)
+_ATTRIBUTI_RECORD = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, thread and any `extra` fields."""
+
+    def format(self, record):
+        voce = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        extra = {k: v for k, v in vars(record).items() if k not in _ATTRIBUTI_RECORD}
+        if extra:
+            voce["extra"] = extra
+        if record.exc_info:
+            voce["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            voce["exception"] = record.exc_text  # Rendered by the queue handler
+        return json.dumps(voce, default=str, ensure_ascii=False)
+
+
+class _CodaHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps `extra` fields and the traceback for the JSON sink."""
+
+    def prepare(self, record):
+        # Merge the args and render the traceback here (the record crosses threads), but keep
+        # message and traceback apart so the text and JSON sinks can each format them
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _ruota_gzip(sorgente, destinazione):
+    """Rotator: compress the closed segment (runs in the listener thread)."""
+    with open(sorgente, "rb") as ingresso, gzip.open(destinazione, "wb") as uscita:
+        shutil.copyfileobj(ingresso, uscita)
+    os.remove(sorgente)
+
 
-def configure_logging(log_dir="logs", log_file="app.log"):
+def _file_handler(percorso, rotation, max_bytes, when, backup_count, compress):
+    if rotation == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(percorso, when=when, backupCount=backup_count,
+                                                            encoding="utf-8")
+    else:
+        handler = logging.handlers.RotatingFileHandler(percorso, maxBytes=max_bytes, backupCount=backup_count,
+                                                       encoding="utf-8")
+    if compress:
+        handler.namer = lambda nome: nome + ".gz"
+        handler.rotator = _ruota_gzip
+    return handler
+
+
+def configure_logging(log_dir="logs", log_file="app.log", rotation=None, max_bytes=None, when=None,
+                      backup_count=None, compress=None, json_file=None, level=logging.INFO):
     """
     Initialize application-wide logging to file and console.
-    
-    This function sets up dual handlers:
-    - FileHandler: Persistent audit trail of all operations (required for compliance)
+
+    This function sets up the sinks behind a queue:
+    - Rotating file: Persistent audit trail of all operations (required for compliance)
     - StreamHandler: Real-time console output for live monitoring
-    
+    - JSON lines (optional): Structured records for log shippers and analysis
+
+    Calling it again replaces the previous configuration.
+
     Args:
         log_dir (str): Directory where log files are stored. Created if non-existent.
         log_file (str): Filename for the main application log.
-    
+        rotation (str, optional): "size" or "time" (defaults to LOG_ROTATION).
+        max_bytes (int, optional): Segment size for size rotation (defaults to LOG_MAX_BYTES).
+        when (str, optional): Interval for time rotation (defaults to LOG_ROTATE_WHEN).
+        backup_count (int, optional): Rotated segments kept (defaults to LOG_BACKUP_COUNT).
+        compress (bool, optional): Gzip rotated segments (defaults to LOG_COMPRESS).
+        json_file (str, optional): JSON-lines filename in log_dir ("" disables it; defaults to LOG_JSON_FILE).
+        level (int): Root logger level.
+
     Returns:
-        None: Modifies the root logger in-place.
+        logging.handlers.QueueListener: The running listener (stopped automatically at exit).
     """
+    global _listener
+
+    rotation = rotation or os.getenv("LOG_ROTATION", "size")
+    max_bytes = max_bytes if max_bytes is not None else int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    when = when or os.getenv("LOG_ROTATE_WHEN", "midnight")
+    backup_count = backup_count if backup_count is not None else int(os.getenv("LOG_BACKUP_COUNT", "10"))
+    compress = compress if compress is not None else os.getenv("LOG_COMPRESS", "1") not in ("0", "false", "False", "")
+    json_file = json_file if json_file is not None else os.getenv("LOG_JSON_FILE", "")
 
     # Create logs directory if it doesn't exist
     Path(log_dir).mkdir(parents=True, exist_ok=True)
-    log_path = os.path.join(log_dir, log_file)
-
-    # Configure root logger with ISO 8601 timestamps for compliance
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        handlers=[
-            logging.FileHandler(log_path, encoding="utf-8"),  # Persistent audit trail
-            logging.StreamHandler(),  # Real-time console output
-        ],
-    )
+
+    # Configure sinks with ISO 8601 timestamps for compliance
+    testo = logging.Formatter(LOG_FORMAT)
+    sinks = [
+        _file_handler(os.path.join(log_dir, log_file), rotation, max_bytes, when, backup_count, compress),  # Persistent audit trail
+        logging.StreamHandler(),  # Real-time console output
+    ]
+    for handler in sinks:
+        handler.setFormatter(testo)
+    if json_file:
+        handler = _file_handler(os.path.join(log_dir, json_file), rotation, max_bytes, when, backup_count, compress)
+        handler.setFormatter(JsonFormatter())
+        sinks.append(handler)
+
+    if _listener is not None:
+        shutdown_logging()
+
+    coda = queue.SimpleQueue()  # Unbounded, lock-free put: the caller never waits for I/O
+    root = logging.getLogger()
+    for vecchio in list(root.handlers):
+        root.removeHandler(vecchio)
+        vecchio.close()
+    root.addHandler(_CodaHandler(coda))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(coda, *sinks, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush the queue, stop the listener thread and close the sinks."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()  # Drains every queued record first
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(shutdown_logging)
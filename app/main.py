@@ -2,30 +2,27 @@
 Main application entry point for the QUANT AI TERMINAL.
 
 Initializes logging, launches the CustomTkinter user interface, 
-and automatically spins up the Streamlit Web Dashboard in the background.
+and automatically spins up the Streamlit Web Dashboard in the background
+once the window is on screen.
+
+Heavy dependencies (pandas, MetaTrader5, yfinance, groq, ...) are imported
+lazily by the modules that use them (app/lazy.py), so the window appears
+before any of them is loaded. `python -m app.benchmarks startup` enforces
+the time-to-first-window budget (config.STARTUP_BUDGET_SECONDS).
 """
 
+from app import config
 from app.logging_setup import configure_logging
 from app.ui import TradingApp
 import subprocess
 import atexit
 import sys
 
-def main():
-    """
-    Application bootstrap function.
-    
-    Sequence:
-    1. Configure logging
-    2. Start Streamlit Web Dashboard as a background process
-    3. Initialize UI (CustomTkinter app)
-    4. Start event loop
-    """
-    configure_logging()
-    
-    # 🌐 AUTOMATIC BACKGROUND START OF THE WEB DASHBOARD
+
+def _avvia_dashboard():
+    """Start the Streamlit Web Dashboard as a background process (terminated at exit)."""
     print("🔄 Spinning up remote Web Dashboard on port 8501...")
-    
+
     # Execute the Streamlit command. "--server.headless true" prevents it from
     # opening a new browser tab on the server every single time the bot starts.
     dashboard_process = subprocess.Popen(
@@ -33,14 +30,30 @@ def main():
         stdout=subprocess.DEVNULL, # Hides verbose Streamlit logs from the main terminal
         stderr=subprocess.DEVNULL
     )
-    
+
     # Security: Ensure the web process is gracefully terminated when the UI (Tkinter) is closed
     atexit.register(lambda: dashboard_process.terminate())
+
+
+def main():
+    """
+    Application bootstrap function.
+    
+    Sequence:
+    1. Configure logging
+    2. Initialize UI (CustomTkinter app)
+    3. Schedule the Streamlit Web Dashboard start for after the first frame
+    4. Start event loop
+    """
+    configure_logging()
     
     # 🖥️ INITIALIZE THE MAIN GRAPHICAL USER INTERFACE
     app = TradingApp()
+
+    # 🌐 AUTOMATIC BACKGROUND START OF THE WEB DASHBOARD (once the window is up)
+    app.app.after(config.STARTUP_DEFERRED_MS, _avvia_dashboard)
     app.run()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
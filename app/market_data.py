@@ -6,20 +6,78 @@ disk I/O while computing institutional-grade market metrics including
 CAGR, max drawdown, and annualized volatility.
 
 Cache Strategy:
+- Storage: one uncompressed Arrow/Feather file per ticker (cache/<ticker>.arrow),
+  memory-mapped on read; legacy CSV caches are migrated automatically
+- Coverage: covered request intervals per ticker (cache/<ticker>.coverage.json)
 - First call: Download from Yahoo Finance, persist to disk
-- Subsequent calls: Check cache freshness (end_date >= requested_end)
-- If cache extends to requested period, return cached data (0 API calls)
-- Otherwise: Download fresh data and update cache
+- Subsequent calls: Download only the uncovered head/tail/hole gaps and merge them
+- If the cache covers the requested period, return cached data (0 API calls)
+- Baskets: download_price_histories warms many tickers with one batched request
+- Batches: compute_market_metrics_batch / get_market_snapshots rank whole baskets
+  column-wise in one vectorized pass
+- Memory: an in-process LRU (price_cache_stats) serves repeated loads of unchanged
+  files without touching the disk
 """
 
 import datetime
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
+import pyarrow.feather as feather
 
+from app import config
+from app.lazy import LazyModule
 
-def _get_cache_path(ticker, cache_dir):
+logger = logging.getLogger(__name__)
+
+yf = LazyModule("yfinance")  # Only needed on a cache miss: cached runs never import it
+
+# In-process LRU over the disk cache: cache path → (file signature, frame, coverage)
+_MEMORIA = OrderedDict()
+_MEMORIA_LOCK = threading.Lock()
+_MEMORIA_CAPACITA = config.PRICE_CACHE_MEMORY_TICKERS
+_STATISTICHE = {"hits": 0, "misses": 0, "evictions": 0}
+
+# MT5 broker naming → Yahoo Finance naming
+_VALUTE_FOREX = {"USD", "EUR", "GBP", "JPY", "CHF", "CAD", "AUD", "NZD", "SEK", "NOK"}
+_CRYPTO_BASE = {"BTC", "ETH", "SOL", "XRP", "LTC", "ADA", "DOGE", "DOT", "BNB"}
+_SUFFISSI_BROKER_US = (".OQ", ".N", ".NAS", ".NYSE", ".US")
+
+
+def to_yahoo_symbol(ticker):
+    """
+    Map an MT5 broker symbol to its Yahoo Finance ticker.
+
+    Examples: EURUSD → EURUSD=X, BTCUSD → BTC-USD, AAPL.OQ → AAPL.
+    Symbols already in Yahoo form (SPY, BTC-USD, SAP.DE) are returned unchanged.
+
+    Args:
+        ticker (str): Broker or Yahoo symbol.
+
+    Returns:
+        str: Yahoo Finance symbol.
+    """
+    simbolo = ticker.strip().upper()
+    for suffisso in _SUFFISSI_BROKER_US:
+        if simbolo.endswith(suffisso):
+            return simbolo[: -len(suffisso)]
+    if len(simbolo) in (6, 7) and simbolo.isalpha():
+        base, quotata = simbolo[:-3], simbolo[-3:]
+        if base in _CRYPTO_BASE and quotata in ("USD", "EUR"):
+            return f"{base}-{quotata}"
+        if base in _VALUTE_FOREX and quotata in _VALUTE_FOREX:
+            return f"{simbolo}=X"
+    return simbolo
+
+
+def _get_cache_path(ticker, cache_dir, suffix=".arrow"):
     """
     Generate a sanitized cache file path for a given ticker symbol.
     
@@ -29,29 +87,333 @@ def _get_cache_path(ticker, cache_dir):
     Args:
         ticker (str): Raw ticker symbol (e.g., "EURUSD", "BTC/USD").
         cache_dir (str): Root directory for cached data files.
+        suffix (str): File extension (".arrow" cache, ".csv" legacy cache).
     
     Returns:
-        Path: Pathlib Path object pointing to the cached CSV file.
+        Path: Pathlib Path object pointing to the cached file.
     """
     safe_ticker = ticker.replace("/", "_").replace("\\", "_")
-    return Path(cache_dir) / f"{safe_ticker}.csv"
+    return Path(cache_dir) / f"{safe_ticker}{suffix}"
+
+
+def _leggi_cache(cache_path):
+    """
+    Memory-map an Arrow/Feather cache file into a DataFrame indexed by Date.
+
+    Files are stored uncompressed so the OS maps them straight into memory:
+    no parsing, no full-file copy on read.
+    """
+    tabella = feather.read_table(cache_path, memory_map=True)
+    # Columns are wrapped as numpy views over the mapped file (zero-copy when null-free)
+    indice = pd.DatetimeIndex(tabella.column("Date").to_numpy(), name="Date")
+    colonne = {nome: tabella.column(nome).to_numpy() for nome in tabella.column_names if nome != "Date"}
+    return pd.DataFrame(colonne, index=indice, copy=False)
+
+
+def _finestra(data, start, end):
+    """Inclusive [start, end] date slice by binary search (avoids string parsing in .loc)."""
+    indice = data.index
+    i = indice.searchsorted(pd.Timestamp(start), side="left")
+    j = indice.searchsorted(pd.Timestamp(end).normalize() + pd.Timedelta(days=1), side="left")
+    return data.iloc[i:j]
+
+
+def _file_temporaneo(destinazione):
+    """Unique temp file next to `destinazione` (same filesystem, so os.replace stays atomic)."""
+    fd, percorso = tempfile.mkstemp(dir=destinazione.parent, prefix=f"{destinazione.name}.", suffix=".tmp")
+    os.close(fd)
+    return Path(percorso)
+
+
+def _sostituisci(tmp_path, destinazione):
+    """
+    Atomically move a finished temp file into place.
+
+    Sweep workers and BacktestRunner jobs refresh the same ticker concurrently:
+    losing the race (or hitting a file still memory-mapped on Windows) keeps
+    the file already in place, which is just as fresh, and the next refresh
+    retries.
+
+    Returns:
+        bool: True if the file was replaced.
+    """
+    try:
+        os.replace(tmp_path, destinazione)
+        return True
+    except (PermissionError, FileNotFoundError):
+        tmp_path.unlink(missing_ok=True)
+        logger.warning("Price cache %s is in use, refresh not persisted", destinazione)
+        return False
+
+
+def _scrivi_cache(cache_path, data):
+    """Atomically write an OHLCV frame as an uncompressed Feather (Arrow IPC) file."""
+    _dimentica(cache_path)  # Drop our own mapping first (Windows cannot replace a mapped file)
+    frame = data.rename_axis("Date").reset_index()
+    frame["Date"] = pd.to_datetime(frame["Date"])
+    tmp_path = _file_temporaneo(cache_path)
+    try:
+        feather.write_feather(frame, tmp_path, compression="uncompressed")
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    _sostituisci(tmp_path, cache_path)
+
+
+def _migra_csv(ticker, cache_dir):
+    """
+    Convert a legacy per-ticker CSV cache to Arrow (then remove the CSV).
+
+    Returns:
+        bool: True if a CSV was migrated.
+    """
+    csv_path = _get_cache_path(ticker, cache_dir, suffix=".csv")
+    if not csv_path.exists():
+        return False
+    try:
+        legacy = pd.read_csv(csv_path, parse_dates=["Date"], index_col="Date")
+    except (ValueError, KeyError):
+        return False  # Unreadable (e.g. multi-level header): left for a fresh download
+    if legacy.empty:
+        return False
+    _scrivi_cache(_get_cache_path(ticker, cache_dir), legacy)
+    csv_path.unlink()
+    return True
+
+
+def migrate_csv_cache(cache_dir="cache"):
+    """
+    Migrate every legacy CSV file in the cache directory to Arrow.
+
+    Args:
+        cache_dir (str): Price cache directory.
+
+    Returns:
+        int: Number of tickers migrated.
+    """
+    cartella = Path(cache_dir)
+    if not cartella.exists():
+        return 0
+    return sum(_migra_csv(path.stem, cache_dir) for path in sorted(cartella.glob("*.csv")))
+
+
+# Empty gap downloads up to this many days (weekends, holidays) still count as covered;
+# longer ones (unless before the first listed bar) are treated as failures and retried.
+_BUCO_VUOTO_MAX_GIORNI = 4
+
+
+def _come_data(valore):
+    """Normalize a date/datetime/Timestamp/string to datetime.date."""
+    return pd.Timestamp(valore).date()
+
+
+def _unisci_intervalli(intervalli):
+    """Merge overlapping or touching [start, end) date intervals."""
+    uniti = []
+    for inizio, fine in sorted(intervalli):
+        if uniti and inizio <= uniti[-1][1]:
+            uniti[-1][1] = max(uniti[-1][1], fine)
+        else:
+            uniti.append([inizio, fine])
+    return [tuple(x) for x in uniti]
+
+
+def _buchi(coperti, start, end):
+    """Sub-intervals of [start, end) not covered by the merged intervals."""
+    buchi, cursore = [], start
+    for inizio, fine in coperti:
+        if fine <= cursore:
+            continue
+        if inizio >= end:
+            break
+        if inizio > cursore:
+            buchi.append((cursore, min(inizio, end)))
+        cursore = max(cursore, fine)
+    if cursore < end:
+        buchi.append((cursore, end))
+    return buchi
+
+
+def _leggi_copertura(coverage_path, cached):
+    """
+    Load the covered request intervals for a ticker.
+
+    Caches written before the sidecar existed are assumed to cover
+    [first bar, last bar] of their data.
+    """
+    if coverage_path.exists():
+        try:
+            righe = json.loads(coverage_path.read_text())
+            return _unisci_intervalli((_come_data(a), _come_data(b)) for a, b in righe)
+        except (OSError, ValueError, TypeError):
+            pass
+    if cached.empty:
+        return []
+    return [(cached.index.min().date(), cached.index.max().date() + datetime.timedelta(days=1))]
+
+
+def _scrivi_copertura(coverage_path, intervalli):
+    tmp_path = _file_temporaneo(coverage_path)
+    try:
+        tmp_path.write_text(json.dumps([[a.isoformat(), b.isoformat()] for a, b in intervalli]))
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    _sostituisci(tmp_path, coverage_path)
+
+
+def _firma_file(*paths):
+    """(mtime_ns, size) per path, None when missing: any rewrite changes the signature."""
+    firma = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            firma.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            firma.append(None)
+    return tuple(firma)
+
+
+def _dimentica(cache_path):
+    with _MEMORIA_LOCK:
+        _MEMORIA.pop(str(cache_path), None)
+
+
+def _memorizza(chiave, firma, cached, coperti):
+    with _MEMORIA_LOCK:
+        _MEMORIA[chiave] = (firma, cached, coperti)
+        _MEMORIA.move_to_end(chiave)
+        while len(_MEMORIA) > _MEMORIA_CAPACITA:
+            _MEMORIA.popitem(last=False)
+            _STATISTICHE["evictions"] += 1
+
+
+def price_cache_stats():
+    """
+    Hit/miss counters of the in-process price history LRU.
+
+    Returns:
+        dict: hits, misses, evictions, hit_rate, size and capacity (tickers).
+    """
+    with _MEMORIA_LOCK:
+        totale = _STATISTICHE["hits"] + _STATISTICHE["misses"]
+        return {
+            **_STATISTICHE,
+            "hit_rate": _STATISTICHE["hits"] / totale if totale else 0.0,
+            "size": len(_MEMORIA),
+            "capacity": _MEMORIA_CAPACITA,
+        }
+
+
+def clear_price_cache_memory(capacity=None):
+    """
+    Empty the in-process price history LRU and reset its counters.
+
+    Args:
+        capacity (int, optional): New maximum number of tickers kept in memory
+            (defaults to the current one, config.PRICE_CACHE_MEMORY_TICKERS at start).
+    """
+    global _MEMORIA_CAPACITA
+    with _MEMORIA_LOCK:
+        _MEMORIA.clear()
+        _STATISTICHE.update(hits=0, misses=0, evictions=0)
+        if capacity is not None:
+            _MEMORIA_CAPACITA = max(0, int(capacity))
+
+
+def _stato_cache(ticker, cache_dir):
+    """
+    Load a ticker's cached series and covered intervals.
+
+    Served from the in-process LRU while the Arrow and coverage files are
+    unchanged on disk (no parsing, no mapping). Cached frames wrap the read-only
+    memory map, so in-place writes raise instead of corrupting later reads.
+
+    Returns:
+        tuple: (cache_path, coverage_path, cached DataFrame, covered intervals).
+    """
+    cache_path = _get_cache_path(ticker, cache_dir)
+    coverage_path = _get_cache_path(ticker, cache_dir, suffix=".coverage.json")
+    chiave = str(cache_path)
+
+    firma = _firma_file(cache_path, coverage_path)
+    with _MEMORIA_LOCK:
+        voce = _MEMORIA.get(chiave)
+        if voce is not None and firma[0] is not None and voce[0] == firma:
+            _MEMORIA.move_to_end(chiave)
+            _STATISTICHE["hits"] += 1
+            return cache_path, coverage_path, voce[1], voce[2]
+        _STATISTICHE["misses"] += 1
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    if not cache_path.exists():
+        _migra_csv(ticker, cache_dir)
+
+    cached = pd.DataFrame()
+    if cache_path.exists():
+        try:
+            cached = _leggi_cache(cache_path)
+        except (OSError, ValueError, KeyError):
+            cached = pd.DataFrame()  # Corrupted cache file: re-download
+    coperti = tuple(_leggi_copertura(coverage_path, cached)) if not cached.empty else ()
+    if not cached.empty:
+        _memorizza(chiave, _firma_file(cache_path, coverage_path), cached, coperti)
+    return cache_path, coverage_path, cached, coperti
+
+
+def _integra_buchi(cache_path, coverage_path, cached, coperti, scaricati):
+    """
+    Merge downloaded gap frames into the stored series and extend the coverage.
+
+    Args:
+        scaricati (list): (gap start, gap end, DataFrame) per requested gap.
+
+    Returns:
+        tuple: (merged DataFrame, list of gaps left open because nothing came back).
+    """
+    nuovi = [data for _, _, data in scaricati if not data.empty]
+    if nuovi:
+        merged = pd.concat([cached, *nuovi]) if not cached.empty else pd.concat(nuovi)
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        _scrivi_cache(cache_path, merged)
+        cached = merged
+    if cached.empty:
+        return cached, [(b_inizio, b_fine) for b_inizio, b_fine, _ in scaricati]
+
+    oggi = datetime.date.today()
+    primo_bar = cached.index[0].date()
+    coperti_ora, aperti = list(coperti), []
+    for buco_inizio, buco_fine, data in scaricati:
+        # Empty gaps count as covered when short (weekend, holiday) or entirely before
+        # the first stored bar (pre-listing); longer ones look like a failed download
+        if data.empty and (buco_fine - buco_inizio).days > _BUCO_VUOTO_MAX_GIORNI and buco_fine > primo_bar:
+            aperti.append((buco_inizio, buco_fine))
+            continue  # Leave the gap open: retried on the next call
+        if buco_inizio < oggi:
+            coperti_ora.append((buco_inizio, min(buco_fine, oggi)))
+    _scrivi_copertura(coverage_path, _unisci_intervalli(coperti_ora))
+    return cached, aperti
 
 
 def get_price_history(ticker, start, end, cache_dir="cache"):
     """
-    Retrieve historical price data with intelligent disk caching.
+    Retrieve historical price data with a gap-aware incremental disk cache.
     
     Strategy:
-    1. Check if valid cached data exists on disk
-    2. If cache is complete (end_date >= requested_end), return cached data
-    3. Otherwise, download fresh data from Yahoo Finance and update cache
+    1. Load the cached series (memory-mapped Arrow file; a legacy CSV cache is
+       migrated on first access) and its covered request intervals
+       (cache/<ticker>.coverage.json)
+    2. Compute the parts of [start, end) not covered yet (head, tail or holes)
+    3. Download only those gaps, merge and deduplicate them into the stored series
+    4. Return the requested window
     
-    This minimizes API calls and disk I/O while maintaining data freshness.
+    Coverage never extends to today or beyond, since today's bar is still
+    forming; a daily refresh is therefore one small tail fetch.
     
     Args:
         ticker (str): Asset symbol (e.g., "SPY", "EURUSD").
         start (datetime.date or datetime.datetime): Period start date.
-        end (datetime.date or datetime.datetime): Period end date.
+        end (datetime.date or datetime.datetime): Period end date (exclusive, as yfinance).
         cache_dir (str): Directory for storing cached price data.
     
     Returns:
@@ -61,22 +423,102 @@ def get_price_history(ticker, start, end, cache_dir="cache"):
         ValueError: If no market data is available for the given ticker/period.
     """
 
-    cache_path = _get_cache_path(ticker, cache_dir)
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path, coverage_path, cached, coperti = _stato_cache(ticker, cache_dir)
+    buchi = _buchi(coperti, _come_data(start), _come_data(end))
+    if not buchi:
+        return _finestra(cached, start, end)
 
-    if cache_path.exists():
-        cached = pd.read_csv(cache_path, parse_dates=["Date"], index_col="Date")
-        if not cached.empty:
-            last_date = cached.index.max().date()
-            end_check = end - datetime.timedelta(days=1)
-            if last_date >= end_check:
-                return cached.loc[str(start):str(end)]
-
-    data = yf.download(ticker, start=start, end=end, progress=False, auto_adjust=True)
-    if data.empty:
+    scaricati = []
+    for buco_inizio, buco_fine in buchi:
+        data = yf.download(ticker, start=buco_inizio, end=buco_fine, progress=False, auto_adjust=True)
+        scaricati.append((buco_inizio, buco_fine, _normalizza_colonne(data) if not data.empty else data))
+
+    cached, _ = _integra_buchi(cache_path, coverage_path, cached, coperti, scaricati)
+    if cached.empty:
         raise ValueError("Market data not available")
+    return _finestra(cached, start, end)
+
+
+def _colonne_ticker(data, simbolo):
+    """Extract one symbol's OHLCV from a grouped multi-ticker yfinance frame."""
+    if not isinstance(data.columns, pd.MultiIndex):
+        return _normalizza_colonne(data)  # Single-symbol download: flat layout
+    for livello in range(data.columns.nlevels):
+        if simbolo in data.columns.get_level_values(livello):
+            frame = data.xs(simbolo, axis=1, level=livello)
+            return _normalizza_colonne(frame.dropna(how="all"))
+    return pd.DataFrame()
+
+
+def download_price_histories(tickers, start, end, cache_dir="cache"):
+    """
+    Warm the price cache for a whole basket with one batched Yahoo Finance request.
+
+    Accepts broker or Yahoo symbols (e.g. a watchlist from TradingApp.watchlist_map);
+    they are mapped with to_yahoo_symbol and cached under the Yahoo name. Symbols
+    already covered for [start, end) are skipped; the rest are downloaded together
+    over the union of their gaps and split into the per-ticker Arrow caches.
+
+    Args:
+        tickers (list): Asset symbols.
+        start (datetime.date or datetime.datetime): Period start date.
+        end (datetime.date or datetime.datetime): Period end date (exclusive, as yfinance).
+        cache_dir (str): Directory for storing cached price data.
+
+    Returns:
+        dict: Outcome per category (Yahoo symbols):
+            - cached (list): Already covered, no download needed
+            - downloaded (list): Gaps fetched and merged into the cache
+            - failed (list): No data returned for at least one gap
+    """
+    inizio, fine = _come_data(start), _come_data(end)
+    esito = {"cached": [], "downloaded": [], "failed": []}
+
+    stati = {}
+    for simbolo in dict.fromkeys(to_yahoo_symbol(t) for t in tickers if t.strip()):
+        stato = _stato_cache(simbolo, cache_dir)
+        buchi = _buchi(stato[3], inizio, fine)
+        if buchi:
+            stati[simbolo] = (stato, buchi)
+        else:
+            esito["cached"].append(simbolo)
+    if not stati:
+        return esito
+
+    # One request over the union of every gap; each ticker keeps only its own gaps
+    da = min(buchi[0][0] for _, buchi in stati.values())
+    a = max(buchi[-1][1] for _, buchi in stati.values())
+    try:
+        data = yf.download(list(stati), start=da, end=a, group_by="ticker",
+                           progress=False, auto_adjust=True, threads=True)
+    except Exception as exc:
+        logger.warning("Bulk download failed for %d symbols: %s", len(stati), exc)
+        data = pd.DataFrame()
+
+    for simbolo, ((cache_path, coverage_path, cached, coperti), buchi) in stati.items():
+        frame = _colonne_ticker(data, simbolo) if not data.empty else pd.DataFrame()
+        scaricati = [(b_inizio, b_fine, _finestra(frame, b_inizio, b_fine - datetime.timedelta(days=1))
+                      if not frame.empty else frame) for b_inizio, b_fine in buchi]
+        merged, aperti = _integra_buchi(cache_path, coverage_path, cached, coperti, scaricati)
+        esito["failed" if aperti or merged.empty else "downloaded"].append(simbolo)
+
+    if esito["failed"]:
+        logger.warning("Bulk download: no data for %s", ", ".join(esito["failed"]))
+    return esito
+
 
-    data.to_csv(cache_path)
+def _normalizza_colonne(data):
+    """
+    Flatten yfinance column layouts to plain OHLCV names with a "Date" index.
+
+    Recent yfinance releases return (Price, Ticker) MultiIndex columns even for a
+    single ticker; the cache and the backtest feed expect Open/High/Low/Close/Volume.
+    """
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.copy()
+        data.columns = data.columns.get_level_values(0)
+    data.columns.name = None
+    data.index.name = "Date"
     return data
 
 
@@ -176,3 +618,153 @@ def get_market_snapshot(ticker):
         "volatility": volatility,
         "last_update": end,
     }
+
+
+def _somma_mobile(valori, finestra):
+    """Trailing sum over `finestra` columns (shorter at the start) per row."""
+    cumulata = np.cumsum(valori, axis=1)
+    cumulata[:, finestra:] = cumulata[:, finestra:] - cumulata[:, :-finestra]
+    return cumulata
+
+
+def _massimo_mobile(valori, finestra):
+    """
+    Trailing NaN-ignoring max over `finestra` columns per row (van Herk/Gil-Werman).
+
+    Prefix and suffix maxima inside fixed blocks give every window's max with a
+    constant number of passes, independent of the window length.
+    """
+    k, n = valori.shape
+    lunghezza = -(-(n + finestra - 1) // finestra) * finestra
+    riempito = np.full((k, lunghezza), np.nan)
+    riempito[:, finestra - 1:finestra - 1 + n] = valori
+    blocchi = riempito.reshape(k, -1, finestra)
+    prefisso = np.fmax.accumulate(blocchi, axis=2).reshape(k, -1)
+    suffisso = np.fmax.accumulate(blocchi[:, :, ::-1], axis=2)[:, :, ::-1].reshape(k, -1)
+    return np.fmax(suffisso[:, :n], prefisso[:, finestra - 1:finestra - 1 + n])
+
+
+def compute_market_metrics_batch(closes, rolling_window=63):
+    """
+    Column-wise market metrics for many assets in one vectorized pass.
+
+    Per column the figures match compute_market_metrics on that column's
+    non-NaN closes (assets may have different calendars or listing dates),
+    plus the return over the trailing 365 days of the frame.
+
+    Args:
+        closes (pd.DataFrame): Wide frame of daily closes, one column per ticker,
+            DatetimeIndex sorted ascending.
+        rolling_window (int, optional): Rows per rolling window; None skips the
+            rolling outputs.
+
+    Returns:
+        dict:
+            - metrics (pd.DataFrame): One row per ticker with total_return, cagr,
+              max_drawdown, volatility and one_year_return (NaN with < 2 closes)
+            - rolling_volatility (pd.DataFrame or None): Annualized volatility over
+              the window (at least half of it valid)
+            - rolling_drawdown (pd.DataFrame or None): Drawdown from the window's peak
+    """
+    # One row per ticker: every reduction runs along contiguous memory
+    prezzi = np.ascontiguousarray(closes.to_numpy(dtype=np.float64).T)
+    k, n = prezzi.shape
+    colonne = np.arange(n)
+    righe = np.arange(k)[:, None]
+    validi = ~np.isnan(prezzi)
+    presenti = validi.any(axis=1)
+    primo = np.where(presenti, validi.argmax(axis=1), n)
+    ultimo = np.where(presenti, n - 1 - validi[:, ::-1].argmax(axis=1), 0)
+
+    # Forward fill, then returns between consecutive valid closes (gaps add no zero returns)
+    riempiti = prezzi[righe, np.maximum.accumulate(np.where(validi, colonne, 0), axis=1)]
+    dopo_primo = colonne > primo[:, None]
+    ritorni = np.full_like(prezzi, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ritorni[:, 1:] = riempiti[:, 1:] / riempiti[:, :-1] - 1.0
+        usati = validi & dopo_primo
+        n_ritorni = usati.sum(axis=1)
+        media = np.where(usati, ritorni, 0.0).sum(axis=1) / n_ritorni
+        varianza = (np.where(usati, ritorni - media[:, None], 0.0) ** 2).sum(axis=1) / (n_ritorni - 1)
+        volatilita = np.where(n_ritorni >= 2, np.sqrt(varianza * 252), np.nan)
+
+        # Peak tracked from the first return on, as compute_market_metrics' cumprod
+        cumulato = np.where(dopo_primo, riempiti, np.nan)
+        max_dd = np.fmin.reduce(cumulato / np.fmax.accumulate(cumulato, axis=1) - 1.0, axis=1)
+
+        p_inizio = np.where(presenti, prezzi[np.arange(k), np.minimum(primo, n - 1)], np.nan)
+        p_fine = np.where(presenti, prezzi[np.arange(k), ultimo], np.nan)
+        date = closes.index.to_numpy()
+        anni = np.maximum((date[ultimo] - date[np.minimum(primo, n - 1)]) / np.timedelta64(1, "D") / 365.25, 1e-6)
+
+        inizio_anno = closes.index.searchsorted(closes.index[-1] - pd.Timedelta(days=365))
+        validi_anno = validi & (colonne >= inizio_anno)
+        primo_anno = validi_anno.argmax(axis=1)
+        p_anno = np.where(validi_anno.any(axis=1), prezzi[np.arange(k), primo_anno], np.nan)
+
+        ok = n_ritorni >= 1
+        metrics = pd.DataFrame({
+            "total_return": np.where(ok, p_fine / p_inizio - 1.0, np.nan),
+            "cagr": np.where(ok, (p_fine / p_inizio) ** (1.0 / anni) - 1.0, np.nan),
+            "max_drawdown": np.where(ok, max_dd, np.nan),
+            "volatility": volatilita,
+            "one_year_return": np.where(ok, p_fine / p_anno - 1.0, np.nan),
+        }, index=closes.columns)
+
+    rolling_vol = rolling_dd = None
+    if rolling_window:
+        # Rolling sums by cumsum differences, rolling peak by block prefix/suffix maxima: O(rows)
+        conteggio = _somma_mobile(usati.astype(np.float64), rolling_window)
+        somma = _somma_mobile(np.where(usati, ritorni, 0.0), rolling_window)
+        somma_q = _somma_mobile(np.where(usati, ritorni, 0.0) ** 2, rolling_window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            varianza = np.maximum(somma_q - somma ** 2 / conteggio, 0.0) / (conteggio - 1)
+            vol = np.where(conteggio >= max(2, rolling_window // 2), np.sqrt(varianza * 252), np.nan)
+            dd = riempiti / _massimo_mobile(riempiti, rolling_window) - 1.0
+        rolling_vol = pd.DataFrame(vol.T, index=closes.index, columns=closes.columns)
+        rolling_dd = pd.DataFrame(dd.T, index=closes.index, columns=closes.columns)
+
+    return {"metrics": metrics, "rolling_volatility": rolling_vol, "rolling_drawdown": rolling_dd}
+
+
+def get_market_snapshots(tickers, cache_dir="cache"):
+    """
+    Point-in-time snapshots for a whole basket (batch get_market_snapshot).
+
+    Warms the cache with one batched download, then derives every snapshot from
+    a single wide close frame.
+
+    Args:
+        tickers (list): Broker or Yahoo symbols (e.g. a watchlist).
+        cache_dir (str): Directory for storing cached price data.
+
+    Returns:
+        pd.DataFrame: Indexed by the given tickers, with last_close,
+            one_year_return, volatility and last_update. Symbols without data
+            are left out (and logged by download_price_histories).
+    """
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=365)
+    falliti = set(download_price_histories(tickers, start, end, cache_dir=cache_dir)["failed"])
+
+    serie = {}
+    for ticker in dict.fromkeys(t.strip() for t in tickers if t.strip()):
+        if to_yahoo_symbol(ticker) in falliti:
+            continue
+        try:
+            serie[ticker] = get_price_history(to_yahoo_symbol(ticker), start, end, cache_dir=cache_dir)["Close"]
+        except ValueError:
+            continue
+    if not serie:
+        return pd.DataFrame(columns=["last_close", "one_year_return", "volatility", "last_update"])
+
+    closes = pd.DataFrame(serie)
+    metrics = compute_market_metrics_batch(closes, rolling_window=None)["metrics"]
+    ultimi = closes.ffill().iloc[-1]
+    # The window is already one year: the whole-period return is the snapshot's one-year return
+    return pd.DataFrame({
+        "last_close": ultimi,
+        "one_year_return": metrics["total_return"],
+        "volatility": metrics["volatility"],
+        "last_update": end,
+    }).dropna(subset=["last_close"])
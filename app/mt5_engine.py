@@ -18,18 +18,31 @@ Position Management:
 - Exit: Dynamic target based on position horizon (short-term aggressive, long-term conservative)
 - Commission: $6.00 per lot deducted from P&L for realistic backtesting
 """
-import pandas as pd
-import pandas_ta as ta
-import MetaTrader5 as mt5
-import time
 import datetime
 import threading
-import requests
 import csv
 import os
 import socket
 from dotenv import load_dotenv
 from app.ai_brain import analizza_sentiment_ollama
+from app.clock import SystemClock
+from app.config import (
+    COMMISSION_PER_LOT, RISK_UNIT_PCT,
+    SHORT_TP_RISK_MULT, SHORT_TP_COMM_MULT, SHORT_SL_RISK_MULT, SHORT_SL_COMM_MULT,
+    SHORT_TRAIL_COMM_MULT, SHORT_TRAIL_PCT,
+    LONG_SL_RISK_MULT, LONG_SL_COMM_MULT, LONG_TRAIL_COMM_MULT, LONG_TRAIL_PCT,
+    QUARANTINE_SKIP_SECONDS, QUARANTINE_LOSS_SECONDS, QUARANTINE_WIN_SECONDS,
+)
+from app.equity import equity_tracker
+from app.health import health_checker
+from app.profiling import profiler
+from app.recorder import recorder
+from app.lazy import LazyModule
+
+# Heavy dependencies are imported by the engine thread on first use, not when the UI starts
+pd = LazyModule("pandas")
+mt5 = LazyModule("MetaTrader5")
+requests = LazyModule("requests")
 
 load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
@@ -37,7 +50,6 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 # Global state machine: OFF → MONITORING → TRADING ↔ FORCED_CLOSURE
 stato_motore = "SPENTO"
 parametri_attivi = {}
-COMMISSION_PER_LOT = 6.0  # USD commission per lot (bid-ask equivalent)
 
 # Magic numbers: Unique identifiers for long-term vs short-term positions
 MAGIC_SHORT_TERM = 1001  # Day-trading, high frequency, aggressive targets
@@ -46,6 +58,9 @@ MAGIC_LONG_TERM = 2002   # Cassettista (investor), low frequency, durable positi
 # Telegram offset memory to avoid processing the same command twice
 ultimo_update_id_telegram = 0
 
+# Engine time source: wall clock in production, simulated clock for offline benchmarks/replays
+orologio = SystemClock()
+
 
 def invia_telegram(chat_ids_str, messaggio):
     """
@@ -134,7 +149,7 @@ def scrivi_registro_csv(ticker, lotti, prezzo_apertura, prezzo_chiusura, profitt
         writer = csv.writer(file)
         if not file_exists:
             writer.writerow(["Close Date", "Time", "Asset", "Type", "Lots", "Entry Price", "Exit Price", "Net P/L ($)", "Horizon"])
-        adesso = datetime.datetime.now()
+        adesso = orologio.now()
         writer.writerow([adesso.strftime("%Y-%m-%d"), adesso.strftime("%H:%M:%S"), ticker, tipo_trade, lotti, prezzo_apertura, prezzo_chiusura, f"{profitto_netto:.2f}", orizzonte])
 
 def aggiorna_csv_portafoglio_aperto(posizioni):
@@ -155,7 +170,7 @@ def aggiorna_csv_portafoglio_aperto(posizioni):
         writer = csv.writer(file)
         writer.writerow(["Ticker", "Entry Date", "Hold Days", "Trade Type", "Lots", "Entry Price", "Current Profit ($)", "Horizon (Magic)"])
         
-        adesso = datetime.datetime.now()
+        adesso = orologio.now()
         for pos in posizioni:
             data_acquisto = datetime.datetime.fromtimestamp(pos.time)
             giorni_hold = (adesso - data_acquisto).days
@@ -238,7 +253,7 @@ def is_mercato_aperto(ticker):
     """
     tick = mt5.symbol_info_tick(ticker)
     if not tick: return False
-    if time.time() - tick.time > 300: return False
+    if orologio.time() - tick.time > 300: return False
     return True
 
 def is_spread_accettabile(ticker):
@@ -277,7 +292,7 @@ def is_venerdi_chiusura():
     Returns:
         bool: True if Friday 21:30+ UTC, False otherwise.
     """
-    now = datetime.datetime.now()
+    now = orologio.now()
     return now.weekday() == 4 and ((now.hour == 21 and now.minute >= 30) or now.hour > 21)
 
 def esegui_trade_silenzioso(azione, ticker, budget_usd, orizzonte_temporale, commento_ai=""):
@@ -351,6 +366,7 @@ def check_technical_momentum(ticker, orizzonte):
     df = pd.DataFrame(rates)
     
     # Calculate indicators locally with pandas_ta (sub-millisecond latency, zero API calls)
+    import pandas_ta  # noqa: F401 - registers the DataFrame.ta accessor (no-op after the first call)
     df.ta.rsi(length=14, append=True)
     df.ta.bbands(length=20, std=2.0, append=True)
     
@@ -374,6 +390,74 @@ def check_technical_momentum(ticker, orizzonte):
         
     return "NEUTRAL", last_rsi, last_bb_mid
 
+def _sonda_internet():
+    try:
+        requests.get("https://8.8.8.8", timeout=3)
+        return True, ["   ✅ Internet Connection: OK"]
+    except Exception:
+        return False, ["   ❌ Internet Connection: UNAVAILABLE"]
+
+def _sonda_terminale():
+    # 2 & 3. MetaTrader 5 Terminal and Auto-Trading
+    term_info = mt5.terminal_info()
+    if term_info is None:
+        return False, ["   ❌ MetaTrader 5 Terminal: CLOSED/DISCONNECTED"]
+    if term_info.trade_allowed:
+        return True, ["   ✅ MetaTrader 5 Terminal: OPEN", "   ✅ MT5 Algo Trading: ENABLED"]
+    return False, ["   ✅ MetaTrader 5 Terminal: OPEN", "   ❌ MT5 Algo Trading: DISABLED (Press 'Auto Trading' in MT5!)"]
+
+def _sonda_account():
+    if mt5.account_info() is not None:
+        return True, ["   ✅ Account Broker: CONNECTED"]
+    return False, ["   ❌ Account Broker: DISCONNECTED (Log in to MT5!)"]
+
+def _sonda_chiave(variabile, nome):
+    def sonda():
+        if not os.getenv(variabile):
+            return False, [f"   ❌ {nome}: MISSING IN .env FILE"]
+        return True, [f"   ✅ {nome}: CONFIGURED"]
+    return sonda
+
+def _sonda_dashboard():
+    # Connects to a dummy external address to find the active local network IP
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))
+        local_ip = s.getsockname()[0]
+        s.close()
+        return True, [f"   🌐 Web Dashboard (LAN): http://{local_ip}:8501", f"   💻 Web Dashboard (Local): http://localhost:8501"]
+    except Exception:
+        return True, ["   🌐 Web Dashboard: http://localhost:8501"]
+
+# 🩺 Pre-flight probes: run concurrently by health_checker, passing network results cached for HEALTH_CACHE_TTL
+health_checker.register("internet", _sonda_internet, timeout=3.5)
+# MT5 probes stay in the engine thread (check()/poll()): the MetaTrader5 binding is not thread-safe.
+# They are cheap local IPC calls, never cached: algo trading or the broker session can drop at any moment
+health_checker.register("mt5_terminal", _sonda_terminale, background=False, cache=False)
+health_checker.register("mt5_account", _sonda_account, background=False, cache=False)
+health_checker.register("groq_key", _sonda_chiave("GROQ_API_KEY", "Groq API Key"))
+health_checker.register("news_key", _sonda_chiave("NEWS_API_KEY", "News API Key"))
+health_checker.register("dashboard", _sonda_dashboard, blocking=False)
+
+def esegui_health_check(custom_log):
+    """
+    Run the pre-flight System Health Check before Phase 1 starts.
+
+    Verifies internet connectivity, MT5 terminal and algo-trading status,
+    broker account, API keys, and resolves the LAN address of the Web Dashboard.
+    The probes run concurrently (app/health.py); results that passed within
+    HEALTH_CACHE_TTL (e.g. in the background monitor) are reused, so START
+    usually begins scanning without waiting on the network.
+
+    Args:
+        custom_log (callable): Logger used to report each probe outcome.
+
+    Returns:
+        bool: True if every blocking check passed, False otherwise.
+    """
+    custom_log("🔄 Executing System Health Check pre-startup...")
+    return health_checker.check(custom_log)
+
 def _loop_principale(mode, callbacks, param_iniziali):
     global stato_motore, parametri_attivi
 
@@ -384,6 +468,7 @@ def _loop_principale(mode, callbacks, param_iniziali):
         except: callbacks.get("log")(msg)
         
     imposta_ui = callbacks.get("running") 
+    fine_ciclo = callbacks.get("cycle")  # Optional hook: invoked once per loop iteration
     
     if not mt5.initialize():
         custom_log("❌ CRITICAL ERROR: MetaTrader 5 closed.")
@@ -393,20 +478,33 @@ def _loop_principale(mode, callbacks, param_iniziali):
     acc = mt5.account_info()
     if acc: custom_log(f"📡 Radar V11.0 (Massive Scan) connected to {acc.server}")
 
+    # 🩺 Background health monitor: keeps the pre-flight cache warm and reports regressions mid-session
+    def avviso_salute(nome, ok, righe):
+        if ok:
+            custom_log(f"✅ HEALTH RECOVERED: {nome}")
+        else:
+            custom_log(f"⚠️ HEALTH REGRESSION: {nome}")
+            invia_telegram(parametri_attivi.get("tg_chat", ""), f"⚠️ HEALTH REGRESSION: {nome}\n" + "\n".join(r.strip() for r in righe))
+        for riga in righe:
+            custom_log(riga)
+    health_checker.start(on_change=avviso_salute)
+
     memoria_asset = {} 
     profitto_giornaliero = 0.0 
-    session_start_time, ultimo_heartbeat = None, time.time()
+    session_start_time, ultimo_heartbeat = None, orologio.time()
     ultimo_stato_ui = None
     radar_ticks = 0 
     
     primo_giro_completato = False
 
-    giorno_corrente = datetime.datetime.now().day # 🕒 Keeps track of the current day
+    giorno_corrente = orologio.now().day # 🕒 Keeps track of the current day
 
     ultimo_mercato_autopilot = ""
     ultimo_stato_radar = ""
 
     while stato_motore != "SPENTO":
+        profiler.begin_cycle()
+        health_checker.poll()  # 🩺 MT5 probes of the health monitor, due every HEALTH_CHECK_INTERVAL
         
         # 📱 Listen for incoming remote commands via Telegram
         tg_chat_attuale = parametri_attivi.get("tg_chat", "")
@@ -414,6 +512,8 @@ def _loop_principale(mode, callbacks, param_iniziali):
             controlla_comandi_telegram(tg_chat_attuale)
 
         acc_live = mt5.account_info()
+        if acc_live:
+            equity_tracker.update(acc_live.equity, orologio.now())  # 📈 O(1) live equity/drawdown stats
         if acc_live and callbacks.get("portfolio"):
             callbacks.get("portfolio")(acc_live.margin_free, acc_live.equity - acc_live.margin_free)
         
@@ -422,70 +522,14 @@ def _loop_principale(mode, callbacks, param_iniziali):
             
             # Reset variables on START button press
             if session_start_time is None:
-                session_start_time = time.time()
+                session_start_time = orologio.time()
                 primo_giro_completato = False
                 autopilot_tickers = [] # 🧠 Dynamic Autopilot memory
                 
                 # ==========================================
                 # 🩺 SYSTEM HEALTH CHECK (Pre-Flight Test)
                 # ==========================================
-                custom_log("🔄 Executing System Health Check pre-startup...")
-                health_passed = True
-                
-                # 1. Test Internet Connection
-                try:
-                    requests.get("https://8.8.8.8", timeout=3)
-                    custom_log("   ✅ Internet Connection: OK")
-                except:
-                    custom_log("   ❌ Internet Connection: UNAVAILABLE")
-                    health_passed = False
-
-                # 2 & 3. Test MetaTrader 5 Terminal and Auto-Trading
-                term_info = mt5.terminal_info()
-                if term_info is not None:
-                    custom_log("   ✅ MetaTrader 5 Terminal: OPEN")
-                    if term_info.trade_allowed:
-                        custom_log("   ✅ MT5 Algo Trading: ENABLED")
-                    else:
-                        custom_log("   ❌ MT5 Algo Trading: DISABLED (Press 'Auto Trading' in MT5!)")
-                        health_passed = False
-                else:
-                    custom_log("   ❌ MetaTrader 5 Terminal: CLOSED/DISCONNECTED")
-                    health_passed = False
-
-                # 4. Test Account Broker
-                if mt5.account_info() is not None:
-                    custom_log("   ✅ Account Broker: CONNECTED")
-                else:
-                    custom_log("   ❌ Account Broker: DISCONNECTED (Log in to MT5!)")
-                    health_passed = False
-
-                # 5. Test API Groq
-                if not os.getenv("GROQ_API_KEY"):
-                    custom_log("   ❌ Groq API Key: MISSING IN .env FILE")
-                    health_passed = False
-                else:
-                    custom_log("   ✅ Groq API Key: CONFIGURED")
-                    
-                # 6. Test API News
-                if not os.getenv("NEWS_API_KEY"):
-                    custom_log("   ❌ News API Key: MISSING IN .env FILE")
-                    health_passed = False
-                else:
-                    custom_log("   ✅ News API Key: CONFIGURED")
-
-                # 7. Resolve Local IP for Web Dashboard
-                try:
-                    # Connects to a dummy external address to find the active local network IP
-                    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                    s.connect(("8.8.8.8", 80))
-                    local_ip = s.getsockname()[0]
-                    s.close()
-                    custom_log(f"   🌐 Web Dashboard (LAN): http://{local_ip}:8501")
-                    custom_log(f"   💻 Web Dashboard (Local): http://localhost:8501")
-                except Exception:
-                    custom_log("   🌐 Web Dashboard: http://localhost:8501")
-
+                health_passed = esegui_health_check(custom_log)
                 if not health_passed:
                     custom_log("🛑 HEALTH CHECK FAILED. Fix errors and retry.")
                     stato_motore = "CHIUSURA_FORZATA"
@@ -511,11 +555,11 @@ def _loop_principale(mode, callbacks, param_iniziali):
                     last_autopilot_scan = 0
 
                 # Execute web discovery ONLY once per hour (3600s) to prevent loop spam
-                if time.time() - last_autopilot_scan > 3600:
-                    last_autopilot_scan = time.time()
+                if orologio.time() - last_autopilot_scan > 3600:
+                    last_autopilot_scan = orologio.time()
                     
                     # Determine active region and high-conviction global tickers
-                    utc_h = datetime.datetime.utcnow().hour
+                    utc_h = orologio.utcnow().hour
                     if 14 <= utc_h < 21:
                         region, market_label = "US", "🇺🇸 Wall Street (US)"
                         fallback = ["NVDA", "TSLA", "PLTR", "MSTR", "AAPL", "AMD", "MSFT", "META", "AMZN"]
@@ -587,7 +631,7 @@ def _loop_principale(mode, callbacks, param_iniziali):
             venerdi_sera = is_venerdi_chiusura()
 
             # 🔄 MIDNIGHT RESET
-            oggi = datetime.datetime.now().day
+            oggi = orologio.now().day
             if oggi != giorno_corrente:
                 profitto_giornaliero = 0.0
                 giorno_corrente = oggi
@@ -601,21 +645,35 @@ def _loop_principale(mode, callbacks, param_iniziali):
                 stato_motore = "CHIUSURA_FORZATA"
                 continue
 
+            # 🛑 EQUITY KILL SWITCH (floating losses included, from today's equity high)
+            if equity_tracker.intraday_drawdown_breached():
+                stato_equity = equity_tracker.snapshot()
+                msg = f"🛑 INTRADAY EQUITY DRAWDOWN {stato_equity['intraday_drawdown']:.2%} (limit -{equity_tracker.max_intraday_drawdown_pct:.2f}%). Closing speculations, securing long-term positions."
+                custom_log(msg)
+                invia_telegram(tg_chat, msg)
+                stato_motore = "CHIUSURA_FORZATA"
+                continue
+
             for ticker in tickers_da_scansionare:
-                time.sleep(0.01)
+                orologio.sleep(0.01)
                 mt5.symbol_select(ticker, True)
                 
                 if ticker not in memoria_asset:
                     memoria_asset[ticker] = {"high": 0, "low": 0, "picco_trade": 0, "impegnato": 0.0, "quarantena": 0, "perdite": 0}
 
-                if time.time() < memoria_asset[ticker]["quarantena"]: continue 
-                if not is_mercato_aperto(ticker): continue
-                if not is_spread_accettabile(ticker): continue
+                if orologio.time() < memoria_asset[ticker]["quarantena"]: continue 
+                with profiler.stage("spread_filter"):
+                    filtro_ok = is_mercato_aperto(ticker) and is_spread_accettabile(ticker)
+                if not filtro_ok:
+                    recorder.record("filters", orologio.time(), ticker, "market_spread", "REJECT", "")
+                    continue
 
-                tick = mt5.symbol_info_tick(ticker)
+                with profiler.stage("tick_fetch"):
+                    tick = mt5.symbol_info_tick(ticker)
+                    posizioni = mt5.positions_get(symbol=ticker) if tick else None
                 if not tick: continue
+                recorder.record("ticks", orologio.time(), ticker, tick.bid, tick.ask, tick.last)
                 prezzo = tick.last if tick.last > 0 else tick.ask
-                posizioni = mt5.positions_get(symbol=ticker)
                 
                 if not posizioni: memoria_asset[ticker]["impegnato"] = 0.0
                 
@@ -647,8 +705,12 @@ def _loop_principale(mode, callbacks, param_iniziali):
                         
                         # 🛡️ ARCHITECTURAL FIX: LOCAL MATH FIRST, CLOUD API SECOND
                         # Evaluate RSI and Bollinger locally to save Groq API rate limits
-                        tech_momentum, val_rsi, val_bb = check_technical_momentum(ticker, orizzonte)
-                        trend_stato = get_trend_filter(ticker, orizzonte) 
+                        with profiler.stage("momentum"):
+                            tech_momentum, val_rsi, val_bb = check_technical_momentum(ticker, orizzonte)
+                        with profiler.stage("trend_filter"):
+                            trend_stato = get_trend_filter(ticker, orizzonte) 
+                        recorder.record("filters", orologio.time(), ticker, "momentum", tech_momentum, f"rsi={val_rsi:.1f}")
+                        recorder.record("filters", orologio.time(), ticker, "trend", trend_stato, "")
                         
                         # When market is inactive (NEUTRAL) and NOT in portfolio bootstrap phase, skip analysis
                         if tech_momentum == "NEUTRAL" and not trigger_massivo:
@@ -669,7 +731,9 @@ def _loop_principale(mode, callbacks, param_iniziali):
 
                         if budget_da_usare >= 1.0:
                             # 🧠 Now invoke AI analysis (only after technical confirmation filters)
-                            sentiment, ai_score, msg_ai = analizza_sentiment_ollama(ticker)
+                            with profiler.stage("ai_call"):
+                                sentiment, ai_score, msg_ai = analizza_sentiment_ollama(ticker)
+                            recorder.record("ai", orologio.time(), ticker, sentiment, ai_score, msg_ai)
                             
                             azione = None
                             min_threshold = 6 # Maintain strict score threshold (6+) for institutional-grade conviction
@@ -678,29 +742,36 @@ def _loop_principale(mode, callbacks, param_iniziali):
                             if sentiment == "POSITIVO" and ai_score >= min_threshold:
                                 if trend_stato == "BEARISH":
                                     custom_log(f"⚠️ TREND GUARD: Skipping BUY on {ticker} (Price below SMA200)")
-                                    memoria_asset[ticker]["quarantena"] = time.time() + 600
+                                    recorder.record("filters", orologio.time(), ticker, "trend_guard", "SKIP_BUY", trend_stato)
+                                    memoria_asset[ticker]["quarantena"] = orologio.time() + QUARANTINE_SKIP_SECONDS
                                 elif tech_momentum == "BEARISH":
                                     custom_log(f"⚠️ MOMENTUM GUARD: Skipping BUY on {ticker} (RSI is bearish)")
-                                    memoria_asset[ticker]["quarantena"] = time.time() + 600
+                                    recorder.record("filters", orologio.time(), ticker, "momentum_guard", "SKIP_BUY", tech_momentum)
+                                    memoria_asset[ticker]["quarantena"] = orologio.time() + QUARANTINE_SKIP_SECONDS
                                 else:
                                     azione = "BUY"  
                                     
                             elif sentiment == "NEGATIVO" and ai_score <= -min_threshold:
                                 if trend_stato == "BULLISH":
                                     custom_log(f"⚠️ TREND GUARD: Skipping SELL on {ticker} (Price above SMA200)")
-                                    memoria_asset[ticker]["quarantena"] = time.time() + 600
+                                    recorder.record("filters", orologio.time(), ticker, "trend_guard", "SKIP_SELL", trend_stato)
+                                    memoria_asset[ticker]["quarantena"] = orologio.time() + QUARANTINE_SKIP_SECONDS
                                 elif tech_momentum == "BULLISH":
                                     custom_log(f"⚠️ MOMENTUM GUARD: Skipping SELL on {ticker} (RSI is bullish)")
-                                    memoria_asset[ticker]["quarantena"] = time.time() + 600
+                                    recorder.record("filters", orologio.time(), ticker, "momentum_guard", "SKIP_SELL", tech_momentum)
+                                    memoria_asset[ticker]["quarantena"] = orologio.time() + QUARANTINE_SKIP_SECONDS
                                 else:
                                     azione = "SELL" 
                             else:
                                 if trigger_massivo:
                                     custom_log(f"🧠 AI Scan | {ticker}: Score {ai_score}/10. Too weak (needs {min_threshold}), skipped.")
-                                memoria_asset[ticker]["quarantena"] = time.time() + 600
+                                memoria_asset[ticker]["quarantena"] = orologio.time() + QUARANTINE_SKIP_SECONDS
                             
                             if azione:
-                                success, lotti, p_eseguito = esegui_trade_silenzioso(azione, ticker, budget_da_usare, orizzonte, commento_ai=msg_ai)
+                                with profiler.stage("order_send"):
+                                    success, lotti, p_eseguito = esegui_trade_silenzioso(azione, ticker, budget_da_usare, orizzonte, commento_ai=msg_ai)
+                                recorder.record("orders", orologio.time(), ticker, azione, lotti, p_eseguito, mt5.TRADE_RETCODE_DONE if success else -1,
+                                                MAGIC_LONG_TERM if orizzonte == "LONG_TERM" else MAGIC_SHORT_TERM, "ENTRY")
                                 if success:
                                     radar_ticks = 0 
                                     icona = "🛡️" if orizzonte == "LONG_TERM" else "⚡"
@@ -708,11 +779,11 @@ def _loop_principale(mode, callbacks, param_iniziali):
                                     invia_telegram(tg_chat, f"{'🟢' if azione=='BUY' else '🔴'} NEW {azione} {icona}: {ticker}\nPrice: {p_eseguito}\nRSI: {val_rsi:.0f}\nAI Score: {ai_score}/10\nDetails: {msg_ai}")
                                     memoria_asset[ticker]["impegnato"] = budget_da_usare
                                     memoria_asset[ticker]["picco_trade"] = p_eseguito
-                                    time.sleep(1.0) 
+                                    orologio.sleep(1.0) 
 
                             # Groq API rate-limit protection during Phase 1 massive scan
                             if trigger_massivo:
-                                time.sleep(3.0)
+                                orologio.sleep(3.0)
 
                         memoria_asset[ticker]["high"] = prezzo
                         memoria_asset[ticker]["low"] = prezzo
@@ -737,18 +808,18 @@ def _loop_principale(mode, callbacks, param_iniziali):
                         perdita_perc = ((prezzo - prezzo_medio) / prezzo_medio) * 100 
                     
                     chiudi_ora, motivo_chiusura = False, ""
-                    limite_base = budget_totale_max * 0.03
+                    limite_base = budget_totale_max * RISK_UNIT_PCT
                     
                     if is_immune:
-                        hard_stop_loss = -max(limite_base * 4.0, costo_commissioni * 5.0) 
+                        hard_stop_loss = -max(limite_base * LONG_SL_RISK_MULT, costo_commissioni * LONG_SL_COMM_MULT)
                         
                         if profitto_netto <= hard_stop_loss:
                             chiudi_ora, motivo_chiusura = True, f"Structural Collapse Stop ({hard_stop_loss:.1f}$)"
-                        elif profitto_netto > (costo_commissioni * 3) and diff_dal_picco <= -3.0: 
+                        elif profitto_netto > (costo_commissioni * LONG_TRAIL_COMM_MULT) and diff_dal_picco <= -LONG_TRAIL_PCT:
                             chiudi_ora, motivo_chiusura = True, "Long-Term Trailing Profit"
                     else:
-                        hard_take_profit = max(limite_base * 1.5, costo_commissioni * 3.0) 
-                        hard_stop_loss = -max(limite_base, costo_commissioni * 1.5)
+                        hard_take_profit = max(limite_base * SHORT_TP_RISK_MULT, costo_commissioni * SHORT_TP_COMM_MULT)
+                        hard_stop_loss = -max(limite_base * SHORT_SL_RISK_MULT, costo_commissioni * SHORT_SL_COMM_MULT)
 
                         if profitto_netto >= hard_take_profit: 
                             chiudi_ora, motivo_chiusura = True, f"Target Reached (+{hard_take_profit:.1f}$)"
@@ -756,13 +827,15 @@ def _loop_principale(mode, callbacks, param_iniziali):
                             chiudi_ora, motivo_chiusura = True, f"Leverage Stop Loss ({hard_stop_loss:.1f}$)"
                         elif venerdi_sera:
                             chiudi_ora, motivo_chiusura = True, "Friday Weekend Shield"
-                        elif profitto_netto > (costo_commissioni * 1.5) and diff_dal_picco <= -0.15: 
+                        elif profitto_netto > (costo_commissioni * SHORT_TRAIL_COMM_MULT) and diff_dal_picco <= -SHORT_TRAIL_PCT:
                             chiudi_ora, motivo_chiusura = True, "Trailing Profit Forex"
 
                     if chiudi_ora:
-                        for pos in posizioni:
-                            tipo_ch = mt5.ORDER_TYPE_SELL if pos.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY
-                            mt5.order_send({"action": mt5.TRADE_ACTION_DEAL, "symbol": ticker, "volume": pos.volume, "type": tipo_ch, "position": pos.ticket, "price": prezzo, "deviation": 20, "magic": pos.magic, "type_filling": mt5.ORDER_FILLING_IOC})
+                        with profiler.stage("order_send"):
+                            for pos in posizioni:
+                                tipo_ch = mt5.ORDER_TYPE_SELL if pos.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY
+                                res = mt5.order_send({"action": mt5.TRADE_ACTION_DEAL, "symbol": ticker, "volume": pos.volume, "type": tipo_ch, "position": pos.ticket, "price": prezzo, "deviation": 20, "magic": pos.magic, "type_filling": mt5.ORDER_FILLING_IOC})
+                                recorder.record("orders", orologio.time(), ticker, "CLOSE", pos.volume, prezzo, res.retcode if res else -1, pos.magic, motivo_chiusura)
                             
                         profitto_giornaliero += profitto_netto
                         tipo_str = "LONG" if is_long else "SHORT"
@@ -771,7 +844,8 @@ def _loop_principale(mode, callbacks, param_iniziali):
                         radar_ticks = 0 
                         custom_log(f"💰 CHIUSO {ticker} ({tipo_str}) | {motivo_chiusura} | P/L Netto: {profitto_netto:.2f}$")
                         invia_telegram(tg_chat, f"💰 CHIUSO {tipo_str}: {ticker}\nMotivo: {motivo_chiusura}\nProfitto: {profitto_netto:.2f}$")
-                        scrivi_registro_csv(ticker, sum(p.volume for p in posizioni), prezzo_medio, prezzo, profitto_netto, tipo_str, etichetta)
+                        with profiler.stage("csv_write"):
+                            scrivi_registro_csv(ticker, sum(p.volume for p in posizioni), prezzo_medio, prezzo, profitto_netto, tipo_str, etichetta)
                         
                         memoria_asset[ticker]["impegnato"] = 0.0 
                         memoria_asset[ticker]["high"] = prezzo
@@ -781,14 +855,14 @@ def _loop_principale(mode, callbacks, param_iniziali):
                         if profitto_netto < 0 and not is_immune:
                             memoria_asset[ticker]["perdite"] += 1
                             if memoria_asset[ticker]["perdite"] >= 2:
-                                memoria_asset[ticker]["quarantena"] = time.time() + 3600 # 1 hour for too many stops
+                                memoria_asset[ticker]["quarantena"] = orologio.time() + QUARANTINE_LOSS_SECONDS # 1 hour for too many stops
                                 memoria_asset[ticker]["perdite"] = 0
                         elif profitto_netto > 0:
                             memoria_asset[ticker]["perdite"] = 0
                             
                             # 🏆 VICTORY QUARANTINE: Anti-ping-pong cooldown enforcement
-                            ore_pausa = 2 # Pause for 2 hours before re-evaluating this asset
-                            memoria_asset[ticker]["quarantena"] = time.time() + (3600 * ore_pausa)
+                            ore_pausa = QUARANTINE_WIN_SECONDS // 3600 # Pause before re-evaluating this asset
+                            memoria_asset[ticker]["quarantena"] = orologio.time() + QUARANTINE_WIN_SECONDS
                             custom_log(f"⏳ COOL-DOWN | {ticker} paused for {ore_pausa}h after Take Profit.")
                         else: 
                             memoria_asset[ticker]["perdite"] = 0
@@ -798,11 +872,11 @@ def _loop_principale(mode, callbacks, param_iniziali):
                 primo_giro_completato = True
                 custom_log("✅ PHASE 1 Complete. Portfolio Built. Moving to standard Radar.")
 
-            if time.time() - ultimo_heartbeat > 30:
+            if orologio.time() - ultimo_heartbeat > 30:
                 budget_attivo = sum(d["impegnato"] for d in memoria_asset.values())
                 
                 # 🌍 Determine active session
-                ora_utc_radar = datetime.datetime.utcnow().hour
+                ora_utc_radar = orologio.utcnow().hour
                 if 14 <= ora_utc_radar < 21: sessione_ui = "🇺🇸 US"
                 elif 8 <= ora_utc_radar < 14: sessione_ui = "🇪🇺 EU"
                 else: sessione_ui = "🌏 ASIA"
@@ -816,9 +890,11 @@ def _loop_principale(mode, callbacks, param_iniziali):
                     ultimo_stato_radar = stato_attuale
 
                 tutte_le_posizioni = mt5.positions_get()
-                if tutte_le_posizioni: aggiorna_csv_portafoglio_aperto(tutte_le_posizioni)
+                if tutte_le_posizioni:
+                    with profiler.stage("csv_write"):
+                        aggiorna_csv_portafoglio_aperto(tutte_le_posizioni)
                 
-                ultimo_heartbeat = time.time()
+                ultimo_heartbeat = orologio.time()
 
         elif stato_motore == "CHIUSURA_FORZATA":
             if ultimo_stato_ui != False: imposta_ui(False); ultimo_stato_ui = False
@@ -827,17 +903,23 @@ def _loop_principale(mode, callbacks, param_iniziali):
             if tutte_le_posizioni:
                 for pos in tutte_le_posizioni:
                     if pos.magic == MAGIC_SHORT_TERM:
-                        mt5.order_send({"action": mt5.TRADE_ACTION_DEAL, "symbol": pos.symbol, "volume": pos.volume, "type": mt5.ORDER_TYPE_SELL if pos.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY, "position": pos.ticket, "price": mt5.symbol_info_tick(pos.symbol).bid, "deviation": 20, "magic": pos.magic, "type_filling": mt5.ORDER_FILLING_IOC})
+                        res = mt5.order_send({"action": mt5.TRADE_ACTION_DEAL, "symbol": pos.symbol, "volume": pos.volume, "type": mt5.ORDER_TYPE_SELL if pos.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY, "position": pos.ticket, "price": mt5.symbol_info_tick(pos.symbol).bid, "deviation": 20, "magic": pos.magic, "type_filling": mt5.ORDER_FILLING_IOC})
+                        recorder.record("orders", orologio.time(), pos.symbol, "CLOSE", pos.volume, res.price if res else 0.0, res.retcode if res else -1, pos.magic, "Forced Closure")
             
             stato_motore = "MONITORAGGIO"
             
             session_start_time = None
+            recorder.close()  # Flush the session's segments to disk
             
         else:
             if ultimo_stato_ui != False: imposta_ui(False); ultimo_stato_ui = False
 
-        time.sleep(1.0)
+        profiler.end_cycle()
+        if fine_ciclo: fine_ciclo(stato_motore)
+        orologio.sleep(1.0)
+    health_checker.stop()  # Waits for in-flight probes before the terminal connection closes
     mt5.shutdown()
+    recorder.close()
 
 def cerca_simboli_broker(query):
     if not mt5.initialize(): return ["ERRORE_MT5"]
@@ -0,0 +1,261 @@
+"""
+Opt-in per-stage profiler for the live radar hot path.
+
+Wraps each stage of a radar cycle (tick fetch, spread filter, momentum,
+trend filter, AI call, order send, CSV write) in lightweight timers and
+periodically dumps a per-stage latency breakdown. An optional stack sampler
+captures the engine thread at a fixed interval and writes collapsed-stack
+files ("frame;frame;frame count") ready for flame graph tooling.
+
+Overhead Strategy:
+- Disabled (default): every stage() call returns a shared no-op context
+- Enabled: only a random fraction of cycles (PROFILE_SAMPLE_RATE) is timed
+- Stack sampling runs in its own daemon thread, never inside the hot path
+
+Configuration (.env or environment):
+- PROFILE_STAGES=1             Enable stage timers
+- PROFILE_SAMPLE_RATE=0.1      Fraction of radar cycles to time (0-1)
+- PROFILE_DUMP_SECONDS=300     Interval between breakdown dumps
+- PROFILE_STACKS=1             Enable the sampled stack profile
+- PROFILE_STACK_INTERVAL_MS=20 Stack sampling period
+"""
+
+import collections
+import datetime
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class _NullStage:
+    """No-op context manager returned when the current cycle is not sampled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Timer context manager that reports its elapsed time to the profiler."""
+
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler._registra(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class StageProfiler:
+    """
+    Sampling stage timer with periodic breakdown and collapsed-stack dumps.
+
+    Usage in the radar loop:
+        profiler.begin_cycle()
+        with profiler.stage("tick_fetch"):
+            tick = mt5.symbol_info_tick(ticker)
+        profiler.end_cycle()
+
+    Args:
+        enabled (bool): Master switch. When False all hooks are no-ops.
+        sample_rate (float): Fraction of cycles to time (0.0-1.0).
+        dump_interval (float): Seconds between breakdown dumps.
+        stack_sampling (bool): Start the background stack sampler on first cycle.
+        stack_interval (float): Seconds between stack samples.
+        output_dir (str): Directory for breakdown and .folded files.
+    """
+
+    def __init__(self, enabled=False, sample_rate=0.1, dump_interval=300.0,
+                 stack_sampling=False, stack_interval=0.02, output_dir="logs"):
+        self.enabled = enabled
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.dump_interval = dump_interval
+        self.stack_sampling = stack_sampling
+        self.stack_interval = stack_interval
+        self.output_dir = output_dir
+
+        self._attivo = False
+        self._inizio_ciclo = 0.0
+        self._ultimo_dump = time.time()
+        self._lock = threading.Lock()
+        # name -> [count, total_seconds, max_seconds]
+        self._statistiche = collections.defaultdict(lambda: [0, 0.0, 0.0])
+        self._cicli_totali = 0
+        self._cicli_campionati = 0
+
+        self._stack = collections.Counter()
+        self._thread_target = None
+        self._sampler = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a profiler from PROFILE_* environment variables."""
+        return cls(
+            enabled=os.getenv("PROFILE_STAGES", "0") == "1",
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0.1")),
+            dump_interval=float(os.getenv("PROFILE_DUMP_SECONDS", "300")),
+            stack_sampling=os.getenv("PROFILE_STACKS", "0") == "1",
+            stack_interval=float(os.getenv("PROFILE_STACK_INTERVAL_MS", "20")) / 1000.0,
+        )
+
+    # ------------------------------------------------------------------
+    # Hot path hooks
+    # ------------------------------------------------------------------
+    def begin_cycle(self):
+        """Mark the start of a radar cycle and decide whether to time it."""
+        if not self.enabled:
+            return
+        if self.stack_sampling and self._sampler is None:
+            self._avvia_campionatore(threading.get_ident())
+        self._cicli_totali += 1
+        self._attivo = random.random() < self.sample_rate
+        if self._attivo:
+            self._cicli_campionati += 1
+            self._inizio_ciclo = time.perf_counter()
+
+    def stage(self, name):
+        """
+        Return a context manager timing one stage of the current cycle.
+
+        Args:
+            name (str): Stage label (e.g. "tick_fetch", "ai_call").
+
+        Returns:
+            Context manager: A timer when the cycle is sampled, a shared no-op otherwise.
+        """
+        if not self._attivo:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def end_cycle(self):
+        """Close the current cycle and dump the breakdown when the interval elapses."""
+        if not self.enabled:
+            return
+        if self._attivo:
+            self._registra("cycle_total", time.perf_counter() - self._inizio_ciclo)
+            self._attivo = False
+        if time.time() - self._ultimo_dump >= self.dump_interval:
+            self.dump()
+
+    def _registra(self, name, elapsed):
+        with self._lock:
+            voce = self._statistiche[name]
+            voce[0] += 1
+            voce[1] += elapsed
+            if elapsed > voce[2]:
+                voce[2] = elapsed
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def snapshot(self):
+        """
+        Return the current per-stage breakdown without resetting it.
+
+        Returns:
+            dict: stage -> {"count", "total_ms", "mean_ms", "max_ms"}
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": count,
+                    "total_ms": total * 1000.0,
+                    "mean_ms": (total / count) * 1000.0 if count else 0.0,
+                    "max_ms": peak * 1000.0,
+                }
+                for name, (count, total, peak) in self._statistiche.items()
+            }
+
+    def dump(self):
+        """
+        Write the breakdown (and collapsed stacks, if enabled) and reset the window.
+
+        Returns:
+            dict: Paths of the generated files ("stages", optionally "stacks").
+        """
+        breakdown = self.snapshot()
+        with self._lock:
+            self._statistiche.clear()
+            stacks = self._stack
+            self._stack = collections.Counter()
+        cicli, campionati = self._cicli_totali, self._cicli_campionati
+        self._cicli_totali = self._cicli_campionati = 0
+        self._ultimo_dump = time.time()
+
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        paths = {}
+
+        righe = [f"# {timestamp} | cycles: {cicli} | sampled: {campionati}",
+                 f"{'stage':<18}{'count':>8}{'mean ms':>12}{'max ms':>12}{'total ms':>12}"]
+        for name, s in sorted(breakdown.items(), key=lambda kv: kv[1]["total_ms"], reverse=True):
+            righe.append(f"{name:<18}{s['count']:>8}{s['mean_ms']:>12.2f}{s['max_ms']:>12.2f}{s['total_ms']:>12.1f}")
+        stages_path = Path(self.output_dir) / "profile_stages.txt"
+        with stages_path.open("a", encoding="utf-8") as handle:
+            handle.write("\n".join(righe) + "\n\n")
+        paths["stages"] = str(stages_path)
+        logger.info("Radar profile (%d/%d cycles sampled):\n%s", campionati, cicli, "\n".join(righe[1:]))
+
+        if stacks:
+            stacks_path = Path(self.output_dir) / f"profile_stacks_{timestamp}.folded"
+            stacks_path.write_text(
+                "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n",
+                encoding="utf-8",
+            )
+            paths["stacks"] = str(stacks_path)
+
+        return paths
+
+    # ------------------------------------------------------------------
+    # Sampled stack profile
+    # ------------------------------------------------------------------
+    def _avvia_campionatore(self, thread_id):
+        self._thread_target = thread_id
+        self._sampler = threading.Thread(target=self._campiona_stack, name="radar-stack-sampler", daemon=True)
+        self._sampler.start()
+
+    def _campiona_stack(self):
+        """Sample the engine thread's stack at a fixed interval (collapsed format)."""
+        while self.enabled:
+            time.sleep(self.stack_interval)
+            frame = sys._current_frames().get(self._thread_target)
+            if frame is None:
+                # Engine thread exited: stop sampling until the next session
+                self._sampler = None
+                return
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            with self._lock:
+                self._stack[";".join(reversed(stack))] += 1
+
+
+# Shared instance used by the engine and the AI brain
+profiler = StageProfiler.from_env()
@@ -0,0 +1,299 @@
+"""
+Append-only session recorder for ticks, filter outcomes, AI scores and orders.
+
+Every event the radar observes is enqueued from the hot path and written by a
+background thread to compressed columnar segments (Arrow IPC stream format,
+zstd), rotated hourly:
+
+    recordings/<stream>/<YYYYMMDD_HH>_<session>.arrows
+
+<session> is new every time the writer thread starts (one per START/STOP
+session) and existing segments are never reopened for writing.
+
+The stream format is append-friendly and crash tolerant: a segment cut short
+by a crash is readable up to its last complete batch. Segments can be loaded
+back with load_recording() for offline replay and profiling.
+
+Configuration (.env or environment):
+- RECORDER_ENABLED=1        Enable recording (off by default)
+- RECORDER_DIR=recordings   Root directory for segments
+"""
+
+import datetime
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from app.clock import to_timestamp
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Stream schemas: ordered (column, arrow type) pairs. record() takes values in this order.
+SCHEMAS = {
+    "ticks": [("ts", "float64"), ("symbol", "string"), ("bid", "float64"), ("ask", "float64"), ("last", "float64")],
+    "filters": [("ts", "float64"), ("symbol", "string"), ("stage", "string"), ("outcome", "string"), ("detail", "string")],
+    "ai": [("ts", "float64"), ("symbol", "string"), ("sentiment", "string"), ("score", "int32"), ("message", "string")],
+    "orders": [("ts", "float64"), ("symbol", "string"), ("action", "string"), ("volume", "float64"),
+               ("price", "float64"), ("retcode", "int32"), ("magic", "int32"), ("reason", "string")],
+}
+
+
+class SessionRecorder:
+    """
+    Queue-backed recorder: record() only enqueues, a daemon thread writes segments.
+
+    Args:
+        enabled (bool): Master switch. When False record() returns immediately.
+        root_dir (str): Root directory for the per-stream segment folders.
+        batch_size (int): Rows buffered per stream before a batch is written.
+        flush_interval (float): Max seconds a row waits in memory before being written.
+        max_queue (int): Queue bound; events beyond it are dropped and counted.
+
+    Attributes:
+        dropped (int): Events lost: queue full, malformed rows or failed segment writes.
+    """
+
+    def __init__(self, enabled=False, root_dir="recordings", batch_size=2000,
+                 flush_interval=5.0, max_queue=200_000):
+        self.enabled = enabled
+        self.root_dir = root_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        self._coda = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._avvio_lock = threading.Lock()
+        self._contatore = itertools.count(1)
+        self._sessione = None  # Segment id, assigned each time the writer starts
+
+    @classmethod
+    def from_env(cls):
+        """Build a recorder from RECORDER_* environment variables."""
+        return cls(
+            enabled=os.getenv("RECORDER_ENABLED", "0") == "1",
+            root_dir=os.getenv("RECORDER_DIR", "recordings"),
+        )
+
+    def record(self, stream, *values):
+        """
+        Enqueue one event (hot path: never blocks, never touches disk).
+
+        Args:
+            stream (str): One of SCHEMAS ("ticks", "filters", "ai", "orders").
+            *values: Column values in schema order, starting with the timestamp.
+        """
+        if not self.enabled:
+            return
+        if self._thread is None:
+            self._avvia()
+        try:
+            self._coda.put_nowait((stream, values))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=10.0):
+        """Flush pending events, close open segments and stop the writer thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._coda.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Background writer
+    # ------------------------------------------------------------------
+    def _avvia(self):
+        with self._avvio_lock:
+            if self._thread is None:
+                # New id per writer: a STOP/START in the same hour must not overwrite the previous segments
+                self._sessione = f"{datetime.datetime.now():%H%M%S}-{os.getpid()}-{next(self._contatore)}"
+                self._thread = threading.Thread(target=self._scrittore, name="session-recorder", daemon=True)
+                self._thread.start()
+
+    def _scrittore(self):
+        import pyarrow as pa
+
+        schemi = {
+            stream: pa.schema([(nome, pa.type_for_alias(tipo)) for nome, tipo in campi])
+            for stream, campi in SCHEMAS.items()
+        }
+        opzioni = pa.ipc.IpcWriteOptions(compression="zstd")
+        buffer = {stream: [] for stream in SCHEMAS}
+        segmenti = {}  # stream -> (hour key, sink, writer)
+        ultimo_flush = time.monotonic()
+
+        def batch_di(stream, gruppo):
+            colonne = list(zip(*gruppo))
+            return pa.record_batch(
+                [pa.array(col, type=campo.type) for col, campo in zip(colonne, schemi[stream])],
+                schema=schemi[stream],
+            )
+
+        def segmento(stream, ora):
+            corrente = segmenti.get(stream)
+            if corrente is not None and corrente[0] == ora:
+                return corrente
+            if corrente is not None:
+                del segmenti[stream]
+                corrente[2].close()
+                corrente[1].close()
+            cartella = Path(self.root_dir) / stream
+            cartella.mkdir(parents=True, exist_ok=True)
+            sink = pa.OSFile(_nuovo_segmento(cartella, f"{ora}_{self._sessione}"), "wb")
+            segmenti[stream] = (ora, sink, pa.ipc.new_stream(sink, schemi[stream], options=opzioni))
+            return segmenti[stream]
+
+        def scrivi(stream):
+            # Take the rows out first: a failed write must not leave them to be retried forever
+            righe, buffer[stream] = buffer[stream], []
+            if not righe:
+                return
+            # Split by hour so every segment only holds its own hour
+            per_ora = {}
+            for riga in righe:
+                try:
+                    per_ora.setdefault(_chiave_ora(riga[0]), []).append(riga)
+                except (TypeError, ValueError, OverflowError, IndexError):
+                    self.dropped += 1
+            for ora, gruppo in sorted(per_ora.items()):
+                try:
+                    try:
+                        batch = batch_di(stream, gruppo)
+                    except (pa.ArrowException, TypeError, ValueError):
+                        # Keep the rows that convert on their own, drop only the bad ones
+                        validi = [riga for riga in gruppo if _converte(batch_di, stream, riga)]
+                        self.dropped += len(gruppo) - len(validi)
+                        logger.warning("Recorder: dropped %d malformed %s row(s)", len(gruppo) - len(validi), stream)
+                        if not validi:
+                            continue
+                        batch = batch_di(stream, validi)
+                    segmento(stream, ora)[2].write_batch(batch)
+                except Exception:
+                    self.dropped += len(gruppo)
+                    logger.exception("Recorder: failed to write %d %s row(s) for %s", len(gruppo), stream, ora)
+
+        while True:
+            try:
+                evento = self._coda.get(timeout=1.0)
+            except queue.Empty:
+                evento = False
+
+            if evento is None:
+                break
+            if evento:
+                stream, values = evento
+                if stream in buffer:
+                    buffer[stream].append(values)
+                    if len(buffer[stream]) >= self.batch_size:
+                        self._scrivi_sicuro(scrivi, stream)
+
+            if time.monotonic() - ultimo_flush >= self.flush_interval:
+                for stream in buffer:
+                    self._scrivi_sicuro(scrivi, stream)
+                ultimo_flush = time.monotonic()
+
+        for stream in buffer:
+            self._scrivi_sicuro(scrivi, stream)
+        for _, sink, writer in segmenti.values():
+            writer.close()
+            sink.close()
+
+    def _scrivi_sicuro(self, scrivi, stream):
+        """Write one stream's buffer; an unexpected error never kills the writer thread."""
+        try:
+            scrivi(stream)
+        except Exception:
+            logger.exception("Recorder: failed to write %s batch", stream)
+
+
+def _converte(batch_di, stream, riga):
+    """True if a single row converts to the stream schema."""
+    try:
+        batch_di(stream, [riga])
+        return True
+    except Exception:
+        return False
+
+
+def _nuovo_segmento(cartella, base):
+    """Reserve a segment path that does not exist yet (O_EXCL), so "wb" never truncates a written segment."""
+    for n in itertools.count():
+        percorso = cartella / (f"{base}.arrows" if n == 0 else f"{base}_{n}.arrows")
+        try:
+            os.close(os.open(percorso, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return str(percorso)
+        except FileExistsError:
+            continue
+
+
+def _chiave_ora(ts):
+    """Hourly segment key (UTC) for a UNIX timestamp."""
+    return datetime.datetime.utcfromtimestamp(ts).strftime("%Y%m%d_%H")
+
+
+def load_recording(stream, root_dir="recordings", start=None, end=None):
+    """
+    Load a recorded stream back into a DataFrame, ordered by timestamp.
+
+    Truncated segments (e.g. after a crash) are read up to their last complete batch.
+
+    Args:
+        stream (str): Stream name ("ticks", "filters", "ai", "orders").
+        root_dir (str): Recorder root directory.
+        start (datetime.datetime, optional): Inclusive lower bound (naive = UTC).
+        end (datetime.datetime, optional): Exclusive upper bound (naive = UTC).
+
+    Returns:
+        pd.DataFrame: Recorded rows with a "ts" (UNIX seconds) column.
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    cartella = Path(root_dir) / stream
+    start_ts = to_timestamp(start) if start is not None else None
+    end_ts = to_timestamp(end) if end is not None else None
+    prima = _chiave_ora(start_ts) if start_ts is not None else None
+    dopo = _chiave_ora(end_ts) if end_ts is not None else None
+
+    tabelle = []
+    for path in sorted(cartella.glob("*.arrows")):
+        ora = path.name[:11]
+        if (prima and ora < prima) or (dopo and ora > dopo):
+            continue
+        batches = []
+        try:
+            with pa.memory_map(str(path)) as source:
+                reader = pa.ipc.open_stream(source)
+                while True:
+                    try:
+                        batches.append(reader.read_next_batch())
+                    except StopIteration:
+                        break
+        except (pa.ArrowInvalid, OSError) as exc:
+            logger.warning("Recorder: segment %s truncated (%s)", path, exc)
+        if batches:
+            tabelle.append(pa.Table.from_batches(batches))
+
+    if not tabelle:
+        return pd.DataFrame(columns=[nome for nome, _ in SCHEMAS[stream]])
+
+    df = pa.concat_tables(tabelle).to_pandas()
+    if start_ts is not None:
+        df = df[df["ts"] >= start_ts]
+    if end_ts is not None:
+        df = df[df["ts"] < end_ts]
+    return df.sort_values("ts", kind="stable").reset_index(drop=True)
+
+
+# Shared instance used by the engine
+recorder = SessionRecorder.from_env()
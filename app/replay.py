@@ -0,0 +1,341 @@
+"""
+Accelerated event replay of the live MT5 strategy.
+
+Runs the real decision logic of app.mt5_engine._loop_principale (dual-horizon
+exits, quarantines, victory cooldowns, Friday shield, midnight reset and
+kill-switch) against recorded ticks or historical bars, far faster than real
+time:
+
+1. Prices come from FakeMetaTrader5 paths (recorder "ticks" stream or OHLCV frames)
+2. Time comes from a SimulatedClock: sleeps are free and idle gaps are skipped
+3. AI scores come from the recorder "ai" stream or a stub
+4. Closed trades, fills and the equity curve are collected in memory
+
+Usage:
+    python -m app.replay recording --start 2026-03-02 --end 2026-04-01
+    python -m app.replay history --tickers EURUSD BTC-USD --start 2025-01-01 --end 2025-06-30 --ai-score 7
+
+    result = replay_recording(start=datetime.datetime(2026, 3, 2), end=datetime.datetime(2026, 4, 1))
+    result = replay_history(["EURUSD", "BTC-USD"], start, end, ai_source=StubAI(score=7))
+"""
+
+import argparse
+import bisect
+import contextlib
+import datetime
+import sys
+import time
+
+import pandas as pd
+
+from app.clock import SimulatedClock, to_timestamp
+from app.equity import EquityTracker
+from app.fake_mt5 import FakeMetaTrader5, install
+from app.health import HealthChecker
+from app.profiling import StageProfiler
+from app.recorder import SessionRecorder
+
+
+class StubAI:
+    """
+    Constant or callable AI source.
+
+    Args:
+        score (int or callable): Fixed score, or f(ticker, timestamp) -> score.
+    """
+
+    def __init__(self, score=0):
+        self.score = score
+        self.clock = None
+
+    def __call__(self, ticker):
+        score = self.score(ticker, self.clock.time()) if callable(self.score) else self.score
+        sentiment = "POSITIVO" if score > 0 else "NEGATIVO" if score < 0 else "NEUTRO"
+        return sentiment, int(score), f"🤖 Score: {int(score)}/10 | replay stub"
+
+
+class RecordedAI:
+    """
+    AI source answering with the latest recorded score at or before the clock time.
+
+    Args:
+        frame (pd.DataFrame): Recorder "ai" stream (ts, symbol, sentiment, score, message).
+        default (tuple): Answer when no score was recorded yet for a symbol.
+    """
+
+    def __init__(self, frame, default=("NEUTRO", 0, "🤖 Score: 0/10 | no recorded score")):
+        self.default = default
+        self.clock = None
+        self._storico = {}
+        for symbol, gruppo in frame.sort_values("ts").groupby("symbol"):
+            self._storico[symbol] = (
+                gruppo["ts"].tolist(),
+                list(zip(gruppo["sentiment"], gruppo["score"].astype(int), gruppo["message"])),
+            )
+
+    def __call__(self, ticker):
+        storico = self._storico.get(ticker)
+        if storico is None:
+            return self.default
+        i = bisect.bisect_right(storico[0], self.clock.time()) - 1
+        return storico[1][i] if i >= 0 else self.default
+
+
+@contextlib.contextmanager
+def engine_offline(fake, clock, ai_source, registro_chiusure=None):
+    """
+    Point app.mt5_engine at a FakeMetaTrader5, a simulated clock and an AI source.
+
+    Health checks pass, CSV audit writes are captured in `registro_chiusure`
+    (or dropped), the equity tracker runs in memory and the session recorder
+    and profiler are disabled, so nothing touches the working tree. Everything is restored on exit.
+    """
+    precedente_mt5 = sys.modules.get("MetaTrader5")
+    install(fake)
+    from app import mt5_engine
+
+    def cattura_chiusura(ticker, lotti, prezzo_apertura, prezzo_chiusura, profitto_netto, tipo_trade, orizzonte):
+        if registro_chiusure is not None:
+            registro_chiusure.append({
+                "time": clock.now(), "ticker": ticker, "type": tipo_trade, "lots": lotti,
+                "entry_price": prezzo_apertura, "exit_price": prezzo_chiusura,
+                "net_pl": profitto_netto, "horizon": orizzonte,
+            })
+
+    patch = {
+        "mt5": fake,  # Direct reference: the engine's lazy MetaTrader5 proxy may have resolved the real module
+        "orologio": clock,
+        "analizza_sentiment_ollama": ai_source,
+        "esegui_health_check": lambda custom_log: True,
+        "health_checker": HealthChecker(interval=0),  # No probes, no background monitor
+        "scrivi_registro_csv": cattura_chiusura,
+        "aggiorna_csv_portafoglio_aperto": lambda posizioni: None,
+        "equity_tracker": EquityTracker(),  # In memory only: no live snapshot/history files
+        "recorder": SessionRecorder(enabled=False),  # Simulated events never reach recordings/
+        "profiler": StageProfiler(enabled=False),     # No breakdown/stack dumps into logs/
+    }
+    originali = {nome: getattr(mt5_engine, nome) for nome in patch}
+    for nome, valore in patch.items():
+        setattr(mt5_engine, nome, valore)
+    mt5_engine.cache_categorie_asset.clear()
+    try:
+        yield mt5_engine
+    finally:
+        mt5_engine.stato_motore = "SPENTO"
+        for nome, valore in originali.items():
+            setattr(mt5_engine, nome, valore)
+        mt5_engine.cache_categorie_asset.clear()
+        if precedente_mt5 is not None:
+            install(precedente_mt5)
+        else:
+            sys.modules.pop("MetaTrader5", None)
+
+
+def run_replay(fake, clock, params, end, ai_source=None, step=60.0, daily_restart=True, log=None):
+    """
+    Replay the live engine on a FakeMetaTrader5 until the clock reaches `end`.
+
+    Each radar cycle covers `step` seconds of market time; when no symbol has a
+    new quote within the next step, the clock jumps straight to the next quote.
+
+    Args:
+        fake (FakeMetaTrader5): Market built on the same clock.
+        clock (SimulatedClock): Virtual time source, positioned at the replay start.
+        params (dict): Engine parameters ("ticker", "budget", "loss"). AUTOPILOT
+            is ignored since it needs live web discovery.
+        end (datetime.datetime or float): Replay end (naive = UTC).
+        ai_source (callable, optional): ticker -> (sentiment, score, message). Defaults to a neutral stub.
+        step (float): Market seconds per radar cycle.
+        daily_restart (bool): Press START again on the next day after a kill-switch
+            or forced closure, like an operator would.
+        log (callable, optional): Receives engine log lines.
+
+    Returns:
+        dict: trades (DataFrame), deals (DataFrame), equity (Series), final_equity,
+              cycles, sim_seconds, wall_seconds, speedup
+    """
+    fine = to_timestamp(end) if isinstance(end, datetime.datetime) else float(end)
+    ai_source = ai_source or StubAI()
+    ai_source.clock = clock
+
+    tickers = [t.strip() for t in params.get("ticker", "").split(",") if t.strip() and t.strip() != "AUTOPILOT"]
+    params = dict(params, ticker=", ".join(tickers), tg_chat="")
+    prossimi = sorted(set().union(*(fake.paths[t].times.tolist() for t in tickers if t in fake.paths)))
+
+    chiusure, equity = [], []
+    inizio_sim, inizio_wall = clock.time(), time.perf_counter()
+    stato_giorno = {"stop": None}
+    cicli = [0]
+
+    with engine_offline(fake, clock, ai_source, registro_chiusure=chiusure) as motore:
+        def on_cycle(stato):
+            cicli[0] += 1
+            conto = fake.account_info()
+            if conto is not None:
+                equity.append((clock.now(), conto.equity))
+
+            adesso = clock.time()
+            # Skip idle periods: jump to the next quote if nothing trades within this step
+            i = bisect.bisect_right(prossimi, adesso + step)
+            obiettivo = adesso + step if i == 0 or prossimi[i - 1] > adesso else (prossimi[i] if i < len(prossimi) else fine)
+            clock.advance_to(obiettivo - 1.0)  # the engine sleeps 1s after this hook
+
+            if stato == "MONITORAGGIO" and daily_restart:
+                giorno = clock.now().date()
+                if stato_giorno["stop"] is None:
+                    stato_giorno["stop"] = giorno
+                elif giorno != stato_giorno["stop"]:
+                    stato_giorno["stop"] = None
+                    motore.aggiorna_parametri_e_avvia(params)
+            if clock.time() + 1.0 >= fine:
+                motore.spegni_tutto()
+
+        callbacks = {
+            "log": (lambda msg, replace_last=False: log(msg)) if log else (lambda msg, replace_last=False: None),
+            "running": lambda is_trading: None,
+            "cycle": on_cycle,
+        }
+        motore.stato_motore = "TRADING"
+        motore._loop_principale("REPLAY", callbacks, params)
+
+    wall = time.perf_counter() - inizio_wall
+    sim = clock.time() - inizio_sim
+    serie_equity = pd.Series([v for _, v in equity], index=pd.DatetimeIndex([t for t, _ in equity]), name="equity")
+    return {
+        "trades": pd.DataFrame(chiusure),
+        "deals": pd.DataFrame(fake.deals),
+        "equity": serie_equity,
+        "final_equity": float(serie_equity.iloc[-1]) if not serie_equity.empty else fake.balance,
+        "cycles": cicli[0],
+        "sim_seconds": sim,
+        "wall_seconds": wall,
+        "speedup": sim / wall if wall > 0 else float("inf"),
+    }
+
+
+def replay_recording(start, end, root_dir="recordings", params=None, history=None, ai_source=None, **kwargs):
+    """
+    Replay a recorded session (recorder "ticks" and, by default, "ai" streams).
+
+    Args:
+        start (datetime.datetime): Replay start (naive = UTC).
+        end (datetime.datetime): Replay end (naive = UTC).
+        root_dir (str): Recorder root directory.
+        params (dict, optional): Engine parameters; tickers default to every recorded symbol.
+        history (dict, optional): symbol -> OHLCV DataFrame prepended before the ticks,
+            so H4/D1 indicators have their warm-up bars.
+        ai_source (callable, optional): Defaults to RecordedAI over the "ai" stream.
+        **kwargs: Forwarded to run_replay and FakeMetaTrader5 (balance, leverage, step...).
+
+    Returns:
+        dict: See run_replay.
+    """
+    from app.recorder import load_recording
+
+    ticks = load_recording("ticks", root_dir, start=start, end=end)
+    if ticks.empty:
+        raise ValueError("No recorded ticks in the requested period")
+
+    frames = {}
+    for symbol, gruppo in ticks.groupby("symbol"):
+        frame = gruppo.set_index(pd.to_datetime(gruppo["ts"], unit="s"))[["bid", "ask"]]
+        if history and symbol in history:
+            frame = _prependi_storico(history[symbol], frame)
+        frames[symbol] = frame
+
+    if ai_source is None:
+        ai_source = RecordedAI(load_recording("ai", root_dir, end=end))
+    params = params or {"ticker": ", ".join(frames), "budget": "100", "loss": "30"}
+    return _avvia(frames, start, end, params, ai_source, quote_interval=0.0, **kwargs)
+
+
+def replay_history(tickers, start, end, params=None, ai_source=None, warmup_days=400, **kwargs):
+    """
+    Replay historical daily bars from the market data cache.
+
+    Each daily close is treated as a quote that stays live for one day, so
+    the engine sees one price update per day on a simulated clock.
+
+    Args:
+        tickers (list): Symbols, used both as cache keys and engine tickers.
+        start (datetime.datetime): Replay start.
+        end (datetime.datetime): Replay end.
+        params (dict, optional): Engine parameters; defaults to all tickers, $100 budget.
+        ai_source (callable, optional): Defaults to a neutral StubAI.
+        warmup_days (int): Calendar days of history loaded before start for indicators.
+        **kwargs: Forwarded to run_replay and FakeMetaTrader5.
+
+    Returns:
+        dict: See run_replay.
+    """
+    from app.market_data import get_price_history
+
+    frames = {}
+    for ticker in tickers:
+        data = get_price_history(ticker, start=(start - datetime.timedelta(days=warmup_days)).date(), end=end.date())
+        frames[ticker] = data
+
+    params = params or {"ticker": ", ".join(tickers), "budget": "100", "loss": "30"}
+    kwargs.setdefault("step", 3600.0)
+    return _avvia(frames, start, end, params, ai_source, quote_interval=86400.0, **kwargs)
+
+
+def _prependi_storico(storico, ticks):
+    """Prepend OHLCV closes older than the first tick as bid == ask quotes."""
+    primo = ticks.index[0]
+    close = storico["Close"] if "Close" in storico.columns else storico["close"]
+    indice = close.index.tz_localize(None) if close.index.tz is not None else close.index
+    vecchi = indice < primo
+    valori = close.to_numpy()[vecchi]
+    prima = pd.DataFrame({"bid": valori, "ask": valori}, index=indice[vecchi])
+    return pd.concat([prima, ticks])
+
+
+def _avvia(frames, start, end, params, ai_source, quote_interval, balance=10000.0, leverage=30, **kwargs):
+    clock = SimulatedClock(start)
+    fake = FakeMetaTrader5.from_frames(frames, clock=clock, quote_interval=quote_interval,
+                                       balance=balance, leverage=leverage)
+    return run_replay(fake, clock, params, end, ai_source=ai_source, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the live MT5 strategy on a simulated clock")
+    parser.add_argument("source", choices=["recording", "history"])
+    parser.add_argument("--start", required=True, type=datetime.datetime.fromisoformat)
+    parser.add_argument("--end", required=True, type=datetime.datetime.fromisoformat)
+    parser.add_argument("--tickers", nargs="+", default=None, help="Symbols (required for history)")
+    parser.add_argument("--root-dir", default="recordings")
+    parser.add_argument("--budget", default="100")
+    parser.add_argument("--loss", default="30")
+    parser.add_argument("--balance", type=float, default=10000.0)
+    parser.add_argument("--step", type=float, default=None, help="Market seconds per radar cycle")
+    parser.add_argument("--ai-score", type=int, default=None, help="Constant stubbed AI score")
+    args = parser.parse_args(argv)
+
+    ai_source = StubAI(args.ai_score) if args.ai_score is not None else None
+    kwargs = {"balance": args.balance}
+    if args.step is not None:
+        kwargs["step"] = args.step
+
+    if args.source == "history":
+        if not args.tickers:
+            parser.error("--tickers is required for history replays")
+        params = {"ticker": ", ".join(args.tickers), "budget": args.budget, "loss": args.loss}
+        result = replay_history(args.tickers, args.start, args.end, params=params, ai_source=ai_source, **kwargs)
+    else:
+        params = {"ticker": ", ".join(args.tickers), "budget": args.budget, "loss": args.loss} if args.tickers else None
+        result = replay_recording(args.start, args.end, root_dir=args.root_dir, params=params,
+                                  ai_source=ai_source, **kwargs)
+
+    trades = result["trades"]
+    print(f"Simulated {result['sim_seconds'] / 86400:.1f} days in {result['wall_seconds']:.1f}s "
+          f"({result['speedup']:,.0f}x real time, {result['cycles']} radar cycles)")
+    print(f"Closed trades: {len(trades)} | Net P&L: ${trades['net_pl'].sum() if not trades.empty else 0.0:.2f} "
+          f"| Final equity: ${result['final_equity']:.2f}")
+    if not trades.empty:
+        print(trades.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,10 +2,21 @@
 HTML report generation for backtest results and live trading performance.
 
 Produces institutional-grade PDF-ready HTML reports with embedded styling,
-suitable for fund presentations and regulatory documentation.
+suitable for fund presentations and regulatory documentation:
+- generate_html_report: one run
+- generate_comparison_report: many runs from the metrics store, with a
+  sortable table and inline SVG equity/drawdown charts
+
+Usage:
+    python -m app.report --last 500 --sort-by sharpe
+    python -m app.report --ticker SPY --strategy "SMA Cross" --output reports/spy_sma.html
 """
 
+import argparse
 import datetime
+import heapq
+import json
+from html import escape
 from pathlib import Path
 
 
@@ -116,3 +127,236 @@ def generate_html_report(details, benchmark_metrics, strategy_metrics=None, outp
 
     file_path.write_text(html, encoding="utf-8")
     return str(file_path)
+
+
+# ----------------------------------------------------------------------
+# Multi-run comparison report (streamed from the metrics store)
+# ----------------------------------------------------------------------
+COMPARISON_COLUMNS = [
+    ("total_return", "Return", _format_percent),
+    ("cagr", "CAGR", _format_percent),
+    ("max_drawdown", "Max DD", _format_percent),
+    ("sharpe", "Sharpe", _format_number),
+    ("win_rate", "Win Rate", _format_percent),
+    ("trades", "Trades", _format_number),
+]
+
+_COMPARISON_HEAD = """<!DOCTYPE html>
+<html lang="it">
+<head>
+  <meta charset="UTF-8" />
+  <title>Backtest Comparison</title>
+  <style>
+    body { font-family: Arial, sans-serif; background: #0b0f14; color: #e2e8f0; margin: 0; }
+    .wrap { max-width: 1200px; margin: 24px auto; padding: 24px; }
+    .card { background: #111827; border: 1px solid #1f2a3a; border-radius: 14px; padding: 18px 20px; margin-bottom: 14px; }
+    h1 { margin: 0 0 6px 0; font-size: 24px; }
+    h2 { margin: 0 0 8px 0; font-size: 16px; color: #9fb3c8; }
+    .charts { display: grid; grid-template-columns: repeat(auto-fill, minmax(360px, 1fr)); gap: 12px; }
+    .chart h3 { margin: 0 0 4px 0; font-size: 13px; color: #cbd5e1; font-weight: normal; }
+    svg { display: block; width: 100%; height: auto; background: #0b0f14; border-radius: 6px; }
+    table { width: 100%; border-collapse: collapse; font-size: 12px; }
+    th, td { padding: 5px 8px; border-bottom: 1px solid #1f2a3a; text-align: right; white-space: nowrap; }
+    th { cursor: pointer; color: #9fb3c8; position: sticky; top: 0; background: #111827; }
+    th:hover { color: #e2e8f0; }
+    td.t, th.t { text-align: left; }
+    .muted { color: #64748b; }
+  </style>
+</head>
+<body>
+  <div class="wrap">
+"""
+
+# Click a header to sort by its data-v values: numeric for data-type="num" columns, text otherwise;
+# empty values (missing metrics) always sort last
+_COMPARISON_TAIL = """  </div>
+<script>
+document.querySelectorAll("table.sortable th").forEach(function (th, col) {
+  th.addEventListener("click", function () {
+    var tbody = th.closest("table").tBodies[0];
+    var asc = th.dataset.dir !== "asc";
+    th.closest("tr").querySelectorAll("th").forEach(function (h) { delete h.dataset.dir; });
+    th.dataset.dir = asc ? "asc" : "desc";
+    var rows = Array.prototype.slice.call(tbody.rows);
+    var num = th.dataset.type === "num";
+    var chiave = function (row) {
+      var v = row.cells[col].dataset.v;
+      if (!num) { return v === "" ? null : v; }
+      var n = Number(v);
+      return (v === "" || !isFinite(n)) ? null : n;
+    };
+    rows.sort(function (a, b) {
+      var x = chiave(a), y = chiave(b);
+      if (x === null || y === null) { return (x === null) - (y === null); }
+      var r = num ? x - y : x.localeCompare(y);
+      return asc ? r : -r;
+    });
+    rows.forEach(function (r) { tbody.appendChild(r); });
+  });
+});
+</script>
+</body>
+</html>
+"""
+
+
+def _svg_curve(curve, colore, width=360, height=110, area=False):
+    """
+    Inline SVG polyline of a (downsampled) curve scaled to the box.
+
+    Args:
+        curve (pd.Series): Values indexed by date.
+        colore (str): Stroke colour.
+        area (bool): Fill between the curve and the top edge (drawdown style).
+
+    Returns:
+        str: <svg> element.
+    """
+    valori = curve.to_numpy(dtype=float)
+    if len(valori) < 2:
+        return f'<svg viewBox="0 0 {width} {height}"></svg>'
+    minimo, massimo = float(valori.min()), float(valori.max())
+    if area:
+        massimo = max(massimo, 0.0)
+    scala = (massimo - minimo) or 1.0
+    passo = (width - 2) / (len(valori) - 1)
+    punti = " ".join(f"{1 + i * passo:.1f},{1 + (massimo - v) / scala * (height - 2):.1f}" for i, v in enumerate(valori))
+    riempimento = ""
+    if area:
+        riempimento = f'<polygon points="1,1 {punti} {width - 1},1" fill="{colore}" fill-opacity="0.25" stroke="none"/>'
+    etichette = (f'<text x="4" y="11" font-size="9" fill="#64748b">{escape(_format_number(massimo))}</text>'
+                 f'<text x="4" y="{height - 3}" font-size="9" fill="#64748b">{escape(_format_number(minimo))}</text>')
+    return (f'<svg viewBox="0 0 {width} {height}" preserveAspectRatio="none">{riempimento}'
+            f'<polyline points="{punti}" fill="none" stroke="{colore}" stroke-width="1.2"/>{etichette}</svg>')
+
+
+def _etichetta_run(run):
+    parametri = json.loads(run.get("parameters") or "{}")
+    testo = f"#{run['id']} {run.get('ticker') or '-'} · {run.get('strategy') or '-'}"
+    if parametri:
+        testo += " · " + ", ".join(f"{k}={v}" for k, v in parametri.items())
+    return testo
+
+
+def generate_comparison_report(store=None, output_path=None, ticker=None, strategy=None, since=None, last=None,
+                               sort_by="sharpe", charts=12, points=200):
+    """
+    Write one HTML report comparing many stored runs.
+
+    The HTML is streamed to disk row by row from the metrics store, so memory
+    stays flat however many runs are listed. The charted runs (the best
+    `charts` by `sort_by`) get inline SVG equity and drawdown curves
+    LTTB-downsampled to `points` points, which bounds the chart section's
+    size and rendering time even for thousands of runs.
+
+    Args:
+        store (MetricsStore, optional): Source store (defaults to app.storage.metrics_store).
+        output_path (str, optional): Target file (defaults to reports/comparison_<timestamp>.html).
+        ticker (str, optional): Only this ticker.
+        strategy (str, optional): Only this strategy.
+        since (str, optional): ISO date/time lower bound on the run time.
+        last (int, optional): Only the most recent N runs.
+        sort_by (str): Strategy metric ranking the charted runs (higher is better).
+        charts (int): Number of runs with curves.
+        points (int): Points per chart.
+
+    Returns:
+        str: Path to the generated HTML file.
+    """
+    from app.analytics import downsample_curve
+    from app.storage import metrics_store
+
+    store = store or metrics_store
+    filtri = {"ticker": ticker, "strategy": strategy, "since": since, "limit": last}
+    if output_path is None:
+        Path("reports").mkdir(parents=True, exist_ok=True)
+        output_path = Path("reports") / f"comparison_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # First pass: bounded heap of the best runs with a curve
+    migliori, totale = [], 0
+    for run in store.iter_runs(**filtri):
+        totale += 1
+        valore = run["strategy_metrics"].get(sort_by)
+        if run["has_curve"] and isinstance(valore, (int, float)):
+            voce = (valore, run["id"], run)
+            if len(migliori) < charts:
+                heapq.heappush(migliori, voce)
+            elif voce[:2] > migliori[0][:2]:
+                heapq.heapreplace(migliori, voce)
+    migliori = [run for _, _, run in sorted(migliori, key=lambda v: v[:2], reverse=True)]
+    curve = store.curves([run["id"] for run in migliori])
+
+    with output_path.open("w", encoding="utf-8") as handle:
+        scrivi = handle.write
+        scrivi(_COMPARISON_HEAD)
+        selezione = ", ".join(f"{k}={v}" for k, v in filtri.items() if v is not None) or "all runs"
+        scrivi(f'    <div class="card"><h1>Backtest Comparison</h1>'
+               f'<h2>{totale} runs ({escape(selezione)}) · Generated {datetime.datetime.now():%Y-%m-%d %H:%M}</h2></div>\n')
+
+        if migliori:
+            scrivi(f'    <div class="card"><h2>Top {len(migliori)} by {escape(sort_by)}: equity and drawdown</h2>'
+                   f'<div class="charts">\n')
+            for run in migliori:
+                dati = curve.get(run["id"])
+                if dati is None:
+                    continue
+                valore = _format_number(run["strategy_metrics"].get(sort_by))
+                scrivi(f'      <div class="chart"><h3>{escape(_etichetta_run(run))} · {escape(sort_by)} {valore}</h3>'
+                       f'{_svg_curve(downsample_curve(dati["equity"], points), "#4ade80")}'
+                       f'{_svg_curve(downsample_curve(dati["drawdown"], points), "#f87171", height=60, area=True)}'
+                       f'</div>\n')
+            scrivi("    </div></div>\n")
+
+        scrivi('    <div class="card"><h2>All runs (click a column to sort)</h2><table class="sortable"><thead><tr>'
+               '<th class="t" data-type="num">Run</th><th class="t">Ticker</th><th class="t">Strategy</th><th class="t">Parameters</th>'
+               '<th class="t">Period</th><th data-type="num">Capital</th>'
+               + "".join(f'<th data-type="num">{titolo}</th>' for _, titolo, _ in COMPARISON_COLUMNS)
+               + '<th data-type="num">Bench Return</th><th class="t">Engine</th><th class="t">Date</th></tr></thead><tbody>\n')
+        # Second pass: one row per run, written as it is read
+        for run in store.iter_runs(**filtri):
+            metriche, benchmark = run["strategy_metrics"], run["benchmark_metrics"]
+            parametri = json.loads(run.get("parameters") or "{}")
+            celle = [
+                (run["id"], f"#{run['id']}", "t"),
+                (run.get("ticker") or "", run.get("ticker") or "-", "t"),
+                (run.get("strategy") or "", run.get("strategy") or "-", "t"),
+                (json.dumps(parametri, sort_keys=True), ", ".join(f"{k}={v}" for k, v in parametri.items()) or "-", "t"),
+                (run.get("start_date") or "", f"{run.get('start_date') or '-'} → {run.get('end_date') or '-'}", "t"),
+                (run.get("capital"), _format_number(run.get("capital")), ""),
+                *[(metriche.get(chiave), formato(metriche.get(chiave)), "") for chiave, _, formato in COMPARISON_COLUMNS],
+                (benchmark.get("total_return"), _format_percent(benchmark.get("total_return")), ""),
+                (run.get("engine") or "", run.get("engine") or "-", "t"),
+                (run.get("created_at") or "", (run.get("created_at") or "-").replace("T", " "), "t"),
+            ]
+            scrivi("<tr>" + "".join(
+                f'<td class="{classe}" data-v="{escape("" if v is None else str(v))}">{escape(str(testo))}</td>'
+                for v, testo, classe in celle
+            ) + "</tr>\n")
+        scrivi("    </tbody></table></div>\n")
+        scrivi(_COMPARISON_TAIL)
+    return str(output_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-run comparison report from the metrics store")
+    parser.add_argument("--ticker")
+    parser.add_argument("--strategy")
+    parser.add_argument("--since", help="ISO date: only runs recorded from this date")
+    parser.add_argument("--last", type=int, default=None, help="Only the most recent N runs")
+    parser.add_argument("--sort-by", default="sharpe")
+    parser.add_argument("--charts", type=int, default=12, help="Runs with equity/drawdown charts")
+    parser.add_argument("--points", type=int, default=200, help="Points per chart (LTTB)")
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    percorso = generate_comparison_report(output_path=args.output, ticker=args.ticker, strategy=args.strategy,
+                                          since=args.since, last=args.last, sort_by=args.sort_by,
+                                          charts=args.charts, points=args.points)
+    print(f"Saved: {percorso}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""
+Precomputed indicator columns for the Lumibot strategies (backtest fast path).
+
+In a backtest the whole price history is known up front, so the indicators
+each strategy recomputes every simulated day from get_historical_prices can be
+computed once, as full columns, and looked up by date in on_trading_iteration.
+
+Every column reproduces the live computation exactly: the value on date D uses
+the same closes (the bars up to and including D) averaged in the same order,
+and is NaN where the live path would not have enough bars yet.
+"""
+
+import bisect
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _media_mobile(valori, periodo):
+    """Trailing mean over `periodo` values (NaN before a full window), same summation as Series.tail().mean()."""
+    media = np.full(len(valori), np.nan)
+    if len(valori) >= periodo:
+        media[periodo - 1:] = sliding_window_view(valori, periodo).mean(axis=1)
+    return media
+
+
+def sma_cross_frame(close, fast_period, slow_period):
+    """
+    Fast and slow SMA columns for SMACrossStrategy.
+
+    Args:
+        close (pd.Series): Daily closes indexed by date.
+        fast_period (int): Fast SMA length.
+        slow_period (int): Slow SMA length.
+
+    Returns:
+        pd.DataFrame: sma_fast, sma_slow (NaN until slow_period bars are available).
+    """
+    valori = close.to_numpy(dtype=np.float64)
+    sma_fast = _media_mobile(valori, fast_period)
+    sma_slow = _media_mobile(valori, slow_period)
+    sma_fast[np.isnan(sma_slow)] = np.nan  # Live path waits for slow_period bars
+    return pd.DataFrame({"sma_fast": sma_fast, "sma_slow": sma_slow}, index=close.index)
+
+
+def rsi_frame(close, period):
+    """
+    Simple-average RSI column for RSIMeanReversion (same formula as _calculate_rsi).
+
+    Args:
+        close (pd.Series): Daily closes indexed by date.
+        period (int): RSI lookback.
+
+    Returns:
+        pd.DataFrame: rsi (NaN until period + 1 bars are available).
+    """
+    valori = close.to_numpy(dtype=np.float64)
+    delta = np.diff(valori, prepend=np.nan)
+    guadagni = np.where(delta > 0, delta, 0.0)
+    perdite = -np.where(delta < 0, delta, 0.0)
+    avg_gain = _media_mobile(guadagni, period)
+    avg_loss = _media_mobile(perdite, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+    rsi[:period] = np.nan  # Live path needs period + 1 bars (period deltas)
+    return pd.DataFrame({"rsi": rsi}, index=close.index)
+
+
+class PrecomputedSignals:
+    """
+    Date-keyed lookup over a precomputed indicator frame.
+
+    Passed to a strategy through its `signals` parameter; at(dt) returns the
+    row the live path would compute at that simulated time.
+
+    Args:
+        frame (pd.DataFrame): Indicator columns indexed by bar date.
+    """
+
+    def __init__(self, frame):
+        self.columns = list(frame.columns)
+        date = [ts.date() for ts in frame.index]
+        righe = [None if any(np.isnan(v) for v in riga) else riga
+                 for riga in frame.itertuples(index=False, name=None)]
+        self._per_data = dict(zip(date, righe))
+        self._date = date
+        self._righe = righe
+
+    def __len__(self):
+        return len(self._date)
+
+    def __repr__(self):
+        return f"PrecomputedSignals({self.columns}, {len(self)} bars)"
+
+    def at(self, momento):
+        """
+        Indicator values as of a simulated datetime.
+
+        Args:
+            momento (datetime.datetime): Strategy time (self.get_datetime()).
+
+        Returns:
+            tuple or None: Column values of the last bar on or before that date,
+                None while the indicators are still warming up.
+        """
+        giorno = momento.date()
+        riga = self._per_data.get(giorno, False)
+        if riga is not False:
+            return riga
+        # Non-trading day: the live path sees the previous bar
+        i = bisect.bisect_right(self._date, giorno) - 1
+        return self._righe[i] if i >= 0 else None
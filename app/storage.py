@@ -1,38 +1,360 @@
 """
 Metrics persistence layer for strategy backtests and live trading results.
 
-Exports performance data in multiple formats (JSON, CSV) for compatibility
-with external analytics platforms, risk management systems, and compliance audits.
+Every run is appended to one SQLite store (config.METRICS_STORE_PATH): a
+`runs` table with the run details (ticker, strategy, period, capital, engine,
+parameters, report path), a long-format `metrics` table with one row per
+benchmark/strategy metric and a `curves` table with the equity and drawdown
+curves LTTB-downsampled to config.METRICS_CURVE_POINTS. Runs are indexed on
+ticker, strategy and date, so comparing hundreds of runs is a single query
+instead of globbing files.
+
+The timestamped JSON/CSV exports for external analytics platforms, risk
+management systems and compliance audits are still available and can be
+switched off with config.METRICS_FILE_EXPORTS.
+
+Usage:
+    python -m app.storage --best sharpe --last 30
+    python -m app.storage --runs --ticker SPY --strategy "SMA Cross"
+    python -m app.storage --import-files reports
 """
 
+import argparse
 import csv
 import datetime
 import json
+import math
+import numbers
+import sqlite3
+from contextlib import closing
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+from app import config
+from app.analytics import downsample_curve
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    ticker TEXT,
+    strategy TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    capital REAL,
+    engine TEXT,
+    parameters TEXT,
+    details TEXT,
+    report TEXT,
+    source TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, category, name)
+);
+CREATE TABLE IF NOT EXISTS curves (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(id),
+    equity TEXT,
+    drawdown TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_ticker ON runs(ticker, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_strategy ON runs(strategy, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_metrics_name ON metrics(category, name, value);
+"""
+
+RUN_COLUMNS = ["id", "created_at", "ticker", "strategy", "start_date", "end_date", "capital", "engine", "parameters", "report"]
+
+
+def _curva_json(curva, punti):
+    """Downsampled curve as compact JSON: {"t": ["YYYY-MM-DD", ...], "v": [...]}."""
+    ridotta = downsample_curve(curva, punti)
+    return json.dumps({"t": ridotta.index.strftime("%Y-%m-%d").tolist(),
+                       "v": np.round(ridotta.to_numpy(dtype=np.float64), 6).tolist()})
+
+
+def _numero(valore):
+    """Metric value as a float for the store (None for non-numeric or NaN)."""
+    # numbers.Real also covers numpy scalars (np.int64 metrics from Lumibot stats)
+    if isinstance(valore, bool) or not isinstance(valore, numbers.Real):
+        return None
+    valore = float(valore)
+    return None if math.isnan(valore) else valore
+
+
+class MetricsStore:
+    """
+    Append-only SQLite store of backtest runs and their metrics.
+
+    Connections are opened per call, so one store can be shared by threads and
+    by the backtest worker processes (SQLite serializes the writers).
+
+    Args:
+        path (str): Database file (created with its schema on first use).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._pronto = False
+
+    def _connetti(self):
+        if not self._pronto:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL: durable at checkpoints, no fsync per appended run
+        if not self._pronto:
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers never block the writing workers
+            conn.executescript(_SCHEMA)
+            self._pronto = True
+        return conn
+
+    def record_run(self, details, benchmark_metrics, strategy_metrics, report_path=None, source=None, created_at=None,
+                   equity=None):
+        """
+        Append one run with its benchmark and strategy metrics.
+
+        Args:
+            details (dict): Run metadata (ticker, strategy, capital, start, end, engine, parameters).
+            benchmark_metrics (dict): Market benchmark metrics.
+            strategy_metrics (dict): Strategy performance metrics.
+            report_path (str, optional): HTML report of the run.
+            source (str, optional): Imported file name (a file is imported only once).
+            created_at (str, optional): ISO timestamp (defaults to now).
+            equity (pd.Series, optional): Portfolio value per bar; stored with its
+                drawdown curve, both LTTB-downsampled to METRICS_CURVE_POINTS.
+
+        Returns:
+            int or None: The new run id (None if `source` was already imported).
+        """
+        created_at = created_at or datetime.datetime.now().isoformat(timespec="seconds")
+        righe = [
+            (categoria, nome, _numero(valore))
+            for categoria, metriche in (("benchmark", benchmark_metrics), ("strategy", strategy_metrics))
+            for nome, valore in (metriche or {}).items()
+        ]
+        with closing(self._connetti()) as conn, conn:
+            cursore = conn.execute(
+                "INSERT OR IGNORE INTO runs (created_at, ticker, strategy, start_date, end_date, capital, engine, "
+                "parameters, details, report, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (created_at, details.get("ticker"), details.get("strategy"), details.get("start"), details.get("end"),
+                 _numero(details.get("capital")), details.get("engine"),
+                 json.dumps(details.get("parameters") or {}, sort_keys=True),
+                 json.dumps(details, default=str), report_path, source),
+            )
+            if not cursore.rowcount:
+                return None
+            run_id = cursore.lastrowid
+            conn.executemany("INSERT INTO metrics (run_id, category, name, value) VALUES (?, ?, ?, ?)",
+                             [(run_id, *riga) for riga in righe])
+            if equity is not None and len(equity):
+                drawdown = equity / equity.cummax() - 1.0
+                conn.execute("INSERT INTO curves (run_id, equity, drawdown) VALUES (?, ?, ?)",
+                             (run_id, _curva_json(equity, config.METRICS_CURVE_POINTS),
+                              _curva_json(drawdown, config.METRICS_CURVE_POINTS)))
+        return run_id
+
+    def _filtri(self, ticker=None, strategy=None, since=None, until=None):
+        condizioni, valori = [], []
+        for colonna, operatore, valore in (("ticker", "=", ticker), ("strategy", "=", strategy),
+                                           ("created_at", ">=", since), ("created_at", "<=", until)):
+            if valore is not None:
+                condizioni.append(f"r.{colonna} {operatore} ?")
+                valori.append(str(valore))
+        return (" WHERE " + " AND ".join(condizioni)) if condizioni else "", valori
+
+    def runs(self, ticker=None, strategy=None, since=None, until=None, limit=None):
+        """
+        Runs with their metrics as one wide row each, newest first.
+
+        Args:
+            ticker (str, optional): Only this ticker.
+            strategy (str, optional): Only this strategy.
+            since (str, optional): ISO date/time lower bound on the run time.
+            until (str, optional): ISO date/time upper bound on the run time.
+            limit (int, optional): Most recent N matching runs.
 
-def save_metrics(details, benchmark_metrics, strategy_metrics, output_dir="reports"):
+        Returns:
+            pd.DataFrame: RUN_COLUMNS, strategy metrics by name and benchmark
+                          metrics prefixed with "benchmark_".
+        """
+        where, valori = self._filtri(ticker, strategy, since, until)
+        query = f"SELECT {', '.join('r.' + c for c in RUN_COLUMNS)} FROM runs r{where} ORDER BY r.created_at DESC, r.id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            valori.append(int(limit))
+        with closing(self._connetti()) as conn:
+            runs = pd.read_sql_query(query, conn, params=valori)
+            if runs.empty:
+                return runs
+            metriche = pd.read_sql_query(
+                f"WITH scelti AS ({query}) SELECT m.run_id, m.category, m.name, m.value "
+                "FROM metrics m JOIN scelti ON m.run_id = scelti.id",
+                conn, params=valori,
+            )
+        if metriche.empty:
+            return runs
+        metriche["colonna"] = metriche["name"].where(metriche["category"] == "strategy", "benchmark_" + metriche["name"])
+        larghe = metriche.pivot(index="run_id", columns="colonna", values="value")
+        return runs.join(larghe, on="id")
+
+    def iter_runs(self, ticker=None, strategy=None, since=None, until=None, limit=None):
+        """
+        Stream runs with their metrics one at a time, newest first (bounded memory).
+
+        Args:
+            ticker, strategy, since, until, limit: As in runs().
+
+        Yields:
+            dict: RUN_COLUMNS, "strategy_metrics" and "benchmark_metrics" dicts, "has_curve".
+        """
+        where, valori = self._filtri(ticker, strategy, since, until)
+        limite = ""
+        if limit is not None:
+            limite = " LIMIT ?"
+            valori.append(int(limit))
+        query = f"""
+            WITH scelti AS (SELECT * FROM runs r{where} ORDER BY r.created_at DESC, r.id DESC{limite})
+            SELECT {', '.join('scelti.' + c for c in RUN_COLUMNS)},
+                   json_group_object(m.category || ':' || m.name, m.value) FILTER (WHERE m.name IS NOT NULL),
+                   c.run_id IS NOT NULL
+            FROM scelti
+            LEFT JOIN metrics m ON m.run_id = scelti.id
+            LEFT JOIN curves c ON c.run_id = scelti.id
+            GROUP BY scelti.id
+            ORDER BY scelti.created_at DESC, scelti.id DESC
+        """
+        with closing(self._connetti()) as conn:
+            for riga in conn.execute(query, valori):
+                run = dict(zip(RUN_COLUMNS, riga))
+                run["strategy_metrics"], run["benchmark_metrics"] = {}, {}
+                for chiave, valore in json.loads(riga[-2] or "{}").items():
+                    categoria, _, nome = chiave.partition(":")
+                    run[f"{categoria}_metrics"][nome] = valore
+                run["has_curve"] = bool(riga[-1])
+                yield run
+
+    def curves(self, run_ids):
+        """
+        Stored equity/drawdown curves.
+
+        Args:
+            run_ids (list): Run ids.
+
+        Returns:
+            dict: {run_id: {"equity": pd.Series, "drawdown": pd.Series}} for the runs that have curves.
+        """
+        curve = {}
+        with closing(self._connetti()) as conn:
+            for run_id in run_ids:
+                riga = conn.execute("SELECT equity, drawdown FROM curves WHERE run_id = ?", (int(run_id),)).fetchone()
+                if riga is None:
+                    continue
+                curve[run_id] = {
+                    nome: pd.Series(dati["v"], index=pd.DatetimeIndex(dati["t"]), dtype="float64")
+                    for nome, dati in zip(("equity", "drawdown"), map(json.loads, riga))
+                }
+        return curve
+
+    def best_per_ticker(self, metric="sharpe", last=None, strategy=None, category="strategy", lowest=False):
+        """
+        Best run per ticker by one metric, e.g. the best Sharpe per ticker over the last 30 runs.
+
+        Args:
+            metric (str): Metric name (e.g. sharpe, cagr, total_return, max_drawdown).
+            last (int, optional): Only consider the most recent N runs overall.
+            strategy (str, optional): Only this strategy.
+            category (str): "strategy" or "benchmark" metrics.
+            lowest (bool): Pick the lowest value instead of the highest.
+
+        Returns:
+            pd.DataFrame: One row per ticker: RUN_COLUMNS and the metric value, best first.
+        """
+        where, valori = self._filtri(strategy=strategy)
+        limite = ""
+        if last is not None:
+            limite = " LIMIT ?"
+            valori.append(int(last))
+        ordine = "ASC" if lowest else "DESC"
+        query = f"""
+            WITH recenti AS (
+                SELECT * FROM runs r{where} ORDER BY r.created_at DESC, r.id DESC{limite}
+            ),
+            classifica AS (
+                SELECT {', '.join('recenti.' + c for c in RUN_COLUMNS)}, m.value AS valore,
+                       ROW_NUMBER() OVER (PARTITION BY recenti.ticker ORDER BY m.value {ordine}, recenti.id DESC) AS posizione
+                FROM recenti JOIN metrics m ON m.run_id = recenti.id
+                WHERE m.category = ? AND m.name = ? AND m.value IS NOT NULL
+            )
+            SELECT {', '.join(RUN_COLUMNS)}, valore FROM classifica WHERE posizione = 1 ORDER BY valore {ordine}
+        """
+        with closing(self._connetti()) as conn:
+            migliori = pd.read_sql_query(query, conn, params=[*valori, category, metric])
+        return migliori.rename(columns={"valore": metric})
+
+    def import_metrics_files(self, directory="reports"):
+        """
+        Import legacy metrics_<timestamp>.json exports (each file only once).
+
+        Returns:
+            int: Number of runs imported.
+        """
+        importati = 0
+        for percorso in sorted(Path(directory).glob("metrics_*.json")):
+            try:
+                payload = json.loads(percorso.read_text(encoding="utf-8"))
+                creato = datetime.datetime.strptime(percorso.stem[len("metrics_"):], "%Y%m%d_%H%M%S")
+            except (OSError, ValueError):
+                continue
+            run_id = self.record_run(payload.get("details") or {}, payload.get("benchmark"), payload.get("strategy"),
+                                     source=percorso.name, created_at=creato.isoformat())
+            importati += run_id is not None
+        return importati
+
+
+# Shared store used by save_metrics
+metrics_store = MetricsStore(config.METRICS_STORE_PATH)
+
+
+def save_metrics(details, benchmark_metrics, strategy_metrics, output_dir="reports", report_path=None,
+                 export_files=None, store=None, equity=None):
     """
-    Persist trading metrics to both JSON (structured) and CSV (tabular) formats.
-    
-    Creates timestamped output files for easy historical comparison and archival.
-    Useful for regression testing strategies across market regimes.
-    
+    Persist trading metrics to the metrics store and, optionally, to JSON (structured) and CSV (tabular) files.
+
+    The store keeps every run queryable in one place; the timestamped files
+    remain available for external tools.
+
     Args:
         details (dict): Metadata about the backtest/trade session
-            (ticker, capital, start_date, end_date, etc.)
+            (ticker, strategy, capital, start, end, engine, parameters)
         benchmark_metrics (dict): Market benchmark metrics
             (total_return, CAGR, max_drawdown, volatility)
         strategy_metrics (dict): Trading strategy performance metrics
             (Sharpe ratio, win_rate, max_drawdown, etc.)
         output_dir (str): Directory for report output.
-    
+        report_path (str, optional): HTML report of the run, recorded in the store.
+        export_files (bool, optional): Also write the JSON/CSV pair
+            (defaults to config.METRICS_FILE_EXPORTS).
+        store (MetricsStore, optional): Target store (defaults to metrics_store).
+        equity (pd.Series, optional): Portfolio value per bar, stored downsampled with its drawdown.
+
     Returns:
         dict: Paths to generated files
-            - json (str): Path to JSON file
-            - csv (str): Path to CSV file
+            - store (str): Path to the metrics store
+            - json (str): Path to JSON file (file exports only)
+            - csv (str): Path to CSV file (file exports only)
     """
 
+    store = store or metrics_store
+    store.record_run(details, benchmark_metrics, strategy_metrics, report_path=report_path, equity=equity)
+    percorsi = {"store": str(store.path)}
+    if not (config.METRICS_FILE_EXPORTS if export_files is None else export_files):
+        return percorsi
+
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
@@ -56,4 +378,31 @@ def save_metrics(details, benchmark_metrics, strategy_metrics, output_dir="repor
             for name, value in metrics.items():
                 writer.writerow([category, name, value])
 
-    return {"json": str(json_path), "csv": str(csv_path)}
+    percorsi.update({"json": str(json_path), "csv": str(csv_path)})
+    return percorsi
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the backtest metrics store")
+    parser.add_argument("--db", default=config.METRICS_STORE_PATH)
+    parser.add_argument("--best", metavar="METRIC", help="Best run per ticker by this metric")
+    parser.add_argument("--lowest", action="store_true", help="With --best: lowest value wins")
+    parser.add_argument("--last", type=int, default=None, help="Only the most recent N runs")
+    parser.add_argument("--runs", action="store_true", help="List runs with their metrics")
+    parser.add_argument("--ticker")
+    parser.add_argument("--strategy")
+    parser.add_argument("--import-files", metavar="DIR", help="Import legacy metrics_*.json exports")
+    args = parser.parse_args(argv)
+
+    store = MetricsStore(args.db)
+    if args.import_files:
+        print(f"Imported runs: {store.import_metrics_files(args.import_files)}")
+    if args.best:
+        print(store.best_per_ticker(args.best, last=args.last, strategy=args.strategy, lowest=args.lowest).to_string(index=False))
+    if args.runs:
+        print(store.runs(ticker=args.ticker, strategy=args.strategy, limit=args.last).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,10 +7,18 @@ Contains three distinct algorithmic approaches:
 3. RSI Mean Reversion: Momentum oscillator (overbought/oversold levels)
 
 Each strategy is self-contained and can be selected independently for backtesting.
+
+Backtest fast path: SMA Cross and RSI Mean Reversion expose
+precompute_signals(), which computes their indicator columns once from the
+backtest's price history (app/signals.py). Passed back as the `signals`
+parameter, each iteration becomes a date lookup instead of a
+get_historical_prices call; without it (live trading) nothing changes.
 """
 
 from lumibot.strategies import Strategy
 
+from app.signals import PrecomputedSignals, rsi_frame, sma_cross_frame
+
 
 class ATHDipStrategy(Strategy):
     """
@@ -22,12 +30,20 @@ class ATHDipStrategy(Strategy):
     
     Rationale: Exploits panic selling and mean reversion after sharp drawdowns.
     Risk: Performs poorly in strong downtrends; works best in range-bound markets.
+
+    Parameters (overridable via `parameters`):
+        buy_drawdown: Entry distance below ATH (0.20 = -20%)
+        sell_drawdown: Exit distance below ATH (0.02 = -2%)
     """
+
+    parameters = {"buy_drawdown": 0.20, "sell_drawdown": 0.02}
     
     def initialize(self):
         """Strategy initialization: set update frequency and parameters."""
         self.sleeptime = "1D"  # Update once per day
         self.symbol = self.parameters.get("symbol", "SPY")
+        self.buy_level = 1.0 - self.parameters["buy_drawdown"]
+        self.sell_level = 1.0 - self.parameters["sell_drawdown"]
         self.ath = 0  # Track all-time high price
 
     def on_trading_iteration(self):
@@ -46,15 +62,15 @@ class ATHDipStrategy(Strategy):
 
         position = self.get_position(self.symbol)
         
-        # ENTRY SIGNAL: Buy at -20% dip from ATH
-        if position is None and price <= self.ath * 0.80:
+        # ENTRY SIGNAL: Buy at -20% dip from ATH (buy_drawdown)
+        if position is None and price <= self.ath * self.buy_level:
             qty = self.cash // price
             if qty > 0:
                 order = self.create_order(self.symbol, qty, "buy")
                 self.submit_order(order)
 
-        # EXIT SIGNAL: Sell at -2% (profit target hit)
-        elif position is not None and price >= self.ath * 0.98:
+        # EXIT SIGNAL: Sell at -2% (profit target hit, sell_drawdown)
+        elif position is not None and price >= self.ath * self.sell_level:
             self.sell_all()
 
 
@@ -68,36 +84,66 @@ class SMACrossStrategy(Strategy):
     
     Rationale: Simple Moving Averages are institutional-grade trend filters.
     Lag: Significant lag in fast-moving markets; best for daily/weekly timeframes.
+
+    Parameters (overridable via `parameters`):
+        fast_period: Fast SMA length (20)
+        slow_period: Slow SMA length (50)
     """
+
+    parameters = {"fast_period": 20, "slow_period": 50}
     
     def initialize(self):
         """Strategy initialization."""
         self.sleeptime = "1D"
         self.symbol = self.parameters.get("symbol", "SPY")
+        self.fast_period = int(self.parameters["fast_period"])
+        self.slow_period = int(self.parameters["slow_period"])
+        self.signals = self.parameters.get("signals")  # Backtest fast path (precompute_signals)
+
+    @classmethod
+    def precompute_signals(cls, closes, parameters=None):
+        """
+        Precompute the SMA columns for a whole backtest.
+
+        Args:
+            closes (pd.Series): Daily closes indexed by date (including warm-up).
+            parameters (dict, optional): Overrides of the class-level parameters.
+
+        Returns:
+            PrecomputedSignals: (sma_fast, sma_slow) per date.
+        """
+        p = {**cls.parameters, **(parameters or {})}
+        return PrecomputedSignals(sma_cross_frame(closes, int(p["fast_period"]), int(p["slow_period"])))
 
     def on_trading_iteration(self):
         """Execute crossover logic."""
-        # Get 60 days of historical data (sufficient for 50-day SMA)
-        bars = self.get_historical_prices(self.symbol, 60, "day")
-        if bars is None or len(bars.df) < 50:
-            return
+        if self.signals is not None:
+            valori = self.signals.at(self.get_datetime())
+            if valori is None:
+                return
+            sma_fast, sma_slow = valori
+        else:
+            # Get slow_period + 10 days of historical data (sufficient for the slow SMA)
+            bars = self.get_historical_prices(self.symbol, self.slow_period + 10, "day")
+            if bars is None or len(bars.df) < self.slow_period:
+                return
 
-        closes = bars.df["close"]
-        sma_20 = closes.tail(20).mean()  # 20-day simple moving average
-        sma_50 = closes.tail(50).mean()  # 50-day simple moving average
+            closes = bars.df["close"]
+            sma_fast = closes.tail(self.fast_period).mean()  # Fast simple moving average
+            sma_slow = closes.tail(self.slow_period).mean()  # Slow simple moving average
 
         position = self.get_position(self.symbol)
         price = self.get_last_price(self.symbol)
 
         # ENTRY SIGNAL: Golden Cross (bullish crossover)
-        if position is None and sma_20 > sma_50:
+        if position is None and sma_fast > sma_slow:
             qty = self.cash // price
             if qty > 0:
                 order = self.create_order(self.symbol, qty, "buy")
                 self.submit_order(order)
 
         # EXIT SIGNAL: Death Cross (bearish crossover)
-        elif position is not None and sma_20 < sma_50:
+        elif position is not None and sma_fast < sma_slow:
             self.sell_all()
 
 
@@ -111,12 +157,38 @@ class RSIMeanReversion(Strategy):
     
     Rationale: Momentum oscillator identifies exhaustion in trend moves.
     Best for: Range-bound markets; underperforms with strong directional trends.
+
+    Parameters (overridable via `parameters`):
+        rsi_period: RSI lookback (14)
+        oversold: Entry level (30)
+        overbought: Exit level (70)
     """
+
+    parameters = {"rsi_period": 14, "oversold": 30, "overbought": 70}
     
     def initialize(self):
         """Strategy initialization."""
         self.sleeptime = "1D"
         self.symbol = self.parameters.get("symbol", "SPY")
+        self.rsi_period = int(self.parameters["rsi_period"])
+        self.oversold = self.parameters["oversold"]
+        self.overbought = self.parameters["overbought"]
+        self.signals = self.parameters.get("signals")  # Backtest fast path (precompute_signals)
+
+    @classmethod
+    def precompute_signals(cls, closes, parameters=None):
+        """
+        Precompute the RSI column for a whole backtest.
+
+        Args:
+            closes (pd.Series): Daily closes indexed by date (including warm-up).
+            parameters (dict, optional): Overrides of the class-level parameters.
+
+        Returns:
+            PrecomputedSignals: (rsi,) per date.
+        """
+        p = {**cls.parameters, **(parameters or {})}
+        return PrecomputedSignals(rsi_frame(closes, int(p["rsi_period"])))
 
     def _calculate_rsi(self, prices, period=14):
         """
@@ -152,32 +224,39 @@ class RSIMeanReversion(Strategy):
 
     def on_trading_iteration(self):
         """Execute RSI-based trading logic."""
-        # Get 30 days of data (sufficient for RSI calculation on 14-period)
-        bars = self.get_historical_prices(self.symbol, 30, "day")
-        if bars is None or len(bars.df) < 15:
-            return
+        if self.signals is not None:
+            valori = self.signals.at(self.get_datetime())
+            if valori is None:
+                return
+            rsi = valori[0]
+        else:
+            # Get 2x the RSI period of data (30 days for the standard 14-period)
+            bars = self.get_historical_prices(self.symbol, max(30, self.rsi_period * 2), "day")
+            if bars is None or len(bars.df) < self.rsi_period + 1:
+                return
 
-        closes = bars.df["close"]
-        rsi = self._calculate_rsi(closes)
-        if rsi is None:
-            return
+            closes = bars.df["close"]
+            rsi = self._calculate_rsi(closes, self.rsi_period)
+            if rsi is None:
+                return
 
         position = self.get_position(self.symbol)
         price = self.get_last_price(self.symbol)
 
         # ENTRY SIGNAL: Oversold condition (RSI < 30)
-        if position is None and rsi < 30:
+        if position is None and rsi < self.oversold:
             qty = self.cash // price
             if qty > 0:
                 order = self.create_order(self.symbol, qty, "buy")
                 self.submit_order(order)
 
         # EXIT SIGNAL: Overbought condition (RSI > 70)
-        elif position is not None and rsi > 70:
+        elif position is not None and rsi > self.overbought:
             self.sell_all()
 
 
 # Strategy registry: Maps human-readable names to strategy classes
+# Keep config.STRATEGY_NAMES in sync: the UI lists the strategies without importing Lumibot
 STRATEGIES = {
     "ATH Dip": ATHDipStrategy,
     "SMA Cross": SMACrossStrategy,
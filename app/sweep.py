@@ -0,0 +1,230 @@
+"""
+Process-pool parameter sweep for the Lumibot strategies.
+
+Fans a grid of tickers x strategies x threshold values out over a
+ProcessPoolExecutor (one Lumibot backtest per worker process, every core
+busy) and collects each run's extract_strategy_metrics into one table.
+The price cache is warmed for the whole basket with one batched download;
+workers then backtest from the cached frames without touching the network.
+
+Thresholds reach the strategies through Lumibot `parameters` (see the
+class-level defaults in app/strategy.py), so any key declared there can be
+swept.
+
+Usage:
+    python -m app.sweep --basket TITAN "Top 15" --strategies all --start 2020-01-01 --end 2024-12-31
+    python -m app.sweep --tickers SPY QQQ --strategies "RSI Mean Reversion" --param oversold=20,25,30 --param overbought=70,80
+    python -m app.sweep --tickers SPY --strategies all --param fast_period=5,10,20 --param slow_period=50,100,200 --fast
+"""
+
+import argparse
+import datetime
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from app import config
+from app.strategy import STRATEGIES
+
+logger = logging.getLogger(__name__)
+
+METRIC_COLUMNS = ["total_return", "cagr", "max_drawdown", "sharpe", "win_rate", "trades"]
+
+
+def basket_tickers(nome):
+    """
+    Resolve a watchlist preset (full name or unique substring, e.g. "TITAN") to Yahoo symbols.
+
+    AUTOPILOT is dropped: it is a live web-discovery placeholder, not an asset.
+
+    Raises:
+        ValueError: If no preset or more than one preset matches.
+    """
+    from app.market_data import to_yahoo_symbol
+
+    trovati = [k for k in config.WATCHLIST_PRESETS if nome.lower() in k.lower()]
+    if len(trovati) != 1:
+        raise ValueError(f"Basket '{nome}' matches {len(trovati)} presets: {trovati}")
+    simboli = [t.strip() for t in config.WATCHLIST_PRESETS[trovati[0]].split(",")]
+    return [to_yahoo_symbol(t) for t in simboli if t and t != "AUTOPILOT"]
+
+
+def build_grid(tickers, strategie, param_grid=None):
+    """
+    Expand tickers x strategies x parameter values into a job list.
+
+    Args:
+        tickers (list): Asset symbols.
+        strategie (list): Strategy names from STRATEGIES.
+        param_grid (dict, optional): {strategy name: {parameter: [values]}}.
+            Strategies without an entry run once with their defaults.
+
+    Returns:
+        list: Job dicts with ticker, strategy and parameters.
+
+    Raises:
+        ValueError: On unknown strategies or parameters not declared by the strategy.
+    """
+    param_grid = param_grid or {}
+    jobs = []
+    for nome in strategie:
+        if nome not in STRATEGIES:
+            raise ValueError(f"Strategy '{nome}' not found")
+        griglia = param_grid.get(nome, {})
+        sconosciuti = set(griglia) - set(STRATEGIES[nome].parameters)
+        if sconosciuti:
+            raise ValueError(f"{nome}: unknown parameters {sorted(sconosciuti)}")
+        chiavi = list(griglia)
+        for valori in itertools.product(*griglia.values()):
+            for ticker in tickers:
+                jobs.append({"ticker": ticker, "strategy": nome, "parameters": dict(zip(chiavi, valori))})
+    return jobs
+
+
+def _esegui_job(job, capitale, start, end, fast=False):
+    """Worker entry point: one headless backtest, errors returned instead of raised."""
+    from app.backtest import _run_strategy_backtest, load_backtest_history
+    from app.fast_backtest import fast_backtest
+
+    riga = {"ticker": job["ticker"], "strategy": job["strategy"], **job["parameters"]}
+    try:
+        if fast:
+            metriche = fast_backtest(job["strategy"], load_backtest_history(job["ticker"], start, end),
+                                     capitale, start, end, parameters=job["parameters"], detail=True)
+        else:
+            metriche = _run_strategy_backtest(
+                STRATEGIES[job["strategy"]], job["ticker"], capitale, start, end,
+                parameters=job["parameters"], interactive=False, detail=True,
+            )
+        riga.update({k: metriche.get(k) for k in METRIC_COLUMNS})
+        riga["error"] = ""
+        riga["equity"] = metriche.get("equity")  # Popped by esegui_sweep for the metrics store
+    except Exception as exc:
+        riga["error"] = f"{type(exc).__name__}: {exc}"
+    return riga
+
+
+def esegui_sweep(jobs, capitale, start, end, max_workers=None, callbacks=None, fast=False, record=True):
+    """
+    Run every job on a process pool and gather one metrics row per run.
+
+    Args:
+        jobs (list): Output of build_grid.
+        capitale (float): Initial capital in USD for every run.
+        start (datetime.datetime): Backtest start.
+        end (datetime.datetime): Backtest end.
+        max_workers (int, optional): Pool size (defaults to every core).
+        callbacks (dict, optional): UI hooks:
+            - progress: f(done, total) after each completed run
+            - status: f(message) per completed run
+        fast (bool): Use the native fast engine (app.fast_backtest). Runs take
+            milliseconds, so they execute in this process instead of the pool.
+        record (bool): Append every successful run, with its equity curve, to the
+            metrics store (app.storage.metrics_store).
+
+    Returns:
+        pd.DataFrame: ticker, strategy, swept parameters, METRIC_COLUMNS and error,
+                      in job order.
+    """
+    from app.market_data import download_price_histories
+    from app.storage import metrics_store
+
+    callbacks = callbacks or {}
+    # Warm the disk cache for the whole basket in one batched request so workers only read it
+    inizio = start - datetime.timedelta(days=config.BACKTEST_WARMUP_DAYS)
+    esito = download_price_histories([job["ticker"] for job in jobs], inizio.date(), end.date())
+    for ticker in esito["failed"]:
+        logger.warning("Sweep: no price history for %s", ticker)
+
+    righe = [None] * len(jobs)
+
+    def completato(completati, i):
+        equity = righe[i].pop("equity", None)
+        if record and not righe[i]["error"]:
+            details = {"ticker": jobs[i]["ticker"], "strategy": jobs[i]["strategy"], "capital": capitale,
+                       "start": str(start.date()), "end": str(end.date()), "engine": "fast" if fast else "lumibot",
+                       "parameters": jobs[i]["parameters"], "sweep": True}
+            metrics_store.record_run(details, {}, {k: righe[i].get(k) for k in METRIC_COLUMNS}, equity=equity)
+        if callbacks.get("progress"):
+            callbacks["progress"](completati, len(jobs))
+        if callbacks.get("status"):
+            esito = righe[i]["error"] or f"return {righe[i].get('total_return')}"
+            callbacks["status"](f"[{completati}/{len(jobs)}] {jobs[i]['strategy']} {jobs[i]['ticker']}: {esito}")
+
+    if fast:
+        for i, job in enumerate(jobs):
+            righe[i] = _esegui_job(job, capitale, start, end, fast=True)
+            completato(i + 1, i)
+        return pd.DataFrame(righe)
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = {pool.submit(_esegui_job, job, capitale, start, end): i for i, job in enumerate(jobs)}
+        for completati, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            righe[i] = future.result()
+            completato(completati, i)
+    return pd.DataFrame(righe)
+
+
+def _parse_param(testo):
+    """Parse "name=v1,v2,v3" into (name, [values]) with numeric conversion (argparse `type=`)."""
+    nome, uguale, valori = testo.partition("=")
+    if not uguale or not nome.strip():
+        raise argparse.ArgumentTypeError(f"expected name=v1,v2,... got {testo!r}")
+    lista = []
+    for v in valori.split(","):
+        try:
+            lista.append(int(v))
+        except ValueError:
+            try:
+                lista.append(float(v))
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"{nome.strip()}: {v!r} is not a number") from None
+    return nome.strip(), lista
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel Lumibot parameter sweep")
+    parser.add_argument("--tickers", nargs="*", default=[])
+    parser.add_argument("--basket", nargs="*", default=[], help="Watchlist presets, e.g. TITAN \"Top 15\"")
+    parser.add_argument("--strategies", nargs="+", default=["all"])
+    parser.add_argument("--param", action="append", default=[], type=_parse_param,
+                        help="name=v1,v2 (applies to every strategy declaring the parameter)")
+    parser.add_argument("--start", required=True, type=datetime.datetime.fromisoformat)
+    parser.add_argument("--end", required=True, type=datetime.datetime.fromisoformat)
+    parser.add_argument("--capital", type=float, default=10000.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="sweep_results.csv")
+    parser.add_argument("--fast", action="store_true", help="Native fast engine instead of Lumibot (screening)")
+    parser.add_argument("--no-store", action="store_true", help="Do not append the runs to the metrics store")
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    for nome in args.basket:
+        tickers.extend(t for t in basket_tickers(nome) if t not in tickers)
+    if not tickers:
+        parser.error("Provide --tickers and/or --basket")
+
+    strategie = list(STRATEGIES) if args.strategies == ["all"] else args.strategies
+    valori = dict(args.param)
+    param_grid = {s: {k: v for k, v in valori.items() if k in STRATEGIES[s].parameters} for s in strategie if s in STRATEGIES}
+
+    jobs = build_grid(tickers, strategie, param_grid)
+    if args.fast:
+        print(f"Screening {len(jobs)} backtests with the fast engine...")
+    else:
+        print(f"Sweeping {len(jobs)} backtests on {args.workers or os.cpu_count()} processes...")
+    risultati = esegui_sweep(jobs, args.capital, args.start, args.end, max_workers=args.workers,
+                             callbacks={"status": None if args.fast else print}, fast=args.fast,
+                             record=not args.no_store)
+    risultati.to_csv(args.output, index=False)
+    print(risultati.to_string(index=False))
+    print(f"Saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
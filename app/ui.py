@@ -4,18 +4,25 @@ CustomTkinter User Interface (V8.7) - Telegram Integration & Multi-User Support.
 Institutional-grade dark mode dashboard for real-time trading control:
 - Mode selector: Backtest | Demo | Live
 - Parameter configuration panel (capital, max loss, watchlist)
-- Live activity terminal with trade logs
-- Portfolio metrics display (equity, liquidity, positions)
+- Live activity terminal with trade logs (ring-buffered, flushed in batches
+  at TERMINAL_FLUSH_MS and trimmed to TERMINAL_MAX_LINES)
+- Portfolio metrics display (equity, liquidity, positions), polled from a
+  latest-value channel every PORTFOLIO_POLL_MS and redrawn only on change
 - Control buttons: Start/Stop trading, Mode switching
+- Backtest mode: START queues one backtest per basket ticker in worker
+  subprocesses (app/backtest_runner.py), STOP cancels them
 
 Color scheme optimized for extended monitoring (low eye strain on dark backgrounds).
 """
 
 import threading
 import datetime
+from collections import deque
 import customtkinter as ctk
 import json
 from app import config
+from app.backtest_runner import BacktestRunner
+from app.channel import LatestValue
 from app.mt5_engine import gestisci_connessione, aggiorna_parametri_e_avvia, ferma_trading, spegni_tutto
 import os
 from dotenv import load_dotenv
@@ -43,19 +50,33 @@ class TradingApp:
         self.app.configure(fg_color=C_BG)
         
         # Defines the pre-set institutional asset baskets, names may vary from broker to broker 
-        self.watchlist_map = {
-            "👑 TITAN (Follow The Sun + Autopilot)": "AUTOPILOT, EURUSD, GBPUSD, USDJPY, BTCUSD, ETHUSD",
-            "💱 Forex Majors": "EURUSD, GBPUSD, USDJPY, USDCAD, AUDUSD",
-            "🪙 Crypto Assets": "BTCUSD, ETHUSD",
-            "🦅 Top 15 US Stocks (Tech & Defense)": "AAPL.OQ, MSFT.OQ, NVDA.OQ, TSLA.OQ, AMZN.OQ, META.OQ, GOOGL.OQ, JNJ.OQ, PG.OQ, KO.OQ, PEP.OQ, WMT.OQ, MCD.OQ, LMT.OQ, V.OQ"
-        }
+        self.watchlist_map = dict(config.WATCHLIST_PRESETS)
+
+        # Backtests run in worker subprocesses: the window stays responsive and runs can be queued/cancelled
+        self.backtest_runner = BacktestRunner(max_concurrent=config.BACKTEST_MAX_CONCURRENT,
+                                              default_timeout=config.BACKTEST_TIMEOUT_SECONDS or None)
+
+        # Terminal ring buffer: engine threads only append here, the GUI thread flushes it in batches
+        self._term_lock = threading.Lock()
+        self._term_coda = deque(maxlen=config.TERMINAL_BUFFER_LINES)
+        self._term_sostituisci = False  # Next flush first deletes the last line already on screen
+        self._term_scartate = 0         # Lines dropped since the last flush (buffer full)
+        self._term_scartate_tot = 0
+
+        # Portfolio: the engine overwrites the latest (cash, positions) pair, the UI polls it at a fixed rate
+        self.portfolio_channel = LatestValue()
+        self._portfolio_versione = 0
+        self._portfolio_testi = {}  # label -> text currently displayed
 
         self._setup_fonts()
         self._build_layout()
+        self.app.after(config.TERMINAL_FLUSH_MS, self._flush_terminal)
+        self.app.after(config.PORTFOLIO_POLL_MS, self._poll_portfolio)
         self._log_to_terminal("System status: Normal. Connection stable. Ready.")
         
         # 💡 FIX BALANCE AT STARTUP: Force connection to MT5 as soon as the window opens!
-        self._change_mode("[ Demo ]")
+        # (deferred so the engine thread's pandas/MetaTrader5 imports do not delay the first frame)
+        self.app.after(config.STARTUP_DEFERRED_MS, lambda: self._change_mode("[ Demo ]"))
 
     def _setup_fonts(self):
         self.title_font = ctk.CTkFont(family="Inter", size=20, weight="bold")
@@ -134,6 +155,12 @@ class TradingApp:
         self.combo_ticker.grid(row=2, column=0, sticky="ew", padx=15, pady=(0, 15))
         self.combo_ticker.set(opzioni_menu[0])
 
+        # Strategy used by [ Backtest ] mode
+        ctk.CTkLabel(card_asset, text="Backtest Strategy", font=self.label_font, text_color=C_SUB).grid(row=3, column=0, sticky="w", padx=15)
+        self.combo_strategy = ctk.CTkComboBox(card_asset, values=config.STRATEGY_NAMES, fg_color=C_BG, border_color=C_BORDER, button_color=C_BORDER, text_color=C_TEXT, height=35)
+        self.combo_strategy.grid(row=4, column=0, sticky="ew", padx=15, pady=(0, 15))
+        self.combo_strategy.set(config.STRATEGY_NAMES[0])
+
         # 3. Telegram (ONLY CHAT ID NOW)
         card_tg = ctk.CTkFrame(left_panel, fg_color=C_CARD, corner_radius=8, border_width=1, border_color=C_BORDER)
         card_tg.grid(row=2, column=0, sticky="ew", pady=(0, 15))
@@ -182,6 +209,8 @@ class TradingApp:
         term_card.grid_columnconfigure(0, weight=1)
 
         ctk.CTkLabel(term_card, text="Bot Activity Terminal", font=self.card_title_font, text_color=C_TEXT).grid(row=0, column=0, sticky="w", padx=20, pady=(15, 5))
+        self.lbl_term_drop = ctk.CTkLabel(term_card, text="", font=self.sub_metric_font, text_color=C_SUB)
+        self.lbl_term_drop.grid(row=0, column=0, sticky="e", padx=20, pady=(15, 5))
         
         self.terminal = ctk.CTkTextbox(term_card, fg_color=C_TERM_BG, text_color=C_GREEN, font=self.term_font, corner_radius=6)
         self.terminal.grid(row=1, column=0, sticky="nsew", padx=20, pady=(5, 20))
@@ -197,23 +226,68 @@ class TradingApp:
         return lbl_val
 
     def _log_to_terminal(self, text, replace_last=False):
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        def _update():
-            self.terminal.configure(state="normal")
+        # Thread-safe and O(1): the line waits in the ring buffer until the next flush
+        riga = f"[{datetime.datetime.now():%H:%M:%S}] {text}"
+        with self._term_lock:
+            if replace_last and self._term_coda:
+                self._term_coda[-1] = riga  # The line it replaces was never drawn
+                return
             if replace_last:
-                try: self.terminal.delete("end-2l", "end-1l")
-                except: pass
-            self.terminal.insert("end", f"[{timestamp}] {text}\n")
-            self.terminal.see("end")
-            self.terminal.configure(state="disabled")
-        self.app.after(0, _update)
+                self._term_sostituisci = True
+            if len(self._term_coda) == self._term_coda.maxlen:
+                self._term_scartate += 1  # append() below evicts the oldest pending line
+            self._term_coda.append(riga)
+
+    def _flush_terminal(self):
+        """GUI-thread tick: insert every pending line in one batch, then trim the textbox."""
+        try:
+            with self._term_lock:
+                righe = list(self._term_coda)
+                self._term_coda.clear()
+                sostituisci, self._term_sostituisci = self._term_sostituisci, False
+                scartate, self._term_scartate = self._term_scartate, 0
+
+            if righe or sostituisci:
+                if scartate:
+                    self._term_scartate_tot += scartate
+                    righe.insert(0, f"[{datetime.datetime.now():%H:%M:%S}] ⚠️ {scartate} log lines dropped (engine faster than UI)")
+                    self.lbl_term_drop.configure(text=f"{self._term_scartate_tot:,} lines dropped")
+                self.terminal.configure(state="normal")
+                if sostituisci:
+                    try: self.terminal.delete("end-2l", "end-1l")
+                    except Exception: pass
+                if righe:
+                    self.terminal.insert("end", "\n".join(righe) + "\n")
+                # Trim from the top: the textbox keeps at most TERMINAL_MAX_LINES lines
+                eccesso = int(self.terminal.index("end-1c").split(".")[0]) - 1 - config.TERMINAL_MAX_LINES
+                if eccesso > 0:
+                    self.terminal.delete("1.0", f"{eccesso + 1}.0")
+                self.terminal.see("end")
+                self.terminal.configure(state="disabled")
+        finally:
+            self.app.after(config.TERMINAL_FLUSH_MS, self._flush_terminal)  # Keep ticking even if one flush fails
 
     def _update_portfolio(self, cash, val_posizioni):
-        def _update():
-            self.lbl_cash.configure(text=f"$ {cash:,.2f}")
-            self.lbl_pos.configure(text=f"$ {val_posizioni:,.2f}")
-            self.lbl_tot.configure(text=f"$ {(cash + val_posizioni):,.2f}")
-        self.app.after(0, _update)
+        # Called by the engine thread every loop iteration: only overwrites the shared snapshot
+        self.portfolio_channel.publish((cash, val_posizioni))
+
+    def _poll_portfolio(self):
+        """GUI-thread tick: redraw only the portfolio labels whose text changed."""
+        try:
+            self._portfolio_versione, valore = self.portfolio_channel.poll(self._portfolio_versione)
+            if valore is not None:
+                cash, val_posizioni = valore
+                testi = {
+                    self.lbl_cash: f"$ {cash:,.2f}",
+                    self.lbl_pos: f"$ {val_posizioni:,.2f}",
+                    self.lbl_tot: f"$ {(cash + val_posizioni):,.2f}",
+                }
+                for etichetta, testo in testi.items():
+                    if self._portfolio_testi.get(etichetta) != testo:
+                        etichetta.configure(text=testo)
+                        self._portfolio_testi[etichetta] = testo
+        finally:
+            self.app.after(config.PORTFOLIO_POLL_MS, self._poll_portfolio)
 
     def _get_callbacks(self):
         return {"log": self._log_to_terminal, "portfolio": self._update_portfolio, "running": self._set_running_ui}
@@ -246,8 +320,53 @@ class TradingApp:
                 self.btn_stop.configure(state="disabled", fg_color="#7f1d1d")
         self.app.after(0, _update)
 
+    def _backtest_callbacks(self, etichetta):
+        def metriche(m):
+            self._log_to_terminal(f"[{etichetta}] Return {m.get('total_return', 0):.2%} | "
+                                  f"Sharpe {m.get('sharpe', 0):.2f} | Max DD {m.get('max_drawdown', 0):.2%}")
+
+        return {
+            "status": lambda msg: self._log_to_terminal(f"[{etichetta}] {msg}"),
+            "strategy_metrics": metriche,
+            "report": lambda path: self._log_to_terminal(f"[{etichetta}] Report: {path}"),
+            "job": lambda job_id, stato: self._set_backtest_ui(self.backtest_runner.active()),
+        }
+
+    def _set_backtest_ui(self, attivi):
+        # START stays enabled so more backtests can be queued; STOP cancels the queue
+        def _update():
+            self.btn_stop.configure(state="normal" if attivi else "disabled",
+                                    fg_color=C_RED_DARK if attivi else "#7f1d1d")
+        self.app.after(0, _update)
+
+    def _queue_backtests(self):
+        from app.market_data import to_yahoo_symbol  # pandas/pyarrow: loaded on the first queued backtest, not at startup
+
+        params = self._get_params()
+        nome_strategia = self.combo_strategy.get()
+        if nome_strategia not in config.STRATEGY_NAMES:
+            self._log_to_terminal(f"Unknown strategy: {nome_strategia}")
+            return
+        try:
+            capitale = float(params["budget"])
+        except ValueError:
+            self._log_to_terminal(f"Invalid capital: {params['budget']}")
+            return
+        end = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        try:
+            start = end.replace(year=end.year - config.BACKTEST_UI_YEARS)
+        except ValueError:
+            start = end.replace(year=end.year - config.BACKTEST_UI_YEARS, day=28)  # 29 February → 28 February
+        tickers = [to_yahoo_symbol(t.strip()) for t in params["ticker"].split(",") if t.strip() and t.strip() != "AUTOPILOT"]
+        for ticker in tickers:
+            job_id = self.backtest_runner.submit(ticker, capitale, start, end, nome_strategia,
+                                                 self._backtest_callbacks(f"BT {ticker}"))
+            self._log_to_terminal(f"Backtest #{job_id} queued: {nome_strategia} on {ticker} ({start:%Y-%m-%d} → {end:%Y-%m-%d})")
+
     def _on_start(self):
-        if self.seg_mode.get() == "[ Backtest ]": return
+        if self.seg_mode.get() == "[ Backtest ]":
+            self._queue_backtests()
+            return
         self._log_to_terminal("Market scan started... Scanning for signals.")
         
         params = self._get_params()
@@ -261,6 +380,9 @@ class TradingApp:
         aggiorna_parametri_e_avvia(params)
 
     def _on_stop(self):
+        if self.seg_mode.get() == "[ Backtest ]":
+            self._log_to_terminal(f"Backtests cancelled: {self.backtest_runner.cancel_all()}")
+            return
         self._log_to_terminal("System commanded to halt. Returning to standby.")
         ferma_trading()
 
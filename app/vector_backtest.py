@@ -0,0 +1,406 @@
+"""
+Vectorized NumPy backtester for the dual-horizon exit rules of the live MT5 engine.
+
+The event loop in app.mt5_engine (and app.replay) evaluates one tick at a time.
+For parameter research on the exit logic this module evaluates every candidate
+entry over whole bar arrays at once:
+
+1. Forward windows: a (candidates x max_hold) matrix of mark prices after each entry
+2. Trade peaks: cumulative max (longs) / min (shorts) from the fill price
+3. Exit rules: boolean hit matrices, first-hit bar found with argmax per rule
+4. Sequencing: a greedy pass keeps one position at a time and applies the
+   loss/victory quarantines and the daily kill-switch
+
+Price windows and peak drawdowns do not depend on the exit parameters, so they
+are computed once per dataset and reused across a whole parameter grid.
+
+Modelling assumptions (same rules as _loop_principale, evaluated on bar closes):
+- Entries fill at the signal bar close plus half the spread
+- Exits are checked on every following bar close in the engine's priority order:
+  take profit, stop loss, Friday shield, trailing profit
+- Positions still open after max_hold bars (or at the end of data) are closed there
+
+Usage:
+    signals = engine_signals(close)
+    bt = VectorBacktester(close, signals, horizon="SHORT_TERM", contract_size=100000)
+    result = bt.run(budget=100, max_loss=30)
+    grid = bt.grid({"SHORT_TP_RISK_MULT": [1.0, 1.5, 2.0], "SHORT_TRAIL_PCT": [0.1, 0.15, 0.3]}, budget=100)
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from app import config
+
+# Exit parameters the backtester understands, with the live engine values as defaults
+EXIT_PARAMS = (
+    "COMMISSION_PER_LOT", "RISK_UNIT_PCT",
+    "SHORT_TP_RISK_MULT", "SHORT_TP_COMM_MULT", "SHORT_SL_RISK_MULT", "SHORT_SL_COMM_MULT",
+    "SHORT_TRAIL_COMM_MULT", "SHORT_TRAIL_PCT",
+    "LONG_SL_RISK_MULT", "LONG_SL_COMM_MULT", "LONG_TRAIL_COMM_MULT", "LONG_TRAIL_PCT",
+    "QUARANTINE_LOSS_SECONDS", "QUARANTINE_WIN_SECONDS",
+)
+
+# Exit reason labels, indexed by rule priority (last one: no rule fired within the window)
+MOTIVI = ("Target Reached", "Stop Loss", "Friday Weekend Shield", "Trailing Profit", "Max Holding")
+
+
+def default_exit_params(**overrides):
+    """
+    Live engine exit parameters (from app.config), optionally overridden.
+
+    Raises:
+        ValueError: If an override is not a known exit parameter.
+    """
+    sconosciuti = set(overrides) - set(EXIT_PARAMS)
+    if sconosciuti:
+        raise ValueError(f"Unknown exit parameters: {sorted(sconosciuti)}")
+    params = {nome: getattr(config, nome) for nome in EXIT_PARAMS}
+    params.update(overrides)
+    return params
+
+
+def engine_signals(close, ai_scores=None, min_score=6, rsi_length=14, bb_length=20, sma_length=200):
+    """
+    Vectorized replica of the engine's entry filters on a bar series.
+
+    Mirrors check_technical_momentum (RSI > 55 above the Bollinger mid band is
+    BULLISH, RSI < 45 below it is BEARISH), get_trend_filter (close vs SMA200,
+    NEUTRAL while fewer than 200 bars exist) and the AI dual confirmation.
+
+    Args:
+        close (array-like): Bar closes.
+        ai_scores (array-like, optional): AI score per bar. When omitted the AI is
+            assumed to confirm the technical direction.
+        min_score (int): AI conviction threshold (engine default 6).
+
+    Returns:
+        np.ndarray: int8 signals, +1 BUY, -1 SELL, 0 no entry.
+    """
+    c = pd.Series(np.asarray(close, dtype=np.float64))
+    delta = c.diff()
+    # RMA smoothing, as pandas_ta's RSI
+    guadagni = delta.clip(lower=0).ewm(alpha=1.0 / rsi_length, adjust=False).mean()
+    perdite = (-delta.clip(upper=0)).ewm(alpha=1.0 / rsi_length, adjust=False).mean()
+    rsi = 100.0 * guadagni / (guadagni + perdite)
+    bb_mid = c.rolling(bb_length).mean()
+    sma = c.rolling(sma_length).mean()
+
+    bullish = ((rsi > 55) & (c > bb_mid)).to_numpy()
+    bearish = ((rsi < 45) & (c < bb_mid)).to_numpy()
+    trend_valido = sma.notna().to_numpy()
+    trend_bull = trend_valido & (c > sma).to_numpy()
+    trend_bear = trend_valido & ~(c > sma).to_numpy()
+
+    if ai_scores is None:
+        ai_buy, ai_sell = bullish, bearish
+    else:
+        score = np.asarray(ai_scores)
+        ai_buy, ai_sell = score >= min_score, score <= -min_score
+
+    segnali = np.zeros(len(c), dtype=np.int8)
+    segnali[bullish & ~trend_bear & ai_buy] = 1
+    segnali[bearish & ~trend_bull & ai_sell] = -1
+    return segnali
+
+
+def _secondi(times):
+    """Convert a DatetimeIndex / datetime64 array / numeric array to int64 UNIX seconds."""
+    if isinstance(times, pd.DatetimeIndex) or np.issubdtype(np.asarray(times).dtype, np.datetime64):
+        indice = pd.DatetimeIndex(times)
+        if indice.tz is not None:
+            indice = indice.tz_convert("UTC").tz_localize(None)
+        return indice.as_unit("s").asi8
+    return np.asarray(times, dtype=np.int64)
+
+
+def _primo_hit(hit):
+    """First True column per row (argmax), or the column count when never hit."""
+    primo = hit.argmax(axis=1)
+    primo[~hit[np.arange(len(hit)), primo]] = hit.shape[1]
+    return primo
+
+
+class VectorBacktester:
+    """
+    Dual-horizon exit simulator over whole bar arrays.
+
+    Args:
+        close (array-like or pd.Series): Bar closes. A Series with a DatetimeIndex also provides times.
+        signals (array-like): +1 BUY / -1 SELL / 0 per bar (see engine_signals).
+        times (array-like, optional): Bar timestamps (UNIX seconds or datetimes).
+        horizon (str): "SHORT_TERM" (MAGIC_SHORT_TERM rules) or "LONG_TERM" (immune rules).
+        max_hold (int): Bars a position may stay open.
+        contract_size (float): Units per lot (100000 for Forex, 1 for CFDs/crypto).
+        leverage (float): Account leverage used for margin-based lot sizing.
+        volume_min (float): Broker minimum lot.
+        volume_step (float): Broker lot step.
+        spread (float): Bid/ask spread as a fraction of price.
+        bar_seconds (int): Bar spacing when times are not given.
+    """
+
+    def __init__(self, close, signals, times=None, horizon="SHORT_TERM", max_hold=500,
+                 contract_size=1.0, leverage=30, volume_min=0.01, volume_step=0.01,
+                 spread=0.0, bar_seconds=3600):
+        if horizon not in ("SHORT_TERM", "LONG_TERM"):
+            raise ValueError(f"Unknown horizon: {horizon}")
+        if times is None and isinstance(close, pd.Series) and isinstance(close.index, pd.DatetimeIndex):
+            times = close.index
+
+        self.close = np.asarray(close, dtype=np.float64)
+        n = len(self.close)
+        self.times = _secondi(times) if times is not None else np.arange(n, dtype=np.int64) * bar_seconds
+        self.horizon = horizon
+        self.max_hold = max_hold
+        self.contract_size = contract_size
+        self.leverage = leverage
+        self.volume_min = volume_min
+        self.volume_step = volume_step
+
+        segnali = np.asarray(signals)
+        # A signal on the last bar has no following bar to be managed on
+        candidati = np.flatnonzero(segnali[:-1] != 0)
+        self.candidati = candidati
+        self.direzione = segnali[candidati].astype(np.float64)
+        meta = spread / 2.0
+        self.prezzo_ingresso = self.close[candidati] * (1.0 + self.direzione * meta)
+
+        # Forward windows: bar i+1 .. i+max_hold of every candidate
+        offset = np.arange(1, max_hold + 1)
+        indici = candidati[:, None] + offset[None, :]
+        valido = indici < n
+        indici = np.minimum(indici, n - 1)
+        self.indici = indici
+        self.ultima_valida = valido.sum(axis=1) - 1
+
+        marca = self.close[indici] * (1.0 - self.direzione[:, None] * meta)
+        d = self.direzione[:, None]
+        # Favorable price move per unit (positive = in the money); NaN past the end of data
+        # never satisfies a rule. float32 halves the memory traffic of every grid point.
+        movimento = d * (marca - self.prezzo_ingresso[:, None])
+        movimento[~valido] = np.nan
+        self.movimento = movimento.astype(np.float32)
+
+        # Trade peak starts at the fill price, as memoria_asset["picco_trade"]
+        favorevole = d * marca
+        picco = np.maximum(np.maximum.accumulate(favorevole, axis=1), (self.direzione * self.prezzo_ingresso)[:, None])
+        dal_picco = (favorevole - picco) / np.abs(picco) * 100.0
+        dal_picco[~valido] = np.nan
+        self.dal_picco = dal_picco.astype(np.float32)
+
+        if horizon == "SHORT_TERM":
+            t = self.times[indici]
+            giorno_settimana = (t // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+            self.venerdi = (giorno_settimana == 4) & (t % 86400 >= 21 * 3600 + 30 * 60) & valido
+        else:
+            self.venerdi = None
+
+    # ------------------------------------------------------------------
+    # Exit evaluation
+    # ------------------------------------------------------------------
+    def _lotti(self, trade_budget):
+        """Engine lot sizing: 50% of the trade budget as margin, rounded to the lot step."""
+        margine = self.prezzo_ingresso * self.contract_size / self.leverage
+        lotti = np.round((trade_budget * 0.5 / margine) / self.volume_step) * self.volume_step
+        return lotti, lotti >= self.volume_min - 1e-12
+
+    def _uscite(self, budget, trade_budget, p):
+        """First exit bar, net P/L and reason code for every candidate."""
+        lotti, ammessi = self._lotti(trade_budget)
+        quantita = lotti * self.contract_size
+        commissioni = lotti * p["COMMISSION_PER_LOT"]
+        rischio = budget * p["RISK_UNIT_PCT"]
+
+        # Net USD thresholds become per-row price-move thresholds: pnl = move * qty - commission
+        with np.errstate(divide="ignore", invalid="ignore"):
+            def soglia(usd):
+                return ((usd + commissioni) / quantita).astype(np.float32)[:, None]
+
+            if self.horizon == "SHORT_TERM":
+                tp = np.maximum(rischio * p["SHORT_TP_RISK_MULT"], commissioni * p["SHORT_TP_COMM_MULT"])
+                sl = -np.maximum(rischio * p["SHORT_SL_RISK_MULT"], commissioni * p["SHORT_SL_COMM_MULT"])
+                regole = [
+                    self.movimento >= soglia(tp),
+                    self.movimento <= soglia(sl),
+                    self.venerdi,
+                    (self.movimento > soglia(commissioni * p["SHORT_TRAIL_COMM_MULT"])) & (self.dal_picco <= -p["SHORT_TRAIL_PCT"]),
+                ]
+            else:
+                sl = -np.maximum(rischio * p["LONG_SL_RISK_MULT"], commissioni * p["LONG_SL_COMM_MULT"])
+                regole = [
+                    None,
+                    self.movimento <= soglia(sl),
+                    None,
+                    (self.movimento > soglia(commissioni * p["LONG_TRAIL_COMM_MULT"])) & (self.dal_picco <= -p["LONG_TRAIL_PCT"]),
+                ]
+
+        n, h = self.movimento.shape
+        uscita = np.full(n, h, dtype=np.int64)
+        motivo = np.full(n, len(MOTIVI) - 1, dtype=np.int8)
+        for codice, hit in enumerate(regole):
+            if hit is None:
+                continue
+            primo = _primo_hit(hit)
+            # Strict < keeps the engine's priority order when rules fire on the same bar
+            migliore = primo < uscita
+            uscita[migliore] = primo[migliore]
+            motivo[migliore] = codice
+
+        # Unclosed positions: close on the last bar of the window (or of the data)
+        aperte = uscita == h
+        uscita[aperte] = self.ultima_valida[aperte]
+        righe = np.arange(n)
+        return {
+            "barra_uscita": self.indici[righe, uscita],
+            "pnl": self.movimento[righe, uscita].astype(np.float64) * quantita - commissioni,
+            "motivo": motivo,
+            "lotti": lotti,
+            "ammessi": ammessi,
+        }
+
+    def _sequenza(self, uscite, max_loss, p):
+        """Greedy one-position-at-a-time pass with quarantines and the daily kill-switch."""
+        ammessi = np.flatnonzero(uscite["ammessi"])
+        barre = self.candidati[ammessi]
+        tempi = self.times[barre]
+        uscita = uscite["barra_uscita"][ammessi]
+        t_uscita = self.times[uscita]
+
+        # Every possible "next candidate" jump, resolved in bulk before the sequential pass
+        dopo_uscita = np.searchsorted(barre, uscita, side="right").tolist()
+        dopo_perdite = np.searchsorted(tempi, t_uscita + p["QUARANTINE_LOSS_SECONDS"]).tolist()
+        dopo_vittoria = np.searchsorted(tempi, t_uscita + p["QUARANTINE_WIN_SECONDS"]).tolist()
+        giorni = (t_uscita // 86400).tolist()
+        domani = np.searchsorted(tempi, (t_uscita // 86400 + 1) * 86400).tolist()
+        pnl = uscite["pnl"][ammessi].tolist()
+        breve = self.horizon == "SHORT_TERM"
+
+        presi = []
+        perdite, pnl_giorno, giorno = 0, 0.0, None
+        k = 0
+        while k < len(pnl):
+            presi.append(k)
+            prossimo = dopo_uscita[k]
+
+            if pnl[k] < 0 and breve:
+                perdite += 1
+                if perdite >= 2:
+                    prossimo, perdite = max(prossimo, dopo_perdite[k]), 0
+            elif pnl[k] > 0:
+                perdite = 0
+                prossimo = max(prossimo, dopo_vittoria[k])
+            else:
+                perdite = 0
+
+            if max_loss is not None:
+                if giorni[k] != giorno:
+                    giorno, pnl_giorno = giorni[k], 0.0
+                pnl_giorno += pnl[k]
+                if pnl_giorno <= -max_loss:
+                    prossimo = max(prossimo, domani[k])  # Kill-switch: done for the day
+
+            k = prossimo
+        return ammessi[presi]
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def run(self, budget=100.0, trade_budget=None, max_loss=None, balance=10000.0, detail=True, **overrides):
+        """
+        Simulate one parameter set.
+
+        Args:
+            budget (float): Engine "budget" (sets limite_base = budget * RISK_UNIT_PCT).
+            trade_budget (float, optional): USD allocated per entry (defaults to budget, as
+                the engine does for a single-ticker watchlist).
+            max_loss (float, optional): Daily kill-switch threshold in USD.
+            balance (float): Starting account balance for the equity curve.
+            detail (bool): Build the trade list and per-bar equity curve (skipped by grid searches).
+            **overrides: Exit parameters (see EXIT_PARAMS).
+
+        Returns:
+            dict: trades (DataFrame or None), equity (Series or None), net_profit, n_trades,
+                  win_rate, max_drawdown
+        """
+        p = default_exit_params(**overrides)
+        uscite = self._uscite(budget, budget if trade_budget is None else trade_budget, p)
+        presi = self._sequenza(uscite, max_loss, p)
+
+        ingresso = self.candidati[presi]
+        uscita = uscite["barra_uscita"][presi]
+        pnl = uscite["pnl"][presi]
+        realizzato = np.concatenate([[0.0], np.cumsum(pnl)])
+        riepilogo = {
+            "trades": None,
+            "equity": None,
+            "net_profit": float(pnl.sum()),
+            "n_trades": int(len(pnl)),
+            "win_rate": float((pnl > 0).mean()) if len(pnl) else 0.0,
+            "max_drawdown": float((realizzato - np.maximum.accumulate(realizzato)).min()),
+        }
+        if not detail:
+            return riepilogo
+
+        riepilogo["trades"] = pd.DataFrame({
+            "entry_bar": ingresso,
+            "exit_bar": uscita,
+            "entry_time": pd.to_datetime(self.times[ingresso], unit="s"),
+            "exit_time": pd.to_datetime(self.times[uscita], unit="s"),
+            "direction": np.where(self.direzione[presi] > 0, "LONG", "SHORT"),
+            "lots": uscite["lotti"][presi],
+            "entry_price": self.prezzo_ingresso[presi],
+            "exit_price": self.close[uscita],
+            "net_pl": pnl,
+            "reason": np.asarray(MOTIVI)[uscite["motivo"][presi]],
+        })
+        riepilogo["equity"] = self._equity(presi, uscite, balance)
+        return riepilogo
+
+    def grid(self, param_grid, **fixed):
+        """
+        Evaluate a parameter grid, reusing the precomputed price windows.
+
+        Args:
+            param_grid (dict or list): {name: [values]} for a full cartesian product,
+                or a list of {name: value} dicts. "budget", "trade_budget" and
+                "max_loss" may be swept too.
+            **fixed: Arguments applied to every run (budget, max_loss, overrides...).
+
+        Returns:
+            pd.DataFrame: One row per combination with its parameters and
+                          net_profit, n_trades, win_rate, max_drawdown.
+        """
+        if isinstance(param_grid, dict):
+            nomi = list(param_grid)
+            combinazioni = [dict(zip(nomi, valori)) for valori in itertools.product(*param_grid.values())]
+        else:
+            combinazioni = list(param_grid)
+
+        righe = []
+        for combo in combinazioni:
+            risultato = self.run(**{**fixed, **combo}, detail=False)
+            righe.append({**combo, **{k: risultato[k] for k in ("net_profit", "n_trades", "win_rate", "max_drawdown")}})
+        return pd.DataFrame(righe)
+
+    def _equity(self, presi, uscite, balance):
+        """Mark-to-market equity per bar: realized P/L plus open position value."""
+        n = len(self.close)
+        ingresso = self.candidati[presi]
+        uscita = uscite["barra_uscita"][presi]
+        quantita = uscite["lotti"][presi] * self.contract_size * self.direzione[presi]
+
+        # Open P/L on bars [entry, exit) = quantity * close - quantity * fill (difference arrays)
+        coeff = np.zeros(n + 1)
+        costante = np.zeros(n + 1)
+        np.add.at(coeff, ingresso, quantita)
+        np.add.at(coeff, uscita, -quantita)
+        np.add.at(costante, ingresso, -quantita * self.prezzo_ingresso[presi])
+        np.add.at(costante, uscita, quantita * self.prezzo_ingresso[presi])
+        aperto = np.cumsum(coeff)[:n] * self.close + np.cumsum(costante)[:n]
+
+        realizzato = np.zeros(n)
+        np.add.at(realizzato, uscita, uscite["pnl"][presi])
+        valori = balance + np.cumsum(realizzato) + aperto
+        return pd.Series(valori, index=pd.to_datetime(self.times, unit="s"), name="equity")
@@ -0,0 +1,324 @@
+"""
+Walk-forward optimization for the strategy registry.
+
+Slices a ticker's history into rolling windows: parameters are chosen on each
+train slice by a grid search and then evaluated out-of-sample on the slice
+that follows it. The out-of-sample equity curves are chained into one
+continuous curve (each window starts from the previous window's final value),
+which is the honest estimate of how the tuning process would have performed.
+
+Every run uses the native fast engine (app/fast_backtest.py), so a full grid
+per window takes milliseconds. Windows are optimized in parallel on a process
+pool, and each window's result is cached on disk under a key built from its
+dates, the grid, the capital and a fingerprint of the price data it reads.
+Re-running with one more window (a later end date) only computes the new one.
+
+Usage:
+    python -m app.walk_forward --ticker SPY --strategy "SMA Cross" --param fast_period=5,10,20 --param slow_period=50,100,200 --start 2015-01-01 --end 2024-12-31
+    python -m app.walk_forward --ticker QQQ --strategy "RSI Mean Reversion" --param oversold=20,25,30 --train-days 1095 --test-days 365 --start 2012-01-01 --end 2024-12-31
+"""
+
+import argparse
+import datetime
+import hashlib
+import inspect
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app import config, fast_backtest as motore_veloce, signals
+from app.fast_backtest import equity_metrics, fast_backtest
+from app.sweep import _parse_param, build_grid
+
+logger = logging.getLogger(__name__)
+
+OOS_COLUMNS = ["total_return", "cagr", "max_drawdown", "sharpe", "trades"]
+OBJECTIVES = ["sharpe", "cagr", "total_return", "max_drawdown"]  # Maximized on the train slice
+
+
+def build_windows(start, end, train_days, test_days, step_days=None):
+    """
+    Rolling train/test windows between two dates.
+
+    Test slices follow each other without gaps or overlap (with the default
+    step): a test slice covers the bars after train_end up to test_end.
+
+    Args:
+        start (datetime.datetime): First train start.
+        end (datetime.datetime): Last allowed test end (only complete windows are kept).
+        train_days (int): Calendar days per train slice.
+        test_days (int): Calendar days per test slice.
+        step_days (int, optional): Shift between windows (defaults to test_days).
+
+    Returns:
+        list: Dicts with train_start, train_end, test_end.
+    """
+    step = datetime.timedelta(days=step_days or test_days)
+    finestre = []
+    inizio = start
+    while True:
+        fine_train = inizio + datetime.timedelta(days=train_days)
+        fine_test = fine_train + datetime.timedelta(days=test_days)
+        if fine_test > end:
+            return finestre
+        finestre.append({"train_start": inizio, "train_end": fine_train, "test_end": fine_test})
+        inizio += step
+
+
+def _firma_motore():
+    """Hash of the fast engine and indicator code: a rule change invalidates the window cache."""
+    sorgente = inspect.getsource(motore_veloce) + inspect.getsource(signals)
+    return hashlib.sha1(sorgente.encode("utf-8")).hexdigest()
+
+
+def _fetta(history, finestra):
+    """Bars a window reads: warm-up before train_start up to test_end."""
+    inizio = pd.Timestamp(finestra["train_start"] - datetime.timedelta(days=config.BACKTEST_WARMUP_DAYS))
+    giorni = history.index.normalize()
+    return history[(giorni >= inizio.normalize()) & (giorni <= pd.Timestamp(finestra["test_end"]).normalize())]
+
+
+def _chiave_finestra(ticker, nome_strategia, combinazioni, capitale, metrica, finestra, fetta, firma_motore):
+    close = fetta["Close"].to_numpy(dtype=np.float64)
+    impronta = hashlib.sha1(close.tobytes() + fetta.index.asi8.tobytes()).hexdigest()
+    descrizione = json.dumps({
+        "ticker": ticker, "strategy": nome_strategia, "grid": combinazioni, "capital": capitale,
+        "metric": metrica, "risk_free_rate": config.BACKTEST_RISK_FREE_RATE,
+        "train_start": finestra["train_start"].isoformat(), "train_end": finestra["train_end"].isoformat(),
+        "test_end": finestra["test_end"].isoformat(), "data": impronta, "engine": firma_motore,
+    }, sort_keys=True, default=str)
+    return hashlib.sha1(descrizione.encode("utf-8")).hexdigest()
+
+
+def _ottimizza_finestra(nome_strategia, fetta, combinazioni, capitale, metrica, finestra):
+    """
+    Worker entry point: grid search on the train slice, then one out-of-sample run.
+
+    Returns:
+        dict: parameters, train_score, OOS_COLUMNS and the OOS equity as [[date, value], ...].
+    """
+    migliore, punteggio = None, -np.inf
+    for parametri in combinazioni:
+        try:
+            metriche = fast_backtest(nome_strategia, fetta, capitale, finestra["train_start"],
+                                     finestra["train_end"], parameters=parametri)
+        except ValueError:
+            continue
+        valore = metriche[metrica]
+        if migliore is None or valore > punteggio:
+            migliore, punteggio = parametri, valore
+    if migliore is None:
+        raise ValueError(f"No valid train run between {finestra['train_start']:%Y-%m-%d} and {finestra['train_end']:%Y-%m-%d}")
+
+    oos = fast_backtest(nome_strategia, fetta, capitale, finestra["train_end"], finestra["test_end"],
+                        parameters=migliore, detail=True)
+    return {
+        "parameters": migliore,
+        "train_score": float(punteggio),
+        **{k: oos[k] for k in OOS_COLUMNS},
+        "equity": [[d.strftime("%Y-%m-%d"), float(v)] for d, v in oos["equity"].items()],
+    }
+
+
+def _leggi_risultato(percorso):
+    try:
+        return json.loads(percorso.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _scrivi_risultato(percorso, risultato):
+    tmp_path = percorso.with_suffix(".tmp")
+    try:
+        tmp_path.write_text(json.dumps(risultato), encoding="utf-8")
+        os.replace(tmp_path, percorso)
+    except OSError as exc:
+        logger.warning("Walk-forward window not cached: %s", exc)
+
+
+def stitch_equity(risultati, capitale):
+    """
+    Chain the out-of-sample equity curves of consecutive windows.
+
+    Each window is backtested from `capitale`; its curve is rescaled so its
+    first bar starts from the previous window's final value. Bars already covered by an
+    earlier window (overlapping test slices) are skipped.
+
+    Args:
+        risultati (list): Window results (with "equity" as [[date, value], ...]).
+        capitale (float): Initial capital in USD.
+
+    Returns:
+        pd.Series: Continuous out-of-sample portfolio value indexed by date.
+    """
+    pezzi = []
+    valore = float(capitale)
+    for risultato in risultati:
+        date, valori = zip(*risultato["equity"])
+        curva = pd.Series(valori, index=pd.DatetimeIndex(date), dtype=np.float64)
+        if pezzi:
+            curva = curva[curva.index > pezzi[-1].index[-1]]  # step_days < test_days: keep the earlier window's bars
+        if len(curva):
+            curva = curva / curva.iloc[0] * valore
+            pezzi.append(curva)
+            valore = curva.iloc[-1]
+    if not pezzi:
+        return pd.Series(dtype=np.float64, name="equity")
+    return pd.concat(pezzi).rename("equity")
+
+
+def walk_forward(ticker, nome_strategia, param_grid, capitale, start, end, train_days=730, test_days=182,
+                 step_days=None, metric="sharpe", max_workers=None, cache_dir="cache/walk_forward",
+                 history=None, callbacks=None):
+    """
+    Run a walk-forward optimization and stitch the out-of-sample results.
+
+    Args:
+        ticker (str): Asset symbol.
+        nome_strategia (str): Strategy name from STRATEGIES (with fast-mode rules).
+        param_grid (dict): {parameter: [values]} searched on every train slice.
+        capitale (float): Initial capital in USD.
+        start (datetime.datetime): First train start.
+        end (datetime.datetime): Last allowed test end.
+        train_days (int): Calendar days per train slice.
+        test_days (int): Calendar days per test slice.
+        step_days (int, optional): Shift between windows (defaults to test_days).
+        metric (str): Train metric maximized by the grid search (e.g. sharpe, cagr, total_return).
+        max_workers (int, optional): Pool size (defaults to every core; 1 runs in this process).
+        cache_dir (str, optional): Per-window result cache (None disables it).
+        history (pd.DataFrame, optional): Preloaded OHLCV (loaded from the price cache when omitted).
+        callbacks (dict, optional): UI hooks:
+            - progress: f(done, total) after each window
+            - status: f(message) per window
+
+    Returns:
+        dict: windows (pd.DataFrame, one row per window), equity (stitched
+              out-of-sample pd.Series) and metrics (total_return, cagr,
+              max_drawdown, sharpe of the stitched curve).
+
+    Raises:
+        ValueError: On unknown strategies/parameters/metrics or a period too short for one window.
+    """
+    from app.backtest import load_backtest_history
+
+    if nome_strategia not in motore_veloce.RULES:
+        raise ValueError(f"Strategy '{nome_strategia}' has no fast-mode rules")
+    if metric not in OBJECTIVES:
+        raise ValueError(f"Unknown metric '{metric}' (choose from {OBJECTIVES})")
+    combinazioni = [job["parameters"] for job in build_grid([ticker], [nome_strategia], {nome_strategia: param_grid})]
+    finestre = build_windows(start, end, train_days, test_days, step_days)
+    if not finestre:
+        raise ValueError("Period too short for one train + test window")
+
+    callbacks = callbacks or {}
+    if history is None:
+        history = load_backtest_history(ticker, start, end)
+    cartella = Path(cache_dir) if cache_dir else None
+    if cartella:
+        cartella.mkdir(parents=True, exist_ok=True)
+    firma_motore = _firma_motore()
+
+    # 🗂️ Cached windows first: only new or changed slices reach the pool
+    risultati = [None] * len(finestre)
+    da_calcolare = {}
+    for i, finestra in enumerate(finestre):
+        fetta = _fetta(history, finestra)
+        percorso = None
+        if cartella:
+            chiave = _chiave_finestra(ticker, nome_strategia, combinazioni, capitale, metric, finestra, fetta, firma_motore)
+            percorso = cartella / f"{chiave}.json"
+            risultati[i] = _leggi_risultato(percorso)
+        if risultati[i] is None:
+            da_calcolare[i] = (fetta, percorso)
+        else:
+            risultati[i]["cached"] = True
+
+    completati = len(finestre) - len(da_calcolare)
+
+    def completato(i):
+        if callbacks.get("progress"):
+            callbacks["progress"](completati, len(finestre))
+        if callbacks.get("status"):
+            r = risultati[i]
+            callbacks["status"](f"[{completati}/{len(finestre)}] test to {finestre[i]['test_end']:%Y-%m-%d}: "
+                                f"{r['parameters']} OOS return {r['total_return']:.2%}")
+
+    def salva(i, risultato):
+        if da_calcolare[i][1] is not None:
+            _scrivi_risultato(da_calcolare[i][1], risultato)
+        risultato["cached"] = False
+        risultati[i] = risultato
+
+    if da_calcolare and (max_workers == 1 or len(da_calcolare) == 1):
+        for i, (fetta, _) in da_calcolare.items():
+            salva(i, _ottimizza_finestra(nome_strategia, fetta, combinazioni, capitale, metric, finestre[i]))
+            completati += 1
+            completato(i)
+    elif da_calcolare:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            futures = {
+                pool.submit(_ottimizza_finestra, nome_strategia, fetta, combinazioni, capitale, metric, finestre[i]): i
+                for i, (fetta, _) in da_calcolare.items()
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                salva(i, future.result())
+                completati += 1
+                completato(i)
+
+    righe = []
+    for finestra, risultato in zip(finestre, risultati):
+        righe.append({
+            "train_start": finestra["train_start"].date(),
+            "train_end": finestra["train_end"].date(),
+            "test_end": finestra["test_end"].date(),
+            **risultato["parameters"],
+            f"train_{metric}": risultato["train_score"],
+            **{k: risultato[k] for k in OOS_COLUMNS},
+            "cached": risultato["cached"],
+        })
+    equity = stitch_equity(risultati, capitale)
+    return {
+        "windows": pd.DataFrame(righe),
+        "equity": equity,
+        "metrics": equity_metrics(equity.index, equity.to_numpy()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward optimization (fast engine)")
+    parser.add_argument("--ticker", required=True)
+    parser.add_argument("--strategy", required=True, choices=list(motore_veloce.RULES))
+    parser.add_argument("--param", action="append", default=[], type=_parse_param,
+                        help="name=v1,v2 (grid searched per train slice)")
+    parser.add_argument("--start", required=True, type=datetime.datetime.fromisoformat)
+    parser.add_argument("--end", required=True, type=datetime.datetime.fromisoformat)
+    parser.add_argument("--train-days", type=int, default=730)
+    parser.add_argument("--test-days", type=int, default=182)
+    parser.add_argument("--step-days", type=int, default=None)
+    parser.add_argument("--metric", default="sharpe", choices=OBJECTIVES)
+    parser.add_argument("--capital", type=float, default=10000.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-dir", default="cache/walk_forward", help="\"\" disables the window cache")
+    parser.add_argument("--output", default="walk_forward_equity.csv")
+    args = parser.parse_args(argv)
+
+    param_grid = dict(args.param)
+    esito = walk_forward(args.ticker, args.strategy, param_grid, args.capital, args.start, args.end,
+                         train_days=args.train_days, test_days=args.test_days, step_days=args.step_days,
+                         metric=args.metric, max_workers=args.workers, cache_dir=args.cache_dir or None,
+                         callbacks={"status": print})
+    print(esito["windows"].to_string(index=False))
+    print(f"Stitched out-of-sample: {esito['metrics']}")
+    esito["equity"].to_csv(args.output, index_label="date")
+    print(f"Saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
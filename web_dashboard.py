@@ -7,6 +7,8 @@ import datetime
 import json
 import os
 
+from app.equity import read_equity_state
+
 # Page Configuration
 st.set_page_config(page_title="QUANT AI TERMINAL", page_icon="🏦", layout="wide")
 
@@ -76,6 +78,22 @@ def render_live_metrics():
 
 # Render the metrics block
 render_live_metrics()
+
+# ==========================================
+# 📉 LIVE FRAGMENT: EQUITY RISK (Every 2s, read from the engine's accumulator)
+# ==========================================
+@st.fragment(run_every=2)
+def render_equity_risk():
+    stato = read_equity_state()
+    if not stato:
+        return
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Session Peak", f"${stato['peak']:,.2f}")
+    col2.metric("Drawdown", f"{stato['drawdown']:.2%}", delta=f"max {stato['max_drawdown']:.2%}", delta_color="off")
+    col3.metric("Intraday Drawdown", f"{stato['intraday_drawdown']:.2%}", delta=f"max {stato['intraday_max_drawdown']:.2%}", delta_color="off")
+    col4.metric("Day Range", f"${stato['day_low']:,.0f} - ${stato['day_high']:,.0f}", delta=f"open ${stato['day_open']:,.0f}", delta_color="off")
+
+render_equity_risk()
 st.divider()
 
 @st.fragment(run_every=5)